@@ -1,13 +1,29 @@
 import streamlit as st
 import pandas as pd
 import streamlit.components.v1 as components
-import plotly.graph_objects as go
-import numpy as np
 from datetime import datetime
 import base64
 from pathlib import Path
+from fa_export import export_bytes, export_url, EXPORT_MIMES
+from fa_data import ongoing_applications, FA1_DATA_PATH, FA2_PROGRESS_PATH
+from fa_refresh import RefreshWorker, history_bundle
+from fa_history import read_log, entry_as_of
+from fa_assets import page_head_html, asset_url
+from fa_expiry import expiring_between, default_horizon
+from fa_company import company_key, company_keys, company_rows, fa1_durations, fa2_durations
+from fa_charts import (
+    generate_application_list_html, generate_expiry_list_html, application_list_panel_html,
+    controller_stats_chart_html, fa_type_pie_figure, fa_type_legend_html, fa_app_type_bar_chart_html, backlog_chart_html,
+    kpi_cards, kpi_card_html, COMPANY_PARAM, FA_TYPE_PARAM, AS_OF_PARAM,
+    CONTROLLER_STATS_FRAME, FA_APP_TYPE_BAR_FRAME, BACKLOG_FRAME, APPLICATION_LIST_FRAME,
+)
 
 LOGO_PATH = Path("SEC_Thailand_Logo.svg.png")
+EXPIRY_LIST_LIMIT = 50
+COMPANY_PAGE = "FA Company"
+ALL_TYPES = "ทั้งหมด"
+COMPANY_FA1_COLUMNS = ["ประเภทคำขอ", "ApplicationType", "วันที่ยื่นคำขอ", "วันที่ตรวจประวัติ", "วันที่อนุญาต", "วันครบอายุเห็นชอบ", "CurrentStage"]
+COMPANY_FA2_COLUMNS = ["Company (FA)", "ประเภทคำขอ", "วันที่ยื่นคำขอ", "วันที่ตรวจประวัติ", "เสนอบันทึก ผช.ผอฝ.", "วันที่อนุญาต", "progress_percent_raw"]
 
 st.set_page_config(
     layout="wide",
@@ -15,820 +31,62 @@ st.set_page_config(
     page_icon=str(LOGO_PATH) if LOGO_PATH.exists() else "✅",
 )
 
+@st.cache_data
 def get_image_as_base64(path: Path):
     if not path.is_file(): return None
     return base64.b64encode(path.read_bytes()).decode()
 
-st.markdown(
-    '<link href="https://fonts.googleapis.com/icon?family=Material+Icons+Outlined" rel="stylesheet">',
-    unsafe_allow_html=True,
-)
-st.markdown(
-    """
-<style>
-@media (max-width: 1100px) {
-  .main .block-container {padding:1rem 0.5rem !important;}
-  .header-grid, .fa-header, .content-grid {
-    grid-template-columns: 1fr !important;
-    display: block !important;
-  }
-  .content-grid {gap: 1rem;}
-  .kpi-card, .framed-panel, .card {min-width: 0 !important; width: 100% !important;}
-  .plotly-graph-div, .js-plotly-plot {width: 100% !important;}
-}
-@media (max-width: 800px) {
-  .main .block-container {padding:0.5rem 0.2rem !important;}
-  .header-grid, .fa-header, .content-grid {
-    grid-template-columns: 1fr !important;
-    display: block !important;
-  }
-  .kpi-card, .framed-panel, .card {min-width: 0 !important; width: 100% !important;}
-  .plotly-graph-div, .js-plotly-plot {width: 100% !important;}
-  .custom-footer-date {
-    position: static !important;
-    margin: 16px 0 0 0 !important;
-    text-align: center !important;
-    font-size: 16px !important;
-  }
-}
-@media (max-width: 600px) {
-  .main .block-container {padding:0.1rem 0.1rem !important;}
-  .header-grid, .fa-header, .content-grid {
-    grid-template-columns: 1fr !important;
-    display: block !important;
-  }
-  .kpi-card, .framed-panel, .card {min-width: 0 !important; width: 100% !important;}
-  .plotly-graph-div, .js-plotly-plot {width: 100% !important;}
-  .custom-footer-date {
-    position: static !important;
-    margin: 12px 0 0 0 !important;
-    text-align: center !important;
-    font-size: 14px !important;
-  }
-}
-@import url('https://fonts.googleapis.com/css2?family=Sarabun:wght@400;500;600;700;800&display=swap');
-:root {
-    --primary-color: #00A99D;
-    --text-dark: #111827;
-    --text-mid: #374151;
-    --text-light: #6B7280;
-    --bg: #FFFFFF;
-    --panel-bg: #F9FAFB;
-    --border: #E5E7EB;
-    --shadow-sm: 0 1px 2px rgba(0,0,0,.04);
-    --shadow-md: 0 4px 6px -1px rgba(0,0,0,.03), 0 2px 4px -2px rgba(0,0,0,.03);
-}
-html, body, [class*="st-"], [class*="css-"] {
-    font-family: 'Sarabun', system-ui, sans-serif;
-    background: var(--bg);
-    color: var(--text-dark);
-}
-#MainMenu, footer, header[data-testid="stHeader"] {
-    display: none !important;
-}
-.main .block-container {
-    padding: 1.5rem 2.5rem 2rem 2.5rem;
-    max-width: 1600px;
-}
-.header-grid {
-    display: grid;
-    grid-template-columns: 1fr auto;
-    align-items: center;
-    margin-bottom: 0.5rem;
-}
-.title-area {
-    display: flex;
-    align-items: center;
-    gap: 0.75rem;
-}
-.title-area .caret {
-    font-size: 24px;
-    color: #4B5563;
-}
-.title-area .main-title {
-    font-size: 28px;
-    font-weight: 800;
-    color: var(--text-dark);
-    margin: 0;
-    margin-right: 0.75rem;
-}
-.controls-area {
-    display: flex;
-    align-items: center;
-    gap: 1rem;
-}
-.pill-buttons {
-    display: flex;
-    gap: 0.75rem;
-}
-.page-controls-grid {
-    display: grid;
-    grid-template-columns: 1fr auto;
-    align-items: center;
-    margin-bottom: 2rem;
-}
-.page-switcher {
-    display: flex;
-    gap: 0.5rem;
-}
-.search-area .stTextInput {
-    width: 250px;
-}
-.pill-buttons .stButton>button,
-.page-switcher .stButton>button {
-    background: #fff;
-    border: 1px solid var(--border);
-    border-radius: 8px;
-    font-weight: 600;
-    color: var(--text-mid);
-    box-shadow: var(--shadow-sm);
-}
-.pill-buttons .stButton>button {
-    padding: .4rem 1.1rem;
-    height: 38px;
-}
-.page-switcher .stButton>button {
-    padding: .3rem 1rem;
-}
-.page-switcher .stButton>button.active-page {
-    border-color: var(--primary-color);
-    background-color: #F0F9F8;
-    color: var(--primary-color);
-}
-.search-area .stTextInput > div {
-    border-radius: 8px;
-    border-color: var(--border);
-    background: #fff;
-    height: 38px;
-}
-.search-area .stTextInput input {
-    height: 38px;
-}
-.kpi-card {
-    background: var(--panel-bg);
-    border: 1px solid #F3F4F6;
-    border-radius: 12px;
-    padding: 1.5rem;
-    display: flex;
-    align-items: center;
-    gap: 1rem;
-    box-shadow: var(--shadow-md);
-    height: 100%;
-}
-.kpi-card .icon {
-    width: 48px;
-    height: 48px;
-    border-radius: 50%;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    background: #E0F2F1;
-    color: var(--primary-color);
-    flex-shrink: 0;
-}
-.kpi-card .title {
-    font-size: 1rem;
-    font-weight: 500;
-    color: var(--text-light);
-    margin: 0 0 .25rem 0;
-}
-.kpi-card .value {
-    font-size: 2.25rem;
-    font-weight: 700;
-    line-height: 1;
-    color: var(--text-dark);
-}
-.kpi-card .suffix {
-    font-size: .9rem;
-    color: var(--text-light);
-}
-.chart-panel,
-.framed-panel {
-    background: var(--panel-bg);
-    border: 2px solid #B1B1B1;
-    border-radius: 18px;
-    padding: 1.5rem;
-    box-shadow: var(--shadow-md);
-    height: 100%;
-}
-.chart-header {
-    font-size: 1.1rem;
-    font-weight: 700;
-    color: var(--text-dark);
-    margin: 0 0 .5rem 0;
-}
-.chart-legend {
-    display: flex;
-    gap: 1rem;
-    margin: .25rem 0 1rem 0;
-}
-.legend-item {
-    display: flex;
-    align-items: center;
-    gap: .4rem;
-    font-size: .8rem;
-    color: var(--text-light);
-}
-.legend-dot,
-.legend-square {
-    width: 10px;
-    height: 10px;
-}
-.legend-dot {
-    border-radius: 50%;
-}
-.content-grid {
-    display: grid;
-    grid-template-columns: 0.8fr 1.2fr;
-    gap: 1.5rem;
-}
-.faded-chart {
-    opacity: 0.2;
-}
-.page-kpi-container {
-    background: var(--panel-bg);
-    border: 1px solid #F3F4F6;
-    border-radius: 12px;
-    padding: 1rem;
-    display: flex;
-    justify-content: space-around;
-    gap: .75rem;
-    margin-bottom: 1.5rem;
-}
-.page-kpi-item {
-    display: flex;
-    align-items: center;
-    gap: 1rem;
-}
-.page-kpi-item .icon {
-    font-size: 1.5rem;
-    color: var(--secondary-color);
-}
-.page-kpi-item .text .title {
-    font-size: .92rem;
-    color: var(--text-light);
-}
-.page-kpi-item .text .value {
-    font-size: 1.75rem;
-    font-weight: 700;
-    color: var(--text-dark);
-}
-.list-panel {
-    position: relative;
-    overflow: hidden;
-    background: var(--panel-bg);
-    border: 1px solid #F3F4F6;
-    border-radius: 12px;
-    padding: 1.5rem;
-    box-shadow: var(--shadow-md);
-    height: 100%;
-}
-.list-title {
-    color: #111827;
-    font-weight: 800;
-    font-size: 1.25rem;
-    margin: 0 0 .5rem 0;
-}
-.list-item {
-    margin-bottom: 1.5rem;
-}
-.info-row {
-    display: flex;
-    justify-content: space-between;
-    align-items: center;
-    background: #fff;
-    border: 1px solid #f3f4f6;
-    border-radius: 8px;
-    padding: 12px 16px;
-    margin-top: 8px;
-}
-.info-row .name {
-    font-size: 1rem;
-    color: #111827;
-    font-weight: 500;
-}
-.info-row .meta {
-    font-size: .85rem;
-    color: #6b7280;
-}
-.show-more-button-container {
-    display: flex;
-    justify-content: center;
-    margin-top: 1.5rem;
-}
-.show-more-button-container .stButton>button {
-    background: var(--primary-color);
-    color: #fff;
-    border: none;
-    border-radius: 8px;
-    padding: .55rem 2rem;
-    font-size: 1rem;
-    font-weight: 700;
-}
-.footer {
-    text-align: right;
-    font-size: .8rem;
-    color: var(--text-light);
-    margin-top: 2rem;
-}
-.stSelectbox > div[data-baseweb="select"] {
-    min-width: 250px;
-}
-.framed-panel {
-    border: 3px solid #333 !important;
-    box-shadow: 0 8px 16px rgba(0,0,0,0.06);
-    border-radius: 18px !important;
-    padding: 1.8rem !important;
-}
-.fa-header {
-    display: grid;
-    grid-template-columns: 220px 1fr 140px;
-    gap: 16px;
-    align-items: center;
-    margin: 6px 0 14px;
-}
-.search-area .stTextInput > div{
-    height:56px;
-    border-radius:12px;
-    border:1.5px solid #E5E7EB;
-    background:#fff;
-}
-.search-area .stTextInput input{
-    height:56px;
-    font-size:16px;
-}
-.page-dropdown [data-baseweb="select"] span {
-    font-size: 40px !important;
-    font-weight: 800;
-    color: #0F172A;
-}
-.page-dropdown [data-baseweb="select"] input {
-    font-size: 40px !important;
-    font-weight: 700;
-    color: #0F172A;
-}
-.page-dropdown [data-baseweb="select"] div {
-    font-size: 40px !important;
-}
-.pill-buttons-row .stButton>button{
-    height:56px;
-    padding:0 18px;
-    font-weight:800;
-    background:#fff;
-    border:2px solid #E5E7EB;
-    border-radius:12px;
-    margin:0 !important;
-    box-shadow:none;
-}
-.pill-buttons-row .stButton>button:hover{
-    border-color:#CBD5E1;
-}
-.fa-header .search-area .stTextInput>div{
-    height:48px;
-    border-radius:12px;
-    border:1.5px solid #E5E7EB;
-    background:#fff;
-}
-.fa-header .search-area input{
-    height:48px;
-    font-size:16px;
-}
-.fa-header .pill-buttons .stButton>button{
-    height:48px;
-    padding:0 18px;
-    font-weight:800;
-    background:#fff;
-    border:2px solid #E5E7EB;
-    border-radius:12px;
-    box-shadow:none;
-}
-.fa-header .pill-buttons .stButton>button:hover{
-    border-color:#CBD5E1;
-}
-.header-logo img, .fa-header .header-logo img {
-    height: 200px !important;
-}
-</style>
-""",
-    unsafe_allow_html=True,
-)
+st.markdown(page_head_html(), unsafe_allow_html=True)
 
-@st.cache_data
-def load_and_prepare_data(file_path: str):
-    df = pd.DataFrame()
-    try:
-        df = pd.read_excel(file_path, engine="openpyxl")
-    except Exception:
-        df = pd.DataFrame({
-            "ให้ความเห็นชอบ FA": ["เอ บจก.", "บี บล.", "ซี ธนาคาร", "ดี ลูก บล."],
-            "ประเภทคำขอ": ["รายใหม่", "ต่ออายุ", "รายใหม่", "ต่ออายุ"],
-            "วันที่ยื่นคำขอ": pd.to_datetime(["2024-11-10", "2024-12-01", "2025-01-03", "2025-01-15"]),
-            "วันที่ตรวจประวัติ": pd.to_datetime([None, "2024-12-10", None, None]),
-            "วันที่อนุญาต": pd.to_datetime([None, None, None, None]),
-            "วันครบอายุเห็นชอบ": pd.to_datetime([None, "2025-10-10", None, "2025-11-20"]),
-            "dashboard": ["25%", "50%", "75%", "0%"],
-        })
-
-    df.columns = df.columns.str.strip()
-    date_cols = ["วันครบอายุเห็นชอบ", "วันที่ยื่นคำขอ", "วันที่ตรวจประวัติ", "วันที่อนุญาต"]
-    for col in date_cols:
-        if col in df.columns:
-            s = pd.to_datetime(df[col], errors="coerce", format='mixed')
-            mask = s.dt.year.gt(2300).fillna(False)
-            s.loc[mask] = s.loc[mask] - pd.DateOffset(years=543)
-            df[col] = s
-
-    expiry_dates_str = df['วันครบอายุเห็นชอบ'].dt.strftime('%-d/%-m/%Y')
-    app_dates_str = df['วันที่ยื่นคำขอ'].dt.strftime('%-d/%-m/%Y')
-    df['display_date'] = expiry_dates_str.fillna(app_dates_str).fillna("%-d/%-m/%Y")
-    df["progress_percent_raw"] = (pd.to_numeric(df.get("dashboard", "0").astype(str).str.replace("%","",regex=False), errors="coerce").fillna(0))
-    df["Company (FA)"] = (df.get("ให้ความเห็นชอบ FA", pd.Series(dtype=str))
-                          .astype(str)
-                          .str.split("\n", n=1).str[0]
-                          .str.replace('"',"",regex=False)
-                          .str.strip())
-
-    df["ApplicationType"] = np.where(df.get("ให้ความเห็นชอบ FA", pd.Series(dtype=str)).astype(str).str.contains("เสมือนรายใหม่", na=False), "รายใหม่", df.get("ประเภทคำขอ",""))
-    stage_conditions = [df.get("วันที่อนุญาต", pd.Series(index=df.index)).notna(), df.get("วันที่ตรวจประวัติ", pd.Series(index=df.index)).notna(), df.get("วันที่ยื่นคำขอ", pd.Series(index=df.index)).notna()]
-    df["CurrentStage"] = np.select(stage_conditions, ["ได้รับอนุญาต","ตรวจประวัติ","ยื่นคำขอ"], default="N/A")
-    return df
+@st.cache_resource
+def get_refresh_worker():
+    return RefreshWorker(FA1_DATA_PATH, FA2_PROGRESS_PATH).start()
 
-@st.cache_data
-def load_fa2_progress_data(file_path: str):
-    df = pd.DataFrame()
-    try:
-        df = pd.read_excel(file_path, engine="openpyxl")
-    except Exception:
-        df = pd.DataFrame({ "ให้ความเห็นชอบผู้ควบคุมฯ (แบบ FA-2)": ["สมชาย ใจดี", "ปนัดดา ชูชนะ", "วรรณวร งามโรจน์", "ณัฐธาวุฒิ เดชจินดา"], "ชื่อบริษัท FA": ["เอ บจก.", "บลู เวลธ์ บล.", "ธนาคาร บ้านบ้าน", "ลูก บล. ตัวอย่าง"], "progress_percent_raw": [50, 75, 75, 25], })
-    df.columns = df.columns.str.strip()
-    df.rename(columns={"ให้ความเห็นชอบผู้ควบคุมฯ (แบบ FA-2)": "Company (FA)"}, inplace=True)
-    df["company_affiliation_text"] = df.get("ชื่อบริษัท FA", "N/A").fillna("N/A").astype(str)
-    if "progress_percent_raw" not in df.columns:
-        df["progress_percent_raw"] = np.random.choice([25,50,75,100], size=len(df))
-    if "ApplicationType" not in df.columns:
-        df["ApplicationType"] = "ทั้งหมด"
-    return df
-
-def generate_application_list_html(df_ongoing, num_items_to_show, is_fa2_list=False):
-    if df_ongoing.empty:
-        return "<div style='height:300px; display:flex; align-items:center; justify-content:center; color:#6B7280;'>ไม่มีข้อมูลที่กำลังดำเนินการ</div>"
-    
-    df_to_show = df_ongoing.head(num_items_to_show).copy()
-    if "progress_percent_raw" not in df_to_show.columns:
-        df_to_show["progress_percent_raw"] = np.random.choice([25, 50, 75, 100], size=len(df_to_show))
-
-    def step_idx(p):
-        if p >= 100: return 4
-        if p >= 75: return 3
-        if p >= 50: return 2
-        if p > 0:   return 1
-        return 0
-
-    html = []
-    for _, row in df_to_show.iterrows():
-        idx = step_idx(row.get("progress_percent_raw", 0))
-        bar = "<div style='position:relative; display:flex; justify-content:space-between; align-items:center; margin-bottom:8px;'>"
-        bar += "<div style='position:absolute; top:50%; transform:translateY(-50%); left:12px; right:12px; height:4px; background:#e5e7eb; z-index:1;'></div>"
-        pct = (idx / 4) * 100 if idx > 0 else 0
-        if pct > 0:
-            bar += f"<div style='position:absolute; top:50%; transform:translateY(-50%); left:12px; width:calc({pct}% - 12px); height:4px; background:var(--primary-color); z-index:1;'></div>"
-        for i in range(5):
-            active = i <= idx
-            style = f"width:24px; height:24px; border-radius:50%; display:flex; align-items:center; justify-content:center; z-index:2; background:{'var(--primary-color)' if active else '#fff'}; border:2px solid {'var(--primary-color)' if active else '#e5e7eb'};"
-            icon = "<svg width='16' height='16' viewBox='0 0 16 16' fill='none' stroke='white' stroke-width='2' stroke-linecap='round'><path d='M5 8l2.5 2.5L12 6'/></svg>" if active else ""
-            bar += f"<div style='{style}'>{icon}</div>"
-        bar += "</div>"
-        
-        status = "<div style='font-weight:600; font-size:1rem; color:#374151; margin-bottom:4px;'>กำลังดำเนินการให้ความเห็นชอบ</div>"
-        name = row.get("Company (FA)", "N/A")
-        
-        if is_fa2_list:
-            right = row.get("company_affiliation_text", "")
-        else:
-            expire_date = row.get("วันครบอายุเห็นชอบ", "")
-            if pd.notnull(expire_date) and str(expire_date) != "NaT" and str(expire_date) != "nan" and expire_date != "":
-                if hasattr(expire_date, "strftime"):
-                    right = expire_date.strftime("%d/%m/%Y")
-                else:
-                    right = str(expire_date)
-            else:
-                right = "-"
-        info = f"""<div class="info-row"><div class="name">{name}</div><div class="meta">{right}</div></div>"""
-        html.append(f"<div class='list-item'>{status}{bar}{info}</div>")
-        
-    return "".join(html)
+@st.cache_resource(max_entries=8)
+def get_history_bundle(as_of, seq):
+    # ``seq`` is the ingest log entry ``as_of`` resolves to. It is part of
+    # the key so that a later ingest on that day (e.g. ?as_of=<today>) builds
+    # a new bundle instead of serving the one cached before it.
+    return history_bundle(as_of)
 
 def render_controller_stats_chart():
-    cats = ["มีสังกัด", "ไร้สังกัด"]
-    vals = [518, 7]
-    colors = ["#60F3FE", "#B2EBF2"]
-    max_y = max(vals)
-    step = 100 if max_y >= 300 else 50
-    upper = int(np.ceil(max_y / step) * step)
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=[cats[0]], y=[vals[0]], name=cats[0],
-        marker_color=colors[0],
-        text=str(vals[0]), textposition="outside",
-        textfont=dict(size=14, color="#1F2937")
-    ))
-    fig.add_trace(go.Bar(
-        x=[cats[1]], y=[vals[1]], name=cats[1],
-        marker_color=colors[1],
-        text=str(vals[1]), textposition="outside",
-        textfont=dict(size=14, color="#1F2937")
-    ))
-
-    fig.update_layout(
-        showlegend=False,
-        barmode="group",
-        height=300,
-        margin=dict(t=20, b=20, l=50, r=10),
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        xaxis=dict(showline=False, tickfont=dict(size=14)),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor="#E5E7EB",
-            range=[0, upper],
-            tickmode="linear",
-            dtick=step,
-            tickformat=",d",
-            zeroline=True,
-            zerolinecolor="#E5E7EB",
-            tickfont=dict(size=12)
-        ),
-        uniformtext_minsize=12,
-        uniformtext_mode="hide"
-    )
+    components.html(controller_stats_chart_html(), **CONTROLLER_STATS_FRAME)
 
-    chart_html = fig.to_html(full_html=False, include_plotlyjs="cdn", config={"displayModeBar": False})
-    components.html(f"""
-    <style>
-      .framed-panel {{
-        border: 1.5px solid #E5E7EB;
-        border-radius: 16px;
-        background: #FFFFFF;
-        padding: 16px 16px 8px 16px;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.05);
-        height: 100%;
-        max-width: 100%;
-      }}
-      .chart-header {{
-        margin: 0 0 8px 4px;
-        font-size: 22px;
-        font-weight: 800;
-        color: #111827;
-        text-align: center;
-      }}
-      .chart-legend {{
-          display: flex;
-          justify-content: center;
-          gap: 48px;
-          align-items: center;
-          margin: 4px 0 12px 0;
-          font-size: 14px;
-          font-weight: 500;
-          color: #374151;
-      }}
-      .legend-item {{ display: flex; align-items: center; gap: 8px; }}
-      .legend-dot {{ width: 12px; height: 12px; border-radius: 50%; display: inline-block; }}
-      .plotly-graph-div, .js-plotly-plot {{ width: 100% !important; }}
-    </style>
-    <div class="framed-panel">
-      <h2 class="chart-header">ข้อมูลจำนวนผู้ควบคุมการปฏิบัติงาน</h2>
-      <div class="chart-legend">
-        <div class="legend-item"><span class="legend-dot" style="background-color:{colors[0]};"></span>{cats[0]}</div>
-        <div class="legend-item"><span class="legend-dot" style="background-color:{colors[1]};"></span>{cats[1]}</div>
-      </div>
-      <div style="display: flex; justify-content: center;">
-        <div style="width: 80%; margin: 0 auto;">
-          {chart_html}
-        </div>
-      </div>
-    </div>
-    """, height=600, width=970, scrolling=False)
-
-def render_fa_type_pie_chart(df):
-    type_map = {
-        "บล.": lambda x: "บล." in x and "ลูก" not in x,
-        "บจก.": lambda x: "บจก." in x,
-        "ธนาคาร": lambda x: "ธนาคาร" in x or "ธ." in x,
-        "ลูก บล.": lambda x: "ลูก" in x and "บล." in x
-    }
-    
-    if "คำนำหน้า" in df.columns:
-        type_col = df["คำนำหน้า"].astype(str)
-    elif "ให้ความเห็นชอบ FA" in df.columns:
-        def extract_prefix(val_str):
-            val_str = str(val_str)
-            if "ธนาคาร" in val_str or "ธ." in val_str: return "ธนาคาร"
-            if "ลูก" in val_str and "บล." in val_str: return "ลูก บล."
-            if "บล." in val_str: return "บล."
-            if "บจก." in val_str: return "บจก."
-            return "อื่นๆ"
-        type_col = df["ให้ความเห็นชอบ FA"].apply(extract_prefix)
-    else:
+def render_fa_type_pie_chart(df, aggregates=None):
+    # Drawn in the page (not an iframe) so that a click on a type can open
+    # its companies through on_select.
+    fig = fa_type_pie_figure(df, aggregates)
+    if fig is None:
         return
-
-    fa_counts = {group: sum(type_col.apply(func)) for group, func in type_map.items()}
-    colors = ["#60F3FE", "#3AADDF", "#1060AA", "#10456F"]
-    fig = go.Figure(data=[
-        go.Pie(
-            labels=list(fa_counts.keys()),
-            values=list(fa_counts.values()),
-            hole=0.7,
-            marker=dict(colors=colors, line=dict(color="#FFFFFF", width=2)),
-            textinfo="value",
-            textposition="inside",
-            textfont=dict(size=14, color="white"),
-            sort=False
+    with st.container(border=True):
+        st.markdown(fa_type_legend_html(), unsafe_allow_html=True)
+        st.plotly_chart(
+            fig, key="fa_type_pie", theme=None, config={"displayModeBar": False}, selection_mode="points",
+            on_select=lambda companies=bundle.companies: open_fa_type_from_chart(companies),
         )
-    ])
-    total = sum(fa_counts.values())
-    fig.update_layout(
-        showlegend=False,
-        height=300,
-        margin=dict(t=10, b=10, l=10, r=10),
-        annotations=[dict(
-            text=f"<b>{total}</b>",
-            x=0.5, y=0.5, font_size=48, showarrow=False,
-            font_color="#1F2937", yanchor="middle"
-        )],
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)"
-    )
-    chart_html = fig.to_html(full_html=False, include_plotlyjs="cdn", config={"displayModeBar": False})
-    components.html(f"""
-    <style>
-      .framed-panel {{
-        border: 1.5px solid #E5E7EB;
-        border-radius: 16px;
-        background: #FFFFFF;
-        padding: 16px 16px 8px 16px;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.05);
-        height: 100%;
-        max-width: 100%;
-      }}
-      .chart-header {{
-        margin: 0 0 8px 4px;
-        font-size: 22px;
-        font-weight: 800;
-        color: #111827;
-        text-align: center;
-      }}
-      .chart-legend {{
-          display: flex;
-          justify-content: center;
-          flex-wrap: wrap;
-          gap: 16px 24px;
-          align-items: center;
-          margin: 4px 0 12px 4px;
-          font-size: 14px;
-          font-weight: 500;
-          color: #374151;
-      }}
-      .legend-item {{ display: flex; align-items: center; gap: 8px; }}
-      .legend-dot {{ width: 12px; height: 12px; border-radius: 50%; display: inline-block; }}
-      .plotly-graph-div, .js-plotly-plot {{ width: 100% !important; }}
-    </style>
-    <div class="framed-panel">
-      <h2 class="chart-header">ข้อมูลบริษัท FA แยกตามประเภท</h2>
-      <div class="chart-legend">
-        <div class="legend-item"><span class="legend-dot" style="background-color:{colors[0]};"></span>บล.</div>
-        <div class="legend-item"><span class="legend-dot" style="background-color:{colors[1]};"></span>บจก.</div>
-        <div class="legend-item"><span class="legend-dot" style="background-color:{colors[2]};"></span>ธนาคาร</div>
-        <div class="legend-item"><span class="legend-dot" style="background-color:{colors[3]};"></span>ลูก บล.</div>
-      </div>
-      <div style="display: flex; justify-content: center;">
-        <div style="width: 80%; margin: 0 auto;">
-          {chart_html}
-        </div>
-      </div>
-    </div>
-    """, height=670, width=970)
-
-def render_fa_app_type_bar_chart(df):
-    categories = ["ธนาคาร", "บจก.", "บล."]
-    app_types = ["รายใหม่", "ต่ออายุ"]
-    colors = {"รายใหม่": "#4285F4", "ต่ออายุ": "#FBBC05"}
-
-    def extract_fa_type(row):
-        val = str(row["คำนำหน้า"] if "คำนำหน้า" in df.columns else row["ให้ความเห็นชอบ FA"])
-        if "ธนาคาร" in val or "ธ." in val: return "ธนาคาร"
-        if "บจก." in val: return "บจก."
-        if "บล." in val: return "บล."
-        return "อื่นๆ"
-
-    filtered = df.copy()
-    filtered["FA_TYPE"] = filtered.apply(extract_fa_type, axis=1)
-    filtered = filtered[filtered["FA_TYPE"].isin(categories)]
-    filtered["AppType"] = filtered["ประเภทคำขอ"].replace("", "ไม่ระบุ").fillna("ไม่ระบุ")
-
-    data_count = {c: {t: 0 for t in app_types} for c in categories}
-    for _, r in filtered.iterrows():
-        if r["FA_TYPE"] in categories and r["AppType"] in app_types:
-            data_count[r["FA_TYPE"]][r["AppType"]] += 1
-
-    new_vals   = [data_count[c]["รายใหม่"] for c in categories]
-    renew_vals = [data_count[c]["ต่ออายุ"] for c in categories]
-    
-    totals = [a + b for a, b in zip(new_vals, renew_vals)]
-    max_stack = max(totals + [1])
-    step = 5 if max_stack <= 25 else (10 if max_stack <= 50 else 20)
-    upper = int(np.ceil(max_stack / step) * step)
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        name="ต่ออายุ", x=categories, y=renew_vals,
-        marker_color=colors["ต่ออายุ"], text=renew_vals,
-        textposition="inside", textfont=dict(size=12, color="#333")
-    ))
-    
-    fig.add_trace(go.Bar(
-        name="รายใหม่", x=categories, y=new_vals,
-        marker_color=colors["รายใหม่"], text=new_vals,
-        textposition="inside", textfont=dict(size=12, color="white")
-    ))
-    fig.update_layout(
-        barmode="stack",
-        showlegend=False,
-        height=300,
-        margin=dict(t=20, b=20, l=40, r=10), 
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        xaxis=dict(showline=False, tickfont=dict(size=14)),
-        yaxis=dict(
-            showgrid=True, gridcolor="#E5E7EB",
-            range=[0, upper],
-            tickmode="linear",
-            dtick=step,
-            tickformat=",d",
-            zeroline=True, zerolinecolor="#E5E7EB",
-            tickfont=dict(size=12)
-        ),
-        uniformtext_minsize=10
-    )
 
-    chart_html = fig.to_html(full_html=False, include_plotlyjs="cdn", config={"displayModeBar": False})
+def open_fa_type_from_chart(companies):
+    points = st.session_state.fa_type_pie.selection.points
+    if points and points[0].get("label") in companies.by_type:
+        open_company(companies, fa_type=points[0]["label"])
 
-    components.html(f"""
-    <style>
-      .framed-panel {{
-        border: 1.5px solid #E5E7EB;
-        border-radius: 16px;
-        background: #FFFFFF;
-        padding: 16px 16px 8px 16px;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.05);
-        height: 100%;
-        max-width: 100%;
-      }}
-      .chart-header {{
-        margin: 0 0 8px 4px;
-        font-size: 22px;
-        font-weight: 800;
-        color: #111827;
-        text-align: center;
-      }}
-      .chart-legend {{
-          display: flex;
-          justify-content: center;
-          gap: 24px;
-          align-items: center;
-          margin: 4px 0 12px 0;
-          font-size: 14px;
-          font-weight: 500;
-          color: #374151;
-      }}
-      .legend-item {{ display: flex; align-items: center; gap: 8px; }}
-      .legend-square {{ width: 12px; height: 12px; border-radius: 2px; display: inline-block; }}
-      .plotly-graph-div, .js-plotly-plot {{ width: 100% !important; }}
-    </style>
-    <div class="framed-panel">
-      <h2 class="chart-header">สถิติ FA ตามประเภทคำขอ</h2>
-      <div class="chart-legend">
-        <div class="legend-item"><span class="legend-square" style="background-color:{colors['รายใหม่']};"></span>รายใหม่</div>
-        <div class="legend-item"><span class="legend-square" style="background-color:{colors['ต่ออายุ']};"></span>ต่ออายุ</div>
-      </div>
-      <div style="display: flex; justify-content: center;">
-        <div style="width: 80%; margin: 0 auto;">
-          {chart_html}
-        </div>
-      </div>
-    </div>
-    """, height=670, width=970)
+def render_fa_app_type_bar_chart(df, aggregates=None):
+    components.html(fa_app_type_bar_chart_html(df, aggregates=aggregates), **FA_APP_TYPE_BAR_FRAME)
 
-def set_page(page_name):
-    st.session_state.current_page = page_name
+def render_backlog_chart(backlog):
+    components.html(backlog_chart_html(backlog), **BACKLOG_FRAME)
 
 def set_filter(filter_name):
     st.session_state.active_filter = filter_name
 
 def render_header_and_switcher():
-    page_options = ["FA Dashboard Summary", "FA-1", "FA-2"]
+    page_options = ["FA Dashboard Summary", "FA-1", "FA-2", COMPANY_PAGE]
     current = st.session_state.get("current_page", "FA Dashboard Summary")
-    logo_b64 = get_image_as_base64(LOGO_PATH)
-    c_dd, c_search, c_filters, c_logo = st.columns([0.18, 0.54, 0.22, 0.06])
+    logo_src = asset_url("logo.png")
+    if logo_src is None:
+        logo_b64 = get_image_as_base64(LOGO_PATH)
+        logo_src = f"data:image/png;base64,{logo_b64}" if logo_b64 else None
+    c_dd, c_controls, c_logo = st.columns([0.18, 0.76, 0.06])
     with c_dd:
         st.markdown('<div class="page-dropdown">', unsafe_allow_html=True)
         page = st.selectbox(
@@ -841,6 +99,21 @@ def render_header_and_switcher():
         if page != current:
             st.session_state.current_page = page
             st.rerun()
+    with c_logo:
+        if logo_src:
+            st.markdown(
+                f'<div style="display:flex;justify-content:flex-end;">'
+                f'<img src="{logo_src}" style="height:56px;" />'
+                f'</div>',
+                unsafe_allow_html=True
+            )
+    return c_controls
+
+@st.fragment
+def render_header_filters(page_type, list_slot, df_processed, df_fa2):
+    # Search and filter widgets live in their own fragment so that a click or
+    # keystroke only reruns this function and redraws the list in ``list_slot``.
+    c_search, c_filters, c_export = st.columns([0.60, 0.29, 0.11])
     with c_search:
         st.markdown('<div class="search-area">', unsafe_allow_html=True)
         st.text_input(
@@ -856,128 +129,228 @@ def render_header_and_switcher():
         b2.button("รายใหม่", on_click=set_filter, args=("รายใหม่",), key="btn_new", use_container_width=True)
         b3.button("ต่ออายุ", on_click=set_filter, args=("ต่ออายุ",), key="btn_renew", use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
-    with c_logo:
-        if logo_b64:
-            st.markdown(
-                f'<div style="display:flex;justify-content:flex-end;">'
-                f'<img src="data:image/png;base64,{logo_b64}" style="height:56px;" />'
-                f'</div>',
-                unsafe_allow_html=True
+    if list_slot is not None:
+        with c_export:
+            render_export_buttons(page_type, df_processed, df_fa2)
+        with list_slot.container():
+            render_application_list(page_type, df_processed, df_fa2)
+
+def render_export_buttons(page_type, df_processed, df_fa2):
+    # With fa_api.py configured (FA_API_URL) the buttons link to its export
+    # route, which streams the file from disk. Otherwise the file is built
+    # only when a button is clicked, but st.download_button then holds the
+    # whole file in memory while it is served; the popover says so.
+    file_stem = f"{page_type}_{datetime.now().strftime('%Y%m%d')}"
+    search_term = st.session_state.get("company_search", "")
+    active_filter = st.session_state.get("active_filter", "ทั้งหมด")
+    urls = {fmt: export_url(page_type, fmt, search_term, active_filter) for fmt in EXPORT_MIMES}
+    in_memory = not all(urls.values())
+    df_ongoing = filter_ongoing_applications(page_type, df_processed, df_fa2) if in_memory else None
+    with st.popover("ส่งออก", use_container_width=True):
+        for fmt, mime in EXPORT_MIMES.items():
+            if urls[fmt]:
+                st.link_button(fmt.upper(), urls[fmt], use_container_width=True)
+                continue
+            st.download_button(
+                fmt.upper(), data=lambda fmt=fmt: export_bytes(df_ongoing, fmt),
+                file_name=f"{file_stem}.{fmt}", mime=mime,
+                on_click="ignore", key=f"export_{fmt}_{page_type}", use_container_width=True,
             )
+        if in_memory:
+            st.caption("ไฟล์จะถูกสร้างทั้งไฟล์ในหน่วยความจำของเซิร์ฟเวอร์ก่อนดาวน์โหลด")
 
-def render_kpi_header():
+def render_kpi_header(expiry_index):
     kpi_cols = st.columns(4, gap="large")
-    kpis = [
-        {"icon": "history", "title": "จำนวนที่อยู่ระหว่างขอความเห็นชอบ", "value": "25"},
-        {"icon": "task_alt", "title": "จำนวนคำขอที่ดำเนินแล้วเสร็จ", "value": "10"},
-        {"icon": "inventory_2", "title": "จำนวนบริษัท ฯ ที่ต้องเตรียมยื่นคำขอ", "value": "15"},
-        {"icon": "event_available", "title": "จำนวนคำขอปี 2568 ที่ดำเนินการรวม", "value": "50"},
-    ]
-    for i, k in enumerate(kpis):
+    for i, k in enumerate(kpi_cards(expiry_index, bundle.as_of)):
         with kpi_cols[i]:
-            st.markdown(f"""<div class="kpi-card">
-                <div class="icon"><span class="material-icons-outlined">{k['icon']}</span></div>
-                <div><div class="title">{k['title']}</div><div class="value">{k['value']} <span class="suffix">บริษัท ฯ.</span></div></div>
-            </div>""", unsafe_allow_html=True)
+            st.markdown(kpi_card_html(k), unsafe_allow_html=True)
     st.markdown("<br/>", unsafe_allow_html=True)
 
 def render_dashboard_summary():
-    render_kpi_header()
+    render_kpi_header(expiry_index)
     chart_cols = st.columns(3, gap="large")
     with chart_cols[0]: render_controller_stats_chart()
-    with chart_cols[1]: render_fa_type_pie_chart(df_processed)
-    with chart_cols[2]: render_fa_app_type_bar_chart(df_processed)
-
-def render_fa_page(page_type, df_processed, df_fa2):
-    render_kpi_header()
+    with chart_cols[1]: render_fa_type_pie_chart(df_processed, fa1_aggregates)
+    with chart_cols[2]: render_fa_app_type_bar_chart(df_processed, fa1_aggregates)
+    render_backlog_chart(bundle.backlog)
+    render_quarantine(bundle.quarantine)
+
+def render_quarantine(quarantine):
+    # Rows validation held back are out of every count above; list them so
+    # the sheet owners can fix the source.
+    held = {name: rows for name, rows in quarantine.items() if len(rows)}
+    if not held:
+        return
+    total = sum(len(rows) for rows in held.values())
+    with st.expander(f"แถวที่ไม่ผ่านการตรวจสอบ {total:,} แถว (ไม่นับรวมในกราฟ)"):
+        for name, rows in held.items():
+            st.markdown(f'<div class="list-title">{name.upper().replace("FA", "FA-")}</div>', unsafe_allow_html=True)
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+
+@st.fragment
+def render_expiry_panel(df_processed, expiry_index):
+    st.markdown('<div class="list-title">บริษัท ฯ ที่ต้องเตรียมยื่นคำขอต่ออายุ</div>', unsafe_allow_html=True)
+    if len(expiry_index.dates) == 0:
+        st.markdown(generate_expiry_list_html(df_processed.iloc[0:0]), unsafe_allow_html=True)
+        return
+    start, end = default_horizon(bundle.as_of)
+    first = min(pd.Timestamp(expiry_index.dates[0]), start).date()
+    last = max(pd.Timestamp(expiry_index.dates[-1]), end).date()
+    d1, d2 = st.slider(
+        "ช่วงวันครบอายุเห็นชอบ", min_value=first, max_value=last,
+        value=(start.date(), end.date()), format="DD/MM/YYYY", key="expiry_range",
+    )
+    positions = expiring_between(expiry_index, d1, d2)
+    st.caption(f"{len(positions):,} รายการ")
+    expiring = df_processed.iloc[positions[:EXPIRY_LIST_LIMIT]]
+    st.markdown(generate_expiry_list_html(expiring), unsafe_allow_html=True)
+    render_company_picker(expiring["Company (FA)"], "open_expiring_company")
+
+def render_fa_page(page_type, df_processed, df_fa2, expiry_index, aggregates):
+    render_kpi_header(expiry_index)
     st.markdown('<div class="content-grid">', unsafe_allow_html=True)
     col1, col2 = st.columns([0.40, 0.60])
     with col1:
         st.markdown('<div class="faded-chart">', unsafe_allow_html=True)
-        (render_fa_type_pie_chart(df_processed) if page_type == "FA-1" else render_controller_stats_chart())
+        (render_fa_type_pie_chart(df_processed, aggregates) if page_type == "FA-1" else render_controller_stats_chart())
         st.markdown('</div>', unsafe_allow_html=True)
     with col2:
-        title_text = f"สถานะคำขอที่กำลังดำเนินการ {page_type}"
-        ses_key = f"num_{page_type.lower()}_items"
-        if ses_key not in st.session_state:
-            st.session_state[ses_key] = 3
-        is_fa2 = (page_type == "FA-2")
-        df_ongoing = df_fa2 if is_fa2 else (
-            df_processed[df_processed["CurrentStage"] != "ได้รับอนุญาต"]
-            .sort_values(by="วันที่ยื่นคำขอ")
-        )
-        search_term = st.session_state.get("company_search", "")
-        if search_term:
-            df_ongoing = df_ongoing[df_ongoing["Company (FA)"].str.contains(search_term, case=False, na=False)]
-        active_filter = st.session_state.get("active_filter", "ทั้งหมด")
-        if active_filter != "ทั้งหมด" and "ApplicationType" in df_ongoing.columns:
-            df_ongoing = df_ongoing[df_ongoing["ApplicationType"] == active_filter]
-        total_items  = len(df_ongoing)
-        init_visible = min(st.session_state[ses_key], total_items)
-        full_list_html = generate_application_list_html(
-            df_ongoing, total_items, is_fa2_list=is_fa2
-        )
-        SCROLL_HEIGHT = 460
-        IFRAME_HEIGHT = int(max(530, min(780, SCROLL_HEIGHT + 220)))
-        components.html(f"""
-<!doctype html>
-<html lang="th"><head><meta charset="utf-8" />
-<style>
-  :root {{ --primary:#00A99D; --primary-color:#00A99D; --border:#E5E7EB; }}
-  * {{ box-sizing:border-box; }}
-  html,body{{margin:0;font-family:'Sarabun',system-ui,-apple-system,Segoe UI,Roboto,sans-serif;background:#FBFBFD}}
-  .card{{ width:100%; border:1.5px solid var(--border); border-radius:16px; background:#FFFFFF;
-          padding:18px 20px 22px; box-shadow:0 4px 14px rgba(0,0,0,.06); }}
-  .title{{ margin:0 0 10px 0; font-size:24px; font-weight:800; color:#0F172A; }}
-  .band{{ background:linear-gradient(90deg,#FAFAFF 0%,#FFF6E5 100%); border-radius:12px; padding:0; }}
-  .scroller{{ max-height:{SCROLL_HEIGHT}px; overflow-y:auto; padding:12px; border-radius:12px; }}
-  .scroller::-webkit-scrollbar{{ width:10px; }} .scroller::-webkit-scrollbar-thumb{{ background:#E5E7EB; border-radius:8px; }}
-  .scroller{{ scrollbar-width:thin; scrollbar-color:#E5E7EB transparent; }}
-  .list-item{{ margin-bottom:16px; }}
-  .info-row{{ display:flex; justify-content:space-between; align-items:center; background:#fff; border:1px solid #F3F4F6; border-radius:8px; padding:12px 16px; margin-top:8px; }}
-  .info-row .name{{ font-size:16px; color:#111827; font-weight:600; }}
-  .info-row .meta{{ font-size:13px; color:#6B7280; }}
-  .more-wrap{{display:flex;justify-content:center;margin-top:14px}}
-  .more-btn{{ text-decoration:none; display:inline-block; border-radius:10px; padding:12px 28px; font-weight:800; background:#28BF7B; color:#fff; letter-spacing:.2px; box-shadow:0 6px 16px rgba(40,191,123,.25); cursor:pointer; }}
-  .more-btn[aria-disabled="true"]{{pointer-events:none;opacity:.45}}
-</style>
-</head>
-<body>
-  <div class="card">
-    <div class="title">{title_text}</div>
-    <div class="band">
-      <div id="listScroller" class="scroller">
-        {full_list_html}
-      </div>
-    </div>
-    <div class="more-wrap">
-      <a id="moreBtn" class="more-btn" href="#" aria-disabled="{str(init_visible>=total_items).lower()}">เพิ่มเติม</a>
-    </div>
-  </div>
-  <script>
-    (function(){{
-      const STEP = 3;
-      const initVisible = {init_visible};
-      const host = document.getElementById('listScroller');
-      const items = Array.from(host.querySelectorAll('.list-item'));
-      const btn = document.getElementById('moreBtn');
-      function apply(n){{ items.forEach((el,i)=> el.style.display = (i<n)?'block':'none'); btn.setAttribute('aria-disabled',(n>=items.length)?'true':'false'); }}
-      let current = Math.min(initVisible, items.length);
-      apply(current);
-      btn.addEventListener('click', function(e){{
-        e.preventDefault();
-        if (btn.getAttribute('aria-disabled')==='true') return;
-        current = Math.min(items.length, current + STEP);
-        apply(current);
-        host.scrollTo({{ top: host.scrollHeight, behavior: 'smooth' }});
-      }});
-    }})();
-  </script>
-</body></html>
-        """, height=620, width=1020, scrolling=False)
+        list_slot = st.empty()
     st.markdown('</div>', unsafe_allow_html=True)
+    if page_type == "FA-1":
+        render_expiry_panel(df_processed, expiry_index)
+    return list_slot
+
+def filter_ongoing_applications(page_type, df_processed, df_fa2):
+    return ongoing_applications(
+        page_type, df_processed, df_fa2,
+        search_term=st.session_state.get("company_search", ""),
+        active_filter=st.session_state.get("active_filter", "ทั้งหมด"),
+    )
+
+def render_application_list(page_type, df_processed, df_fa2):
+    title_text = f"สถานะคำขอที่กำลังดำเนินการ {page_type}"
+    ses_key = f"num_{page_type.lower()}_items"
+    if ses_key not in st.session_state:
+        st.session_state[ses_key] = 3
+    is_fa2 = (page_type == "FA-2")
+    df_ongoing = filter_ongoing_applications(page_type, df_processed, df_fa2)
+    total_items  = len(df_ongoing)
+    init_visible = min(st.session_state[ses_key], total_items)
+    full_list_html = generate_application_list_html(df_ongoing, total_items, is_fa2_list=is_fa2)
+    components.html(
+        application_list_panel_html(title_text, full_list_html, init_visible, total_items),
+        **APPLICATION_LIST_FRAME,
+    )
+    company_column = "company_affiliation_text" if is_fa2 else "Company (FA)"
+    render_company_picker(df_ongoing.get(company_column, pd.Series(dtype="str")), f"open_{page_type.lower()}_company")
+
+def open_company(companies, key=None, fa_type=ALL_TYPES):
+    st.session_state.current_page = COMPANY_PAGE
+    st.session_state.pop("header_page_selectbox", None)
+    st.session_state.drilldown_fa_type = fa_type if fa_type in companies.by_type else ALL_TYPES
+    if key in companies.names:
+        st.session_state.drilldown_company = key
+    elif fa_type in companies.by_type:
+        st.session_state.drilldown_company = companies.by_type[fa_type][0]
+
+def render_company_picker(names, picker_key):
+    # The lists are plain HTML (the pending one in an iframe) and cannot call
+    # back into Python, so a company of the list is opened from here.
+    companies = bundle.companies
+    keys = [k for k in dict.fromkeys(company_keys(names)) if k in companies.names]
+    if not keys:
+        return
+    st.selectbox(
+        "เปิดดูรายละเอียดบริษัท", keys, index=None, format_func=companies.names.get,
+        placeholder="เลือกบริษัทในรายการเพื่อดูรายละเอียด", label_visibility="collapsed",
+        key=picker_key, on_change=open_company_from_picker, args=(companies, picker_key),
+    )
+    # Inside a fragment the callback only reruns the fragment; the page
+    # switch needs the whole app.
+    if st.session_state.current_page == COMPANY_PAGE:
+        st.rerun()
+
+def open_company_from_picker(companies, picker_key):
+    key = st.session_state[picker_key]
+    st.session_state[picker_key] = None
+    if key is not None:
+        open_company(companies, key)
+
+def open_company_from_query(companies):
+    # Deep links: ?company=<name> or ?fa_type=<type> open the company page.
+    params = st.query_params
+    if COMPANY_PARAM not in params and FA_TYPE_PARAM not in params:
+        return
+    key = company_key(params[COMPANY_PARAM]) if COMPANY_PARAM in params else None
+    open_company(companies, key, params.get(FA_TYPE_PARAM, ALL_TYPES))
+    for param in (COMPANY_PARAM, FA_TYPE_PARAM):
+        st.query_params.pop(param, None)
+
+def with_durations(rows, columns, durations):
+    table = rows[[c for c in columns if c in rows.columns]]
+    return table.join(durations(rows).add_prefix("วัน: "))
+
+def render_company_page(fa1, fa2, companies):
+    c_type, c_company = st.columns([0.25, 0.75])
+    with c_type:
+        fa_type = st.selectbox("ประเภท", [ALL_TYPES, *companies.by_type], key="drilldown_fa_type")
+    keys = sorted(companies.names, key=companies.names.get) if fa_type == ALL_TYPES else companies.by_type[fa_type]
+    if st.session_state.get("drilldown_company") not in keys:
+        st.session_state.pop("drilldown_company", None)
+    with c_company:
+        key = st.selectbox("บริษัท", keys, format_func=companies.names.get, key="drilldown_company")
+    if key is None:
+        return
+    fa1_rows, fa2_rows = company_rows(companies, key, fa1, fa2)
+    st.markdown(f'<div class="list-title">{companies.names[key]} · {companies.fa_type[key]}</div>', unsafe_allow_html=True)
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("คำขอ FA-1", len(fa1_rows))
+    app_types = fa1_rows.get("ApplicationType", pd.Series(dtype=str)).value_counts()
+    m2.metric("รายใหม่ / ต่ออายุ", f'{app_types.get("รายใหม่", 0)} / {app_types.get("ต่ออายุ", 0)}')
+    m3.metric("ผู้ควบคุม FA-2", len(fa2_rows))
+    expiry = fa1_rows["วันครบอายุเห็นชอบ"].max() if "วันครบอายุเห็นชอบ" in fa1_rows.columns else pd.NaT
+    m4.metric("วันครบอายุเห็นชอบล่าสุด", expiry.strftime("%d/%m/%Y") if pd.notna(expiry) else "-")
+    st.markdown('<div class="list-title">ประวัติการให้ความเห็นชอบและต่ออายุ (FA-1)</div>', unsafe_allow_html=True)
+    st.dataframe(with_durations(fa1_rows, COMPANY_FA1_COLUMNS, fa1_durations), hide_index=True, use_container_width=True)
+    st.markdown('<div class="list-title">ผู้ควบคุมและระยะเวลาแต่ละขั้นตอน (FA-2)</div>', unsafe_allow_html=True)
+    st.dataframe(with_durations(fa2_rows, COMPANY_FA2_COLUMNS, fa2_durations), hide_index=True, use_container_width=True)
+
+def refresh_status_text(worker, bundle):
+    if bundle.as_of is not None:
+        return f"ข้อมูลย้อนหลัง ณ {bundle.as_of:%d/%m/%Y} · ชุดข้อมูล {bundle.version}"
+    every = f"{worker.interval // 60} นาที" if worker.interval % 60 == 0 else f"{worker.interval} วินาที"
+    text = f"รีเฟรชทุก {every} · อัปเดตล่าสุด {bundle.built_at:%H:%M:%S} ({bundle.build_seconds:.1f} วินาที)"
+    if worker.last_error:
+        failed_at, _ = worker.last_error
+        text += f' · <span class="refresh-error">รีเฟรชไม่สำเร็จ {failed_at:%H:%M:%S}</span>'
+    return text
+
+def bundle_as_of(live):
+    # ?as_of= swaps in the data as it was ingested on that date; every page
+    # below renders whichever bundle it is given.
+    as_of = st.query_params.get(AS_OF_PARAM)
+    if not as_of:
+        return live
+    try:
+        day = pd.Timestamp(as_of).normalize()
+    except ValueError:
+        day = None
+    if day is not None and day > pd.Timestamp.today().normalize():
+        st.warning(f"วันที่ {as_of} ยังมาไม่ถึง จึงแสดงข้อมูลล่าสุด")
+        return live
+    entry = entry_as_of(as_of, read_log()) if day is not None else None
+    past = get_history_bundle(as_of, entry["seq"]) if entry is not None else None
+    if past is None:
+        st.warning(f"ไม่พบข้อมูล ณ วันที่ {as_of} จึงแสดงข้อมูลล่าสุด")
+        return live
+    return past
+
+refresh_worker = get_refresh_worker()
+# One bundle per rerun: the worker may publish a newer one meanwhile, but
+# this run (and the fragments it started) keep reading the same snapshot.
+bundle = bundle_as_of(refresh_worker.current)
 
-today = datetime.now().strftime("%d/%m/%Y")
 st.markdown(
     f"""
     <style>
@@ -992,9 +365,16 @@ st.markdown(
         z-index: 9999;
         text-align: right;
     }}
+    .custom-footer-date .refresh-status {{
+        font-size: 13px;
+        font-weight: 500;
+        color: #6B7280;
+    }}
+    .custom-footer-date .refresh-error {{ color: #DC2626; }}
     </style>
     <div class="custom-footer-date">
-        ข้อมูล ณ วันที่ {today}
+        ข้อมูล ณ วันที่ {bundle.built_at:%d/%m/%Y}
+        <div class="refresh-status">{refresh_status_text(refresh_worker, bundle)}</div>
     </div>
     """,
     unsafe_allow_html=True
@@ -1007,15 +387,24 @@ if "active_filter" not in st.session_state:
 if "company_search" not in st.session_state:
     st.session_state.company_search = ""
 
-df_processed = load_and_prepare_data("testdata/FA-1 (ปี 2565)(test).xlsx")
-df_fa2_progress = load_fa2_progress_data("testdata/FA-2 (ปี 2565)(test) progress.xlsx")
+df_processed = bundle.fa1
+df_fa2_progress = bundle.fa2
+expiry_index = bundle.expiry_index
+fa1_aggregates = bundle.aggregates
 
-render_header_and_switcher()
+open_company_from_query(bundle.companies)
+c_controls = render_header_and_switcher()
 
 page = st.session_state.get("current_page", "FA Dashboard Summary")
+list_slot = None
 if page == "FA Dashboard Summary":
     render_dashboard_summary()
 elif page == "FA-1":
-    render_fa_page("FA-1", df_processed, df_fa2_progress)
+    list_slot = render_fa_page("FA-1", df_processed, df_fa2_progress, expiry_index, fa1_aggregates)
 elif page == "FA-2":
-    render_fa_page("FA-2", df_processed, df_fa2_progress)
\ No newline at end of file
+    list_slot = render_fa_page("FA-2", df_processed, df_fa2_progress, expiry_index, fa1_aggregates)
+elif page == COMPANY_PAGE:
+    render_company_page(df_processed, df_fa2_progress, bundle.companies)
+
+with c_controls:
+    render_header_filters(page, list_slot, df_processed, df_fa2_progress)
\ No newline at end of file
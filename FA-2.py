@@ -1,12 +1,18 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 
+from fa_data import load_controller_changes, dataset_version, FA2_SOURCE_PATHS
+from fa_tenure import build_tenure_index
+from fa_series import downsample_frame, render_mode
+from fa_rollups import prepare_changes, build_rollups, combine_years, CHANGE_TYPES
+
 st.set_page_config(page_title="FA Executive Dashboard", layout="wide")
+# painted before the first (cold) data load below
+st.title("📊 FA Executive Summary Dashboard")
 
 # ------------------------------
-# 🔹 ข้อมูลตัวอย่างเบื้องต้น
+# 🔹 ข้อมูลตัวอย่าง (ใช้เมื่อไม่พบไฟล์ Dataset/FA-2)
 # ------------------------------
 data = [
     {
@@ -50,56 +56,48 @@ data = [
     }
 ]
 
-df = pd.DataFrame(data)
-
 # ------------------------------
-# 🔹 การแปลงประเภทข้อมูล
+# 🔹 การแปลงประเภทข้อมูล / Rollups รายปีงบประมาณ (สร้างครั้งเดียวต่อชุดข้อมูล)
 # ------------------------------
-df["วันที่ยื่นแบบ"] = pd.to_datetime(df["วันที่ยื่นแบบ"])
-df["ลงวันที่"] = pd.to_datetime(df["ลงวันที่"])
-df["วันที่แต่งตั้ง/พ้นตำแหน่ง"] = pd.to_datetime(df["วันที่แต่งตั้ง/พ้นตำแหน่ง"])
+@st.cache_data
+def load_changes(version):
+    # version = fingerprint of the source files: parsed and derived once per
+    # file change, sidebar reruns only read the cached frame
+    try:
+        raw = load_controller_changes()
+    except Exception:
+        raw = pd.DataFrame(data)
+    return prepare_changes(raw)
 
-# ------------------------------
-# 🔹 สร้าง Column เพิ่มเติม
-# ------------------------------
-df["ประเภทการเปลี่ยนแปลง"] = np.select(
-    [
-        (df["แต่งตั้ง"] == "P") & (df["พ้นตำแหน่ง"] == "P"),
-        (df["แต่งตั้ง"] == "P"),
-        (df["พ้นตำแหน่ง"] == "P")
-    ],
-    ["ทั้งสอง", "แต่งตั้ง", "พ้นตำแหน่ง"],
-    default="ไม่มี"
-)
+@st.cache_resource
+def load_rollups(version):
+    return build_rollups(load_changes(version))
 
-df["จำนวนบุคคล"] = df["ชื่อบุคคล"].apply(lambda x: len(str(x).split(",")))
-df["ปี"] = df["วันที่แต่งตั้ง/พ้นตำแหน่ง"].dt.year
-df["ปี-เดือน"] = df["วันที่แต่งตั้ง/พ้นตำแหน่ง"].dt.to_period("M").astype(str)
-df["ระยะเวลายื่นแบบ"] = (df["ลงวันที่"] - df["วันที่ยื่นแบบ"]).dt.days
-df["พบข้อมูลความผิด"] = df["ผลการตรวจประวัติ"].str.contains("ไม่พบ").apply(lambda x: 0 if x else 1)
+version = dataset_version(*FA2_SOURCE_PATHS)
+df = load_changes(version)
+rollups = load_rollups(version)
 
 # ------------------------------
 # 🔹 Sidebar Filters
 # ------------------------------
 st.sidebar.header("🔍 ตัวกรองข้อมูล")
-years = df["ปี"].dropna().unique().tolist()
-selected_years = st.sidebar.multiselect("เลือกปี", options=years, default=years)
-filtered_df = df[df["ปี"].isin(selected_years)]
+years = rollups["years"]
+selected_years = st.sidebar.multiselect("เลือกปีงบประมาณ", options=years, default=years)
+summary = combine_years(rollups, selected_years)
+filtered_df = df.loc[summary["rows"]]
 
 # ------------------------------
 # 🔹 KPI Summary
 # ------------------------------
-st.title("📊 FA Executive Summary Dashboard")
-
 col1, col2, col3, col4 = st.columns(4)
-col1.metric("FA ทั้งหมด", filtered_df["ชื่อ FA"].nunique())
-col2.metric("แต่งตั้ง", filtered_df["แต่งตั้ง"].eq("P").sum())
-col3.metric("พ้นตำแหน่ง", filtered_df["พ้นตำแหน่ง"].eq("P").sum())
-col4.metric("จำนวนบุคคล", filtered_df["จำนวนบุคคล"].sum())
+col1.metric("FA ทั้งหมด", summary["fa_count"])
+col2.metric("แต่งตั้ง", summary["appointed"])
+col3.metric("พ้นตำแหน่ง", summary["resigned"])
+col4.metric("จำนวนบุคคล", summary["persons"])
 
 col5, col6 = st.columns(2)
-col5.metric("พบข้อมูลความผิด", filtered_df["พบข้อมูลความผิด"].sum())
-col6.metric("ระยะเวลาดำเนินการเฉลี่ย (วัน)", round(filtered_df["ระยะเวลายื่นแบบ"].mean(), 2))
+col5.metric("พบข้อมูลความผิด", summary["findings"])
+col6.metric("ระยะเวลาดำเนินการเฉลี่ย (วัน)", round(summary["mean_duration"], 2))
 
 st.markdown("---")
 
@@ -107,32 +105,39 @@ st.markdown("---")
 # 🔹 Pie Chart: ประเภทการเปลี่ยนแปลง
 # ------------------------------
 st.subheader("🥧 สัดส่วนประเภทการเปลี่ยนแปลง")
-change_type = filtered_df["ประเภทการเปลี่ยนแปลง"].value_counts().reset_index()
-change_type.columns = ["ประเภทการเปลี่ยนแปลง", "จำนวน"]
+change_type = summary["change_type"][summary["change_type"] > 0].rename_axis("ประเภทการเปลี่ยนแปลง").reset_index(name="จำนวน")
 fig1 = px.pie(change_type, names="ประเภทการเปลี่ยนแปลง", values="จำนวน", title="ประเภทการเปลี่ยนแปลง")
 st.plotly_chart(fig1, use_container_width=True)
 
 # ------------------------------
-# 🔹 Bar Chart: การเปลี่ยนแปลงรายเดือน
+# 🔹 Bar Chart: การเปลี่ยนแปลงรายเดือน / รายไตรมาส
 # ------------------------------
 st.subheader("📅 จำนวนการเปลี่ยนแปลงรายเดือน")
-monthly = filtered_df.groupby(["ปี-เดือน", "ประเภทการเปลี่ยนแปลง"]).size().reset_index(name="จำนวน")
+monthly = summary["monthly"].melt(ignore_index=False, var_name="ประเภทการเปลี่ยนแปลง", value_name="จำนวน").reset_index()
+monthly = monthly[monthly["จำนวน"] > 0]
 fig2 = px.bar(monthly, x="ปี-เดือน", y="จำนวน", color="ประเภทการเปลี่ยนแปลง", barmode="stack",
               title="จำนวนการเปลี่ยนแปลงรายเดือน")
 st.plotly_chart(fig2, use_container_width=True)
 
+quarterly = summary["quarterly"].melt(ignore_index=False, var_name="ประเภทการเปลี่ยนแปลง", value_name="จำนวน").reset_index()
+quarterly["ไตรมาส"] = quarterly["ปีงบประมาณ"].astype(str) + " Q" + quarterly["ไตรมาส"].astype(str)
+quarterly = quarterly[quarterly["จำนวน"] > 0]
+fig2q = px.bar(quarterly, x="ไตรมาส", y="จำนวน", color="ประเภทการเปลี่ยนแปลง", barmode="stack",
+               title="จำนวนการเปลี่ยนแปลงรายไตรมาส (ปีงบประมาณ)")
+st.plotly_chart(fig2q, use_container_width=True)
+
 # ------------------------------
 # 🔹 Boxplot: ระยะเวลาดำเนินการ
 # ------------------------------
 st.subheader("⏳ การกระจายระยะเวลาดำเนินการ (วัน)")
-fig3 = px.box(filtered_df, y="ระยะเวลายื่นแบบ", points="all", title="ระยะเวลาในการยื่นแบบ")
+fig3 = px.box(pd.DataFrame({"ระยะเวลายื่นแบบ": summary["durations"]}), y="ระยะเวลายื่นแบบ", points="all", title="ระยะเวลาในการยื่นแบบ")
 st.plotly_chart(fig3, use_container_width=True)
 
 # ------------------------------
 # 🔹 Heatmap: ความถี่ของการเปลี่ยนแปลงต่อ FA
 # ------------------------------
 st.subheader("🔥 ความถี่ของการเปลี่ยนแปลงต่อ FA")
-heatmap_data = filtered_df.groupby(["ชื่อ FA", "ประเภทการเปลี่ยนแปลง"]).size().unstack(fill_value=0)
+heatmap_data = summary["by_fa"][CHANGE_TYPES].loc[:, lambda t: t.sum() > 0]
 fig4 = px.imshow(heatmap_data, text_auto=True, aspect="auto", title="จำนวนการเปลี่ยนแปลงในแต่ละ FA")
 st.plotly_chart(fig4, use_container_width=True)
 
@@ -140,17 +145,53 @@ st.plotly_chart(fig4, use_container_width=True)
 # 🔹 Histogram: จำนวนบุคคลที่เกี่ยวข้อง
 # ------------------------------
 st.subheader("👥 การกระจายจำนวนบุคคลต่อกรณี")
-fig5 = px.histogram(filtered_df, x="จำนวนบุคคล", nbins=10, title="จำนวนบุคคลที่เกี่ยวข้อง")
+persons_hist = summary["persons_hist"].rename_axis("จำนวนบุคคล").reset_index(name="จำนวน")
+fig5 = px.bar(persons_hist, x="จำนวนบุคคล", y="จำนวน", title="จำนวนบุคคลที่เกี่ยวข้อง")
 st.plotly_chart(fig5, use_container_width=True)
 
 # ------------------------------
 # 🔹 Bar Chart: ความเสี่ยง (พบข้อมูลความผิด)
 # ------------------------------
 st.subheader("⚠️ การพบข้อมูลความผิดแยกตาม FA")
-risk_summary = filtered_df.groupby("ชื่อ FA")["พบข้อมูลความผิด"].sum().reset_index()
+risk_summary = summary["by_fa"]["พบข้อมูลความผิด"].reset_index()
 fig6 = px.bar(risk_summary, x="ชื่อ FA", y="พบข้อมูลความผิด", title="จำนวนความผิดที่พบในแต่ละ FA")
 st.plotly_chart(fig6, use_container_width=True)
 
+# ------------------------------
+# 🔹 Tenure: ผู้ควบคุมฯ ณ วันที่ / ประวัติรายบุคคล
+# ------------------------------
+@st.cache_resource
+def load_tenure_index(version):
+    return build_tenure_index(load_changes(version))
+
+tenure_index = load_tenure_index(version)
+event_dates = df["วันที่แต่งตั้ง/พ้นตำแหน่ง"].dropna()
+
+st.subheader("🗂️ ผู้ควบคุมฯ ณ วันที่")
+c_fa, c_date = st.columns(2)
+fa_name = c_fa.selectbox("ชื่อ FA", sorted(tenure_index.trees))
+as_of = c_date.date_input("ณ วันที่", value=event_dates.max() if len(event_dates) else "today")
+st.dataframe(tenure_index.controllers_on(fa_name, as_of), use_container_width=True)
+
+@st.fragment
+def render_active_counts(first, last):
+    # Zooming = picking a narrower range: only this chart reruns, the daily
+    # counts are built for that range alone and each FA's step series is cut
+    # to its change points before it is sent.
+    start, end = st.slider("ช่วงวันที่", min_value=first, max_value=last, value=(first, last), format="DD/MM/YYYY")
+    active = tenure_index.active_counts(pd.date_range(start, end, freq="D"))
+    active = active.rename_axis("วันที่").reset_index().melt(id_vars="วันที่", var_name="ชื่อ FA", value_name="จำนวนผู้ควบคุมฯ")
+    active = downsample_frame(active, "วันที่", "จำนวนผู้ควบคุมฯ", by="ชื่อ FA", method="step")
+    fig7 = px.line(active, x="วันที่", y="จำนวนผู้ควบคุมฯ", color="ชื่อ FA", line_shape="hv",
+                   render_mode=render_mode(len(active)), title="จำนวนผู้ควบคุมฯ ที่ดำรงตำแหน่งต่อ FA")
+    st.plotly_chart(fig7, use_container_width=True)
+
+if len(event_dates):
+    render_active_counts(event_dates.min().date(), event_dates.max().date())
+
+person = st.selectbox("ประวัติรายบุคคล", sorted(tenure_index.by_person))
+st.dataframe(tenure_index.person_history(person), use_container_width=True)
+
 # ------------------------------
 # 🔹 Data Table
 # ------------------------------
@@ -0,0 +1,237 @@
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, quote
+
+import pandas as pd
+
+from fa_data import (
+    prepare_fa1_data, prepare_fa2_progress_data, ongoing_applications, dataset_version,
+    FA1_DATA_PATH, FA2_PROGRESS_PATH,
+)
+from fa_expiry import build_expiry_index, default_horizon
+from fa_backlog import daily_backlog
+from fa_series import downsample, window, CHART_WIDTH_PX, MAX_WIDTH_PX, METHODS
+from fa_charts import kpi_cards
+from fa_assets import STATIC_DIR, MANIFEST_NAME
+from fa_export import export_to_file, EXPORT_MIMES, EXPORT_PATH
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+STATIC_PREFIX = "/static/"
+SERIES_PREFIX = "/api/series/"
+PAGE_TYPES = ("FA-1", "FA-2")
+EXPORT_BLOCK_BYTES = 1 << 20
+# Payloads that also depend on today's date (the expiry horizon), not just
+# on the dataset version.
+DATED_PATHS = {"/api/kpis"}
+# Built asset names carry their content hash, so they never change in place.
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+class DatasetStore:
+    # Prepared frames for the current dataset version. Rebuilt only when the
+    # source files change; readers grab one immutable snapshot dict.
+    def __init__(self, fa1_path=FA1_DATA_PATH, fa2_path=FA2_PROGRESS_PATH):
+        self.fa1_path = fa1_path
+        self.fa2_path = fa2_path
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def version(self):
+        return dataset_version(self.fa1_path, self.fa2_path)
+
+    def snapshot(self, version=None):
+        version = version or self.version()
+        snap = self._snapshot
+        if snap is not None and snap["version"] == version:
+            return snap
+        with self._lock:
+            if self._snapshot is None or self._snapshot["version"] != version:
+                df_fa1 = prepare_fa1_data(self.fa1_path)
+                self._snapshot = {
+                    "version": version,
+                    "fa1": df_fa1,
+                    "fa2": prepare_fa2_progress_data(self.fa2_path),
+                    "expiry_index": build_expiry_index(df_fa1),
+                    "backlog": daily_backlog(df_fa1),
+                }
+            return self._snapshot
+
+
+def _int_param(query, name, default, upper=None):
+    try:
+        value = max(0, int(query.get(name, [default])[0]))
+    except ValueError:
+        value = default
+    return min(value, upper) if upper is not None else value
+
+
+def _page(df, query):
+    offset = _int_param(query, "offset", 0)
+    limit = _int_param(query, "limit", DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    rows = df.iloc[offset:offset + limit]
+    return {
+        "total": len(df),
+        "offset": offset,
+        "limit": limit,
+        "items": json.loads(rows.to_json(orient="records", date_format="iso", force_ascii=False)),
+    }
+
+
+def _series(frame, query, method):
+    # One column of a daily series, cut to ?start=&end= and downsampled to
+    # ?width= pixels; what a chart fetches when it is zoomed.
+    column = query.get("column", [frame.columns[-1]])[0]
+    if column not in frame.columns:
+        return None
+    method = query.get("method", [method])[0]
+    if method not in METHODS:
+        method = "lttb"
+    width = _int_param(query, "width", CHART_WIDTH_PX, MAX_WIDTH_PX)
+    try:
+        x, y = window(frame.index.to_numpy(), frame[column].to_numpy(), query.get("start", [None])[0], query.get("end", [None])[0])
+    except ValueError:
+        return None
+    x, y = downsample(x, y, width, method)
+    return {
+        "column": column,
+        "method": method,
+        "total": len(frame),
+        "points": len(x),
+        "x": pd.DatetimeIndex(x).strftime("%Y-%m-%d").tolist(),
+        "y": y.tolist(),
+    }
+
+
+def _pending(snap, page_type, query):
+    return ongoing_applications(
+        page_type, snap["fa1"], snap["fa2"],
+        search_term=query.get("search", [""])[0],
+        active_filter=query.get("filter", ["ทั้งหมด"])[0],
+    )
+
+
+def build_response(snap, path, query):
+    if path == "/api/version":
+        return {"version": snap["version"]}
+    if path == "/api/fa1":
+        return _page(snap["fa1"], query)
+    if path == "/api/fa2":
+        return _page(snap["fa2"], query)
+    if path == "/api/kpis":
+        return {"kpis": kpi_cards(snap["expiry_index"])}
+    if path in [f"/api/pending/{t}" for t in PAGE_TYPES]:
+        return _page(_pending(snap, path.rsplit("/", 1)[1], query), query)
+    if path == "/api/series/backlog":
+        return _series(snap["backlog"], query, "step")
+    return None
+
+
+def make_etag(version, path, query, today=None):
+    canonical = path + "?" + "&".join(f"{k}={v}" for k in sorted(query) for v in query[k])
+    if path in DATED_PATHS:
+        canonical += f"#{default_horizon(today)[0]:%Y-%m-%d}"
+    return '"' + version + "-" + hashlib.sha1(canonical.encode()).hexdigest()[:16] + '"'
+
+
+class FAApiHandler(BaseHTTPRequestHandler):
+    store = None
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.startswith(STATIC_PREFIX):
+            self._send_static(url.path[len(STATIC_PREFIX):])
+            return
+        query = parse_qs(url.query)
+        if url.path.startswith(EXPORT_PATH):
+            self._send_export(url.path[len(EXPORT_PATH):], query)
+            return
+        version = self.store.version()
+        etag = make_etag(version, url.path, query)
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payload = build_response(self.store.snapshot(version), url.path, query)
+        if payload is None:
+            self._send_json(404, {"error": "not found"})
+            return
+        # Chart iframes (a null origin) fetch the series cross-origin.
+        self._send_json(200, payload, etag, cors=url.path.startswith(SERIES_PREFIX))
+
+    def _send_json(self, status, payload, etag=None, cors=False):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if cors:
+            self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_static(self, name):
+        root = STATIC_DIR.resolve()
+        path = (root / name).resolve()
+        if root not in path.parents or not path.is_file():
+            self._send_json(404, {"error": "not found"})
+            return
+        body = path.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache" if path.name == MANIFEST_NAME else IMMUTABLE_CACHE)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_export(self, name, query):
+        # The pending list as CSV / XLSX: written in chunks to a temp file,
+        # then copied to the socket block by block, never held whole.
+        page_type, _, fmt = name.rpartition(".")
+        if page_type not in PAGE_TYPES or fmt not in EXPORT_MIMES:
+            self._send_json(404, {"error": "not found"})
+            return
+        df = _pending(self.store.snapshot(), page_type, query)
+        with export_to_file(df, fmt) as fh:
+            self.send_response(200)
+            self.send_header("Content-Type", EXPORT_MIMES[fmt])
+            self.send_header("Content-Length", str(os.fstat(fh.fileno()).st_size))
+            self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(name)}")
+            self.end_headers()
+            shutil.copyfileobj(fh, self.wfile, EXPORT_BLOCK_BYTES)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=8502, fa1_path=FA1_DATA_PATH, fa2_path=FA2_PROGRESS_PATH):
+    handler = type("Handler", (FAApiHandler,), {"store": DatasetStore(fa1_path, fa2_path)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the prepared FA datasets.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--fa1", default=FA1_DATA_PATH)
+    parser.add_argument("--fa2", default=FA2_PROGRESS_PATH)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.fa1, args.fa2)
+
+
+if __name__ == "__main__":
+    main()
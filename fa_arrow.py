@@ -0,0 +1,163 @@
+import contextlib
+import fcntl
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from fa_expiry import ExpiryIndex
+
+# Prepared frames live here as uncompressed Arrow IPC files, one directory
+# per dataset version. Every process on the host memory-maps the same files,
+# so the pages are shared through the OS page cache instead of being copied
+# into each worker's heap.
+ARROW_DIR = Path(os.environ.get("FA_ARROW_DIR", "Dataset/arrow"))
+KEEP_VERSIONS = 2
+LOCK_NAME = "build.lock"
+COMPLETE_MARKER = "COMPLETE"
+
+# Arrow strings map onto pandas' pyarrow-backed "str" dtype, which wraps the
+# mapped buffers as-is; numpy's object strings would copy every value.
+_STRING_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+_TYPES = {pa.string(): _STRING_DTYPE, pa.large_string(): _STRING_DTYPE}
+
+
+def _to_arrow(df, preserve_index):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=preserve_index)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # Mixed object columns (numbers and text from Excel) go in as text.
+        mixed = {c: "str" for c in df.columns if df[c].dtype == object}
+        return pa.Table.from_pandas(df.astype(mixed), preserve_index=preserve_index)
+
+
+def write_table(path, df, preserve_index=False, metadata=None, compression=None):
+    # One record batch: a numeric column spread over several chunks has to
+    # be concatenated (copied) when it is turned back into numpy. Compressed
+    # files ("zstd") are decompressed on read, so only for cold storage.
+    table = _to_arrow(df, preserve_index).combine_chunks()
+    if metadata:
+        table = table.replace_schema_metadata({**table.schema.metadata, **metadata})
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+
+
+def _map_table(path):
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def _to_pandas(table):
+    return table.to_pandas(types_mapper=_TYPES.get, split_blocks=True)
+
+
+def read_table(path):
+    return _to_pandas(_map_table(path))
+
+
+def write_series(path, series):
+    name = "" if series.name is None else str(series.name)
+    write_table(path, series.to_frame("value"), preserve_index=True, metadata={b"series_name": name.encode()})
+
+
+def read_series(path):
+    table = _map_table(path)
+    series = _to_pandas(table)["value"]
+    series.name = table.schema.metadata[b"series_name"].decode() or None
+    return series
+
+
+def _expiry_frame(index: ExpiryIndex):
+    return pd.DataFrame({
+        "dates": index.dates,
+        "positions": index.positions.astype(np.int64),
+        "companies": pd.Series(index.companies, dtype="str"),
+    })
+
+
+def _expiry_index(frame):
+    return ExpiryIndex(
+        frame["dates"].to_numpy(dtype="datetime64[ns]"),
+        frame["positions"].to_numpy(),
+        frame["companies"].to_numpy(dtype=object),
+    )
+
+
+def version_dir(version, arrow_dir=ARROW_DIR):
+    return Path(arrow_dir) / version
+
+
+def publish_dataset(version, fa1, fa2, expiry_index, backlog, aggregates, quarantine=None, arrow_dir=ARROW_DIR):
+    # Written into a private temp directory and renamed into place, so a
+    # reader sees either no version directory or a complete one.
+    arrow_dir = Path(arrow_dir)
+    arrow_dir.mkdir(parents=True, exist_ok=True)
+    final = version_dir(version, arrow_dir)
+    if (final / COMPLETE_MARKER).is_file():
+        return final
+    tmp = arrow_dir / f".{version}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    write_table(tmp / "fa1.arrow", fa1)
+    write_table(tmp / "fa2.arrow", fa2)
+    write_table(tmp / "expiry.arrow", _expiry_frame(expiry_index))
+    write_table(tmp / "backlog.arrow", backlog, preserve_index=True)
+    for name, series in aggregates.items():
+        write_series(tmp / f"agg_{name}.arrow", series)
+    for name, rows in (quarantine or {}).items():
+        write_table(tmp / f"quarantine_{name}.arrow", rows)
+    (tmp / COMPLETE_MARKER).touch()
+    try:
+        os.rename(tmp, final)
+    except OSError:
+        # Another process published the same version first.
+        shutil.rmtree(tmp, ignore_errors=True)
+    prune_versions(arrow_dir, keep=version)
+    return final
+
+
+def attach_dataset(version, arrow_dir=ARROW_DIR):
+    # Memory-maps a published version read-only; None if nobody built it yet.
+    path = version_dir(version, arrow_dir)
+    if not (path / COMPLETE_MARKER).is_file():
+        return None
+    aggregates = {}
+    for file in sorted(path.glob("agg_*.arrow")):
+        aggregates[file.stem[4:]] = read_series(file)
+    return {
+        "fa1": read_table(path / "fa1.arrow"),
+        "fa2": read_table(path / "fa2.arrow"),
+        "expiry_index": _expiry_index(read_table(path / "expiry.arrow")),
+        "backlog": read_table(path / "backlog.arrow"),
+        "aggregates": aggregates,
+        "quarantine": {file.stem[11:]: read_table(file) for file in sorted(path.glob("quarantine_*.arrow"))},
+    }
+
+
+def prune_versions(arrow_dir=ARROW_DIR, keep=None, count=KEEP_VERSIONS):
+    # Unlinking a mapped file is safe on Linux: processes still serving an
+    # old version keep their mapping until they drop it.
+    versions = sorted(
+        (p for p in Path(arrow_dir).iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime, reverse=True,
+    )
+    for path in versions[count:]:
+        if path.name != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def build_lock(arrow_dir=ARROW_DIR):
+    # Host-wide: while one process parses the sources, the others wait here
+    # and then attach to what it published.
+    arrow_dir = Path(arrow_dir)
+    arrow_dir.mkdir(parents=True, exist_ok=True)
+    with open(arrow_dir / LOCK_NAME, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
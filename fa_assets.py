@@ -0,0 +1,221 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import urllib.request
+from pathlib import Path
+
+from plotly.offline import get_plotlyjs
+
+from fa_theme import DASHBOARD_CSS, CHART_PANEL_CSS, MATERIAL_ICONS_LINK, SARABUN_IMPORT
+
+STATIC_DIR = Path("static")
+MANIFEST_NAME = "manifest.json"
+LOGO_PATH = Path("SEC_Thailand_Logo.svg.png")
+# Where the browser finds STATIC_DIR. The default is Streamlit's app/static/
+# route (server.enableStaticServing, see .streamlit/config.toml), which sends
+# no Cache-Control; the Docker image points this at fa_api.py's /static/,
+# which marks the hashed files immutable, when built with a public API URL.
+ASSET_URL_PREFIX = os.environ.get("FA_ASSET_URL_PREFIX") or "app/static/"
+
+GOOGLE_FONT_CSS = {
+    "sarabun": "https://fonts.googleapis.com/css2?family=Sarabun:wght@400;500;600;700;800&display=swap",
+    "icons": "https://fonts.googleapis.com/icon?family=Material+Icons+Outlined",
+}
+# Google serves woff2 only to browsers it recognises.
+FONT_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+SARABUN_WEIGHTS = {"Regular": 400, "Medium": 500, "SemiBold": 600, "Bold": 700, "ExtraBold": 800}
+FONT_SUFFIXES = (".woff2", ".woff", ".ttf", ".otf")
+ICONS_CLASS_CSS = """
+.material-icons-outlined {
+  font-family: 'Material Icons Outlined';
+  font-weight: normal;
+  font-style: normal;
+  font-size: 24px;
+  line-height: 1;
+  letter-spacing: normal;
+  text-transform: none;
+  display: inline-block;
+  white-space: nowrap;
+  word-wrap: normal;
+  direction: ltr;
+  -webkit-font-feature-settings: 'liga';
+  -webkit-font-smoothing: antialiased;
+}
+"""
+
+
+def minify_css(css):
+    css = re.sub(r"</?style>", "", css)
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _hashed_name(name, data):
+    stem, dot, suffix = name.partition(".")
+    return f"{stem}.{hashlib.sha1(data).hexdigest()[:10]}{dot}{suffix}"
+
+
+def _write(out_dir, name, data, manifest):
+    hashed = _hashed_name(name, data)
+    (out_dir / hashed).write_bytes(data)
+    manifest[name] = hashed
+    return hashed
+
+
+def _fetch(url):
+    req = urllib.request.Request(url, headers={"User-Agent": FONT_USER_AGENT})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return resp.read()
+
+
+def fetch_google_fonts(fonts_dir):
+    # One-off download of the Google Fonts CSS and every font file it
+    # references; the CSS is rewritten to point at the local copies.
+    fonts_dir = Path(fonts_dir)
+    fonts_dir.mkdir(parents=True, exist_ok=True)
+    for name, url in GOOGLE_FONT_CSS.items():
+        css = _fetch(url).decode("utf-8")
+
+        def localise(match):
+            data = _fetch(match.group(1))
+            file_name = _hashed_name(f"{name}.woff2", data)
+            (fonts_dir / file_name).write_bytes(data)
+            return f"url({file_name})"
+
+        css = re.sub(r"url\((https://[^)]+)\)", localise, css)
+        if name == "icons":
+            css = re.sub(r"\.material-icons-outlined\s*\{[^}]*\}", "", css) + ICONS_CLASS_CSS
+        (fonts_dir / f"{name}.css").write_text(css, encoding="utf-8")
+
+
+def local_font_faces(fonts_dir):
+    # @font-face rules for font files dropped into fonts_dir, either from
+    # fetch_google_fonts() (sarabun.css / icons.css) or by hand
+    # (Sarabun-Bold.ttf, MaterialIconsOutlined-Regular.otf, ...).
+    fonts_dir = Path(fonts_dir)
+    faces, files, has_icons = [], [], False
+    for name in ("sarabun", "icons"):
+        css_path = fonts_dir / f"{name}.css"
+        if css_path.is_file():
+            css = css_path.read_text(encoding="utf-8")
+            faces.append(css)
+            files += re.findall(r"url\(([^)]+)\)", css)
+            has_icons |= name == "icons"
+    if faces:
+        return "\n".join(faces), files, has_icons
+    for path in sorted(fonts_dir.glob("*")):
+        if path.suffix not in FONT_SUFFIXES:
+            continue
+        if path.stem.startswith("Sarabun-") and path.stem[8:] in SARABUN_WEIGHTS:
+            family, weight = "Sarabun", SARABUN_WEIGHTS[path.stem[8:]]
+        elif path.stem.startswith("MaterialIconsOutlined"):
+            family, weight, has_icons = "Material Icons Outlined", 400, True
+        else:
+            continue
+        faces.append(
+            f"@font-face{{font-family:'{family}';font-style:normal;font-weight:{weight};"
+            f"font-display:swap;src:url({path.name})}}"
+        )
+        files.append(path.name)
+    if has_icons:
+        faces.append(ICONS_CLASS_CSS)
+    return "\n".join(faces), files, has_icons
+
+
+def build_assets(out_dir=STATIC_DIR, fonts_dir=None, logo_path=LOGO_PATH):
+    out_dir = Path(out_dir)
+    if out_dir.is_dir():
+        shutil.rmtree(out_dir)
+    (out_dir / "fonts").mkdir(parents=True)
+    manifest = {}
+
+    font_css, has_icons = "", False
+    if fonts_dir and Path(fonts_dir).is_dir():
+        font_css, files, has_icons = local_font_faces(fonts_dir)
+        for file_name in files:
+            data = (Path(fonts_dir) / file_name).read_bytes()
+            hashed = _hashed_name(file_name, data)
+            (out_dir / "fonts" / hashed).write_bytes(data)
+            font_css = font_css.replace(f"url({file_name})", f"url(fonts/{hashed})")
+
+    dashboard_css = DASHBOARD_CSS
+    if font_css:
+        dashboard_css = dashboard_css.replace(SARABUN_IMPORT, "")
+    _write(out_dir, "dashboard.css", minify_css(font_css + dashboard_css).encode("utf-8"), manifest)
+    _write(out_dir, "charts.css", minify_css(CHART_PANEL_CSS).encode("utf-8"), manifest)
+    _write(out_dir, "plotly.min.js", get_plotlyjs().encode("utf-8"), manifest)
+    if Path(logo_path).is_file():
+        _write(out_dir, "logo.png", Path(logo_path).read_bytes(), manifest)
+    manifest["local_fonts"] = bool(font_css)
+    manifest["local_icons"] = has_icons
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+@functools.lru_cache(maxsize=4)
+def _read_manifest(path, mtime_ns):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def load_manifest(static_dir=STATIC_DIR):
+    # Re-read only when the file changes, so a rebuild is picked up live.
+    path = Path(static_dir) / MANIFEST_NAME
+    try:
+        return _read_manifest(str(path), path.stat().st_mtime_ns)
+    except (OSError, ValueError):
+        return {}
+
+
+def asset_url(name, prefix=ASSET_URL_PREFIX):
+    hashed = load_manifest().get(name)
+    return prefix + hashed if hashed else None
+
+
+def plotly_js_source():
+    return asset_url("plotly.min.js") or "cdn"
+
+
+def stylesheet(name, css):
+    url = asset_url(name)
+    if url is None:
+        return f"<style>{css}</style>"
+    return f'<link rel="stylesheet" href="{url}">'
+
+
+def page_head_html():
+    # Without a build (python fa_assets.py) the page falls back to the
+    # inline CSS and the Google Fonts links.
+    url = asset_url("dashboard.css")
+    if url is None:
+        return MATERIAL_ICONS_LINK + DASHBOARD_CSS
+    head = f'<link rel="stylesheet" href="{url}">'
+    if not load_manifest().get("local_icons"):
+        head = MATERIAL_ICONS_LINK + head
+    return head
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build hashed, locally served CSS, fonts, logo and plotly.js into ./static.")
+    parser.add_argument("--out", default=str(STATIC_DIR))
+    parser.add_argument("--fonts-dir", default="fonts", help="local Sarabun / Material Icons files")
+    parser.add_argument("--fetch-fonts", action="store_true", help="download the Google fonts into --fonts-dir first")
+    args = parser.parse_args()
+    if args.fetch_fonts:
+        fetch_google_fonts(args.fonts_dir)
+    manifest = build_assets(args.out, args.fonts_dir)
+    for name, hashed in manifest.items():
+        if isinstance(hashed, str):
+            print(f"{name:<16} {hashed:<32} {(Path(args.out) / hashed).stat().st_size:>10,} bytes")
+    if not manifest["local_fonts"]:
+        print("no local fonts found; pages keep the Google Fonts links")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+SUBMIT_COLUMN = "วันที่ยื่นคำขอ"
+APPROVE_COLUMN = "วันที่อนุญาต"
+BACKLOG_COLUMNS = ["รับคำขอ", "อนุญาต", "ระหว่างดำเนินการ"]
+
+
+def _as_days(values):
+    return pd.to_datetime(values, errors="coerce").to_numpy(dtype="datetime64[D]")
+
+
+def backlog_events(df: pd.DataFrame, submit_col: str = SUBMIT_COLUMN, approve_col: str = APPROVE_COLUMN):
+    submitted = _as_days(df[submit_col]) if submit_col in df.columns else np.array([], dtype="datetime64[D]")
+    approved = _as_days(df[approve_col]) if approve_col in df.columns else np.full(len(submitted), np.datetime64("NaT"), dtype="datetime64[D]")
+    opened = ~np.isnat(submitted)
+    closed = opened & ~np.isnat(approved)
+    # An approval recorded before its submission (data-entry slip) closes on
+    # the submission day so the backlog never goes negative.
+    close_days = np.maximum(approved[closed], submitted[closed])
+    days = np.concatenate([submitted[opened], close_days])
+    deltas = np.concatenate([np.ones(opened.sum(), dtype=np.int64), -np.ones(closed.sum(), dtype=np.int64)])
+    return days, deltas
+
+
+def daily_backlog(df: pd.DataFrame):
+    # End-of-day counts: arrivals, approvals and applications still open.
+    days, deltas = backlog_events(df)
+    if len(days) == 0:
+        return pd.DataFrame(columns=BACKLOG_COLUMNS, index=pd.DatetimeIndex([], name="วันที่"), dtype="int64")
+    first, last = days.min(), days.max()
+    calendar = np.arange(first, last + np.timedelta64(1, "D"))
+    slot = (days - first).astype(np.int64)
+    arrivals = np.bincount(slot, weights=deltas > 0, minlength=len(calendar)).astype(np.int64)
+    approvals = np.bincount(slot, weights=deltas < 0, minlength=len(calendar)).astype(np.int64)
+    return pd.DataFrame(
+        {"รับคำขอ": arrivals, "อนุญาต": approvals, "ระหว่างดำเนินการ": np.cumsum(arrivals - approvals)},
+        index=pd.DatetimeIndex(calendar, name="วันที่"),
+    )
+
+
+def monthly_throughput(backlog: pd.DataFrame):
+    if backlog.empty:
+        return backlog
+    return backlog.resample("MS").agg({"รับคำขอ": "sum", "อนุญาต": "sum", "ระหว่างดำเนินการ": "last"})
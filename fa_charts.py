@@ -0,0 +1,428 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from fa_workflow import step_idx_from_percent
+from fa_expiry import count_companies_expiring, default_horizon
+from fa_backlog import monthly_throughput
+from fa_series import downsample, render_mode, CHART_WIDTH_PX
+from fa_aggregates import compute_aggregates, app_type_matrix, FA_TYPE_GROUPS, APP_TYPE_CATEGORIES
+from fa_assets import stylesheet, plotly_js_source
+from fa_theme import CHART_PANEL_CSS
+
+# Frame sizes of the iframes each builder's HTML is shown in.
+CONTROLLER_STATS_FRAME = dict(height=600, width=970, scrolling=False)
+FA_TYPE_PIE_FRAME = dict(height=670, width=970)
+FA_APP_TYPE_BAR_FRAME = dict(height=670, width=970)
+BACKLOG_FRAME = dict(height=420)
+APPLICATION_LIST_FRAME = dict(height=620, width=1020, scrolling=False)
+# Query parameters that open the company drill-down page (deep links).
+COMPANY_PARAM = "company"
+FA_TYPE_PARAM = "fa_type"
+# ?as_of=YYYY-MM-DD shows the data as it was ingested on that date.
+AS_OF_PARAM = "as_of"
+# fa_api base URL (e.g. http://localhost:8502). When set, zooming a daily
+# series fetches it again at full resolution for the visible range only.
+SERIES_API_URL = os.environ.get("FA_API_URL", "")
+FA_TYPE_COLORS = ["#60F3FE", "#3AADDF", "#1060AA", "#10456F"]
+# Id of the centre of the FA type chart, which shows the total.
+FA_TYPE_TOTAL_ID = "total"
+
+
+def generate_application_list_html(df_ongoing, num_items_to_show, is_fa2_list=False):
+    if df_ongoing.empty:
+        return "<div style='height:300px; display:flex; align-items:center; justify-content:center; color:#6B7280;'>ไม่มีข้อมูลที่กำลังดำเนินการ</div>"
+    
+    df_to_show = df_ongoing.head(num_items_to_show)
+    if "step_idx" in df_to_show.columns:
+        step_idxs = df_to_show["step_idx"].to_numpy()
+    else:
+        step_idxs = step_idx_from_percent(df_to_show.get("progress_percent_raw", pd.Series(0, index=df_to_show.index)))
+
+    html = []
+    for idx, (_, row) in zip(step_idxs, df_to_show.iterrows()):
+        bar = "<div style='position:relative; display:flex; justify-content:space-between; align-items:center; margin-bottom:8px;'>"
+        bar += "<div style='position:absolute; top:50%; transform:translateY(-50%); left:12px; right:12px; height:4px; background:#e5e7eb; z-index:1;'></div>"
+        pct = (idx / 4) * 100 if idx > 0 else 0
+        if pct > 0:
+            bar += f"<div style='position:absolute; top:50%; transform:translateY(-50%); left:12px; width:calc({pct}% - 12px); height:4px; background:var(--primary-color); z-index:1;'></div>"
+        for i in range(5):
+            active = i <= idx
+            style = f"width:24px; height:24px; border-radius:50%; display:flex; align-items:center; justify-content:center; z-index:2; background:{'var(--primary-color)' if active else '#fff'}; border:2px solid {'var(--primary-color)' if active else '#e5e7eb'};"
+            icon = "<svg width='16' height='16' viewBox='0 0 16 16' fill='none' stroke='white' stroke-width='2' stroke-linecap='round'><path d='M5 8l2.5 2.5L12 6'/></svg>" if active else ""
+            bar += f"<div style='{style}'>{icon}</div>"
+        bar += "</div>"
+        
+        status = "<div style='font-weight:600; font-size:1rem; color:#374151; margin-bottom:4px;'>กำลังดำเนินการให้ความเห็นชอบ</div>"
+        name = row.get("Company (FA)", "N/A")
+        
+        if is_fa2_list:
+            right = row.get("company_affiliation_text", "")
+        else:
+            expire_date = row.get("วันครบอายุเห็นชอบ", "")
+            if pd.notnull(expire_date) and str(expire_date) != "NaT" and str(expire_date) != "nan" and expire_date != "":
+                if hasattr(expire_date, "strftime"):
+                    right = expire_date.strftime("%d/%m/%Y")
+                else:
+                    right = str(expire_date)
+            else:
+                right = "-"
+        info = f"""<div class="info-row"><div class="name">{name}</div><div class="meta">{right}</div></div>"""
+        html.append(f"<div class='list-item'>{status}{bar}{info}</div>")
+        
+    return "".join(html)
+
+
+def generate_expiry_list_html(df_expiring):
+    if df_expiring.empty:
+        return "<div style='padding:24px; text-align:center; color:#6B7280;'>ไม่มีบริษัท ฯ ที่ครบอายุในช่วงวันที่ที่เลือก</div>"
+    html = []
+    for name, expire_date in zip(df_expiring["Company (FA)"], df_expiring["วันครบอายุเห็นชอบ"]):
+        html.append(f"""<div class="info-row"><div class="name">{name}</div><div class="meta">{expire_date.strftime("%d/%m/%Y")}</div></div>""")
+    return "".join(html)
+
+
+def kpi_cards(expiry_index, today=None):
+    expiring = count_companies_expiring(expiry_index, *default_horizon(today))
+    return [
+        {"icon": "history", "title": "จำนวนที่อยู่ระหว่างขอความเห็นชอบ", "value": "25"},
+        {"icon": "task_alt", "title": "จำนวนคำขอที่ดำเนินแล้วเสร็จ", "value": "10"},
+        {"icon": "inventory_2", "title": "จำนวนบริษัท ฯ ที่ต้องเตรียมยื่นคำขอ", "value": f"{expiring:,}"},
+        {"icon": "event_available", "title": "จำนวนคำขอปี 2568 ที่ดำเนินการรวม", "value": "50"},
+    ]
+
+
+def kpi_card_html(k):
+    return f"""<div class="kpi-card">
+                <div class="icon"><span class="material-icons-outlined">{k['icon']}</span></div>
+                <div><div class="title">{k['title']}</div><div class="value">{k['value']} <span class="suffix">บริษัท ฯ.</span></div></div>
+            </div>"""
+
+
+def controller_stats_chart_html(include_plotlyjs=None):
+    cats = ["มีสังกัด", "ไร้สังกัด"]
+    vals = [518, 7]
+    colors = ["#60F3FE", "#B2EBF2"]
+    max_y = max(vals)
+    step = 100 if max_y >= 300 else 50
+    upper = int(np.ceil(max_y / step) * step)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=[cats[0]], y=[vals[0]], name=cats[0],
+        marker_color=colors[0],
+        text=str(vals[0]), textposition="outside",
+        textfont=dict(size=14, color="#1F2937")
+    ))
+    fig.add_trace(go.Bar(
+        x=[cats[1]], y=[vals[1]], name=cats[1],
+        marker_color=colors[1],
+        text=str(vals[1]), textposition="outside",
+        textfont=dict(size=14, color="#1F2937")
+    ))
+
+    fig.update_layout(
+        showlegend=False,
+        barmode="group",
+        height=300,
+        margin=dict(t=20, b=20, l=50, r=10),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        xaxis=dict(showline=False, tickfont=dict(size=14)),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor="#E5E7EB",
+            range=[0, upper],
+            tickmode="linear",
+            dtick=step,
+            tickformat=",d",
+            zeroline=True,
+            zerolinecolor="#E5E7EB",
+            tickfont=dict(size=12)
+        ),
+        uniformtext_minsize=12,
+        uniformtext_mode="hide"
+    )
+
+    chart_html = fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs or plotly_js_source(), config={"displayModeBar": False})
+    return f"""
+    {stylesheet("charts.css", CHART_PANEL_CSS)}
+    <div class="framed-panel">
+      <h2 class="chart-header">ข้อมูลจำนวนผู้ควบคุมการปฏิบัติงาน</h2>
+      <div class="chart-legend wide">
+        <div class="legend-item"><span class="legend-dot" style="background-color:{colors[0]};"></span>{cats[0]}</div>
+        <div class="legend-item"><span class="legend-dot" style="background-color:{colors[1]};"></span>{cats[1]}</div>
+      </div>
+      <div style="display: flex; justify-content: center;">
+        <div style="width: 80%; margin: 0 auto;">
+          {chart_html}
+        </div>
+      </div>
+    </div>
+    """
+
+
+def fa_type_pie_figure(df, aggregates=None):
+    # One ring of FA types around the total. A sunburst rather than a pie:
+    # st.plotly_chart reports clicks on sunburst sectors (not pie slices)
+    # through on_select, which is how the app opens the companies of a type.
+    if "คำนำหน้า" not in df.columns and "ให้ความเห็นชอบ FA" not in df.columns:
+        return
+    aggregates = aggregates if aggregates is not None else compute_aggregates(df)
+    fa_counts = {group: int(aggregates["fa_type"].get(group, 0)) for group in FA_TYPE_GROUPS}
+    total = sum(fa_counts.values())
+    fig = go.Figure(data=[
+        go.Sunburst(
+            ids=[FA_TYPE_TOTAL_ID, *fa_counts],
+            labels=["ทั้งหมด", *fa_counts],
+            parents=["", *[FA_TYPE_TOTAL_ID] * len(fa_counts)],
+            values=[total, *fa_counts.values()],
+            branchvalues="total",
+            marker=dict(colors=["#FFFFFF", *FA_TYPE_COLORS], line=dict(color="#FFFFFF", width=2)),
+            texttemplate=[f"<b>{total}</b>", *["%{value}"] * len(fa_counts)],
+            insidetextfont=dict(size=[48, *[14] * len(fa_counts)], color=["#1F2937", *["white"] * len(fa_counts)]),
+            insidetextorientation="horizontal",
+            hovertemplate="%{label}: %{value}<extra></extra>",
+            sort=False,
+        )
+    ])
+    fig.update_layout(
+        showlegend=False,
+        height=300,
+        margin=dict(t=10, b=10, l=10, r=10),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig
+
+
+def fa_type_legend_html():
+    labels = ["บล.", "บจก.", "ธนาคาร", "ลูก บล."]
+    items = "".join(
+        f'<div class="legend-item"><span class="legend-dot" style="background-color:{color};"></span>{label}</div>'
+        for color, label in zip(FA_TYPE_COLORS, labels)
+    )
+    return f"""<h2 class="chart-header">ข้อมูลบริษัท FA แยกตามประเภท</h2><div class="chart-legend wrap">{items}</div>"""
+
+
+def fa_type_pie_chart_html(df, include_plotlyjs=None, aggregates=None):
+    fig = fa_type_pie_figure(df, aggregates)
+    if fig is None:
+        return
+    chart_html = fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs or plotly_js_source(),
+                             config={"displayModeBar": False})
+    return f"""
+    {stylesheet("charts.css", CHART_PANEL_CSS)}
+    <div class="framed-panel">
+      {fa_type_legend_html()}
+      <div style="display: flex; justify-content: center;">
+        <div style="width: 80%; margin: 0 auto;">
+          {chart_html}
+        </div>
+      </div>
+    </div>
+    """
+
+
+def fa_app_type_bar_chart_html(df, include_plotlyjs=None, aggregates=None):
+    categories = APP_TYPE_CATEGORIES
+    colors = {"รายใหม่": "#4285F4", "ต่ออายุ": "#FBBC05"}
+
+    aggregates = aggregates if aggregates is not None else compute_aggregates(df)
+    data_count = app_type_matrix(aggregates)
+
+    new_vals   = [data_count[c]["รายใหม่"] for c in categories]
+    renew_vals = [data_count[c]["ต่ออายุ"] for c in categories]
+    
+    totals = [a + b for a, b in zip(new_vals, renew_vals)]
+    max_stack = max(totals + [1])
+    step = 5 if max_stack <= 25 else (10 if max_stack <= 50 else 20)
+    upper = int(np.ceil(max_stack / step) * step)
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        name="ต่ออายุ", x=categories, y=renew_vals,
+        marker_color=colors["ต่ออายุ"], text=renew_vals,
+        textposition="inside", textfont=dict(size=12, color="#333")
+    ))
+    
+    fig.add_trace(go.Bar(
+        name="รายใหม่", x=categories, y=new_vals,
+        marker_color=colors["รายใหม่"], text=new_vals,
+        textposition="inside", textfont=dict(size=12, color="white")
+    ))
+    fig.update_layout(
+        barmode="stack",
+        showlegend=False,
+        height=300,
+        margin=dict(t=20, b=20, l=40, r=10), 
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        xaxis=dict(showline=False, tickfont=dict(size=14)),
+        yaxis=dict(
+            showgrid=True, gridcolor="#E5E7EB",
+            range=[0, upper],
+            tickmode="linear",
+            dtick=step,
+            tickformat=",d",
+            zeroline=True, zerolinecolor="#E5E7EB",
+            tickfont=dict(size=12)
+        ),
+        uniformtext_minsize=10
+    )
+
+    chart_html = fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs or plotly_js_source(), config={"displayModeBar": False})
+
+    return f"""
+    {stylesheet("charts.css", CHART_PANEL_CSS)}
+    <div class="framed-panel">
+      <h2 class="chart-header">สถิติ FA ตามประเภทคำขอ</h2>
+      <div class="chart-legend">
+        <div class="legend-item"><span class="legend-square" style="background-color:{colors['รายใหม่']};"></span>รายใหม่</div>
+        <div class="legend-item"><span class="legend-square" style="background-color:{colors['ต่ออายุ']};"></span>ต่ออายุ</div>
+      </div>
+      <div style="display: flex; justify-content: center;">
+        <div style="width: 80%; margin: 0 auto;">
+          {chart_html}
+        </div>
+      </div>
+    </div>
+    """
+
+
+def series_zoom_script(series, column, trace, api_url=None):
+    # On zoom / pan, replaces one trace with the visible range fetched from
+    # fa_api at the plot's pixel width; double-click restores the full range.
+    api_url = SERIES_API_URL if api_url is None else api_url
+    if not api_url:
+        return None
+    url = json.dumps(f"{api_url.rstrip('/')}/api/series/{series}")
+    return (
+        "var gd = document.getElementById('{plot_id}'), ticket = 0;"
+        " gd.on('plotly_relayout', function (e) {"
+        "  var full = e['xaxis.autorange'], start = e['xaxis.range[0]'], end = e['xaxis.range[1]'];"
+        "  if (!full && start === undefined) return;"
+        f"  var q = new URLSearchParams({{column: {json.dumps(column)}, width: Math.round(gd.clientWidth)}});"
+        "  if (!full) { q.set('start', start); q.set('end', end); }"
+        "  var mine = ++ticket;"
+        f"  fetch({url} + '?' + q).then(function (r) {{ return r.json(); }}).then(function (s) {{"
+        f"   if (mine === ticket) Plotly.restyle(gd, {{x: [s.x], y: [s.y]}}, [{trace}]); }});"
+        " });"
+    )
+
+
+def backlog_chart_html(backlog, include_plotlyjs=None):
+    colors = {"รับคำขอ": "#3AADDF", "อนุญาต": "#10456F", "ระหว่างดำเนินการ": "#00A99D"}
+    monthly = monthly_throughput(backlog)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name="รับคำขอ", x=monthly.index, y=monthly["รับคำขอ"],
+        marker_color=colors["รับคำขอ"], xperiod="M1", xperiodalignment="middle"
+    ))
+    fig.add_trace(go.Bar(
+        name="อนุญาต", x=monthly.index, y=monthly["อนุญาต"],
+        marker_color=colors["อนุญาต"], xperiod="M1", xperiodalignment="middle"
+    ))
+    days, open_counts = downsample(backlog.index, backlog["ระหว่างดำเนินการ"], CHART_WIDTH_PX, "step")
+    scatter = go.Scattergl if render_mode(len(days)) == "webgl" else go.Scatter
+    fig.add_trace(scatter(
+        name="ระหว่างดำเนินการ", x=days, y=open_counts,
+        mode="lines", line=dict(color=colors["ระหว่างดำเนินการ"], width=2, shape="hv"),
+        yaxis="y2"
+    ))
+    fig.update_layout(
+        barmode="group",
+        showlegend=False,
+        height=300,
+        margin=dict(t=20, b=20, l=40, r=40),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        xaxis=dict(showline=False, tickfont=dict(size=12)),
+        yaxis=dict(
+            showgrid=True, gridcolor="#E5E7EB",
+            tickformat=",d", rangemode="tozero",
+            zeroline=True, zerolinecolor="#E5E7EB",
+            tickfont=dict(size=12)
+        ),
+        yaxis2=dict(
+            overlaying="y", side="right", showgrid=False,
+            tickformat=",d", rangemode="tozero",
+            tickfont=dict(size=12, color=colors["ระหว่างดำเนินการ"])
+        ),
+    )
+
+    chart_html = fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs or plotly_js_source(),
+                             config={"displayModeBar": False}, post_script=series_zoom_script("backlog", "ระหว่างดำเนินการ", 2))
+    return f"""
+    {stylesheet("charts.css", CHART_PANEL_CSS)}
+    <div class="framed-panel">
+      <h2 class="chart-header">คำขอระหว่างดำเนินการและปริมาณงานรายเดือน</h2>
+      <div class="chart-legend">
+        <div class="legend-item"><span class="legend-square" style="background-color:{colors['รับคำขอ']};"></span>รับคำขอ</div>
+        <div class="legend-item"><span class="legend-square" style="background-color:{colors['อนุญาต']};"></span>อนุญาต</div>
+        <div class="legend-item"><span class="legend-square" style="background-color:{colors['ระหว่างดำเนินการ']};"></span>ระหว่างดำเนินการ (รายวัน)</div>
+      </div>
+      {chart_html}
+    </div>
+    """
+
+
+def application_list_panel_html(title_text, full_list_html, init_visible, total_items):
+    SCROLL_HEIGHT = 460
+    return f"""
+<!doctype html>
+<html lang="th"><head><meta charset="utf-8" />
+<style>
+  :root {{ --primary:#00A99D; --primary-color:#00A99D; --border:#E5E7EB; }}
+  * {{ box-sizing:border-box; }}
+  html,body{{margin:0;font-family:'Sarabun',system-ui,-apple-system,Segoe UI,Roboto,sans-serif;background:#FBFBFD}}
+  .card{{ width:100%; border:1.5px solid var(--border); border-radius:16px; background:#FFFFFF;
+          padding:18px 20px 22px; box-shadow:0 4px 14px rgba(0,0,0,.06); }}
+  .title{{ margin:0 0 10px 0; font-size:24px; font-weight:800; color:#0F172A; }}
+  .band{{ background:linear-gradient(90deg,#FAFAFF 0%,#FFF6E5 100%); border-radius:12px; padding:0; }}
+  .scroller{{ max-height:{SCROLL_HEIGHT}px; overflow-y:auto; padding:12px; border-radius:12px; }}
+  .scroller::-webkit-scrollbar{{ width:10px; }} .scroller::-webkit-scrollbar-thumb{{ background:#E5E7EB; border-radius:8px; }}
+  .scroller{{ scrollbar-width:thin; scrollbar-color:#E5E7EB transparent; }}
+  .list-item{{ margin-bottom:16px; }}
+  .info-row{{ display:flex; justify-content:space-between; align-items:center; background:#fff; border:1px solid #F3F4F6; border-radius:8px; padding:12px 16px; margin-top:8px; }}
+  .info-row .name{{ font-size:16px; color:#111827; font-weight:600; }}
+  .info-row .meta{{ font-size:13px; color:#6B7280; }}
+  .more-wrap{{display:flex;justify-content:center;margin-top:14px}}
+  .more-btn{{ text-decoration:none; display:inline-block; border-radius:10px; padding:12px 28px; font-weight:800; background:#28BF7B; color:#fff; letter-spacing:.2px; box-shadow:0 6px 16px rgba(40,191,123,.25); cursor:pointer; }}
+  .more-btn[aria-disabled="true"]{{pointer-events:none;opacity:.45}}
+</style>
+</head>
+<body>
+  <div class="card">
+    <div class="title">{title_text}</div>
+    <div class="band">
+      <div id="listScroller" class="scroller">
+        {full_list_html}
+      </div>
+    </div>
+    <div class="more-wrap">
+      <a id="moreBtn" class="more-btn" href="#" aria-disabled="{str(init_visible>=total_items).lower()}">เพิ่มเติม</a>
+    </div>
+  </div>
+  <script>
+    (function(){{
+      const STEP = 3;
+      const initVisible = {init_visible};
+      const host = document.getElementById('listScroller');
+      const items = Array.from(host.querySelectorAll('.list-item'));
+      const btn = document.getElementById('moreBtn');
+      function apply(n){{ items.forEach((el,i)=> el.style.display = (i<n)?'block':'none'); btn.setAttribute('aria-disabled',(n>=items.length)?'true':'false'); }}
+      let current = Math.min(initVisible, items.length);
+      apply(current);
+      btn.addEventListener('click', function(e){{
+        e.preventDefault();
+        if (btn.getAttribute('aria-disabled')==='true') return;
+        current = Math.min(items.length, current + STEP);
+        apply(current);
+        host.scrollTo({{ top: host.scrollHeight, behavior: 'smooth' }});
+      }});
+    }})();
+  </script>
+</body></html>
+    """
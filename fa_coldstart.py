@@ -0,0 +1,143 @@
+import argparse
+import ast
+import asyncio
+import http.client
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from fa_loadtest import free_port, DONE_STATUSES
+
+APP_PATH = "FA-1.py"
+# Process start -> first element of the app on the websocket, i.e. the first
+# byte a browser can paint. Override per host with FA_COLDSTART_BUDGET.
+BUDGET_SECONDS = float(os.environ.get("FA_COLDSTART_BUDGET", "6"))
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+_PAGE_MARKER = "--- page imports ---\n"
+
+
+def entry_imports(app):
+    # The import statements at the top level of a page script, as source.
+    tree = ast.parse(open(app, encoding="utf-8").read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def import_profile(app):
+    # Runs the page's imports under -X importtime in a fresh interpreter that
+    # has already loaded what `streamlit run` loads before the script, so
+    # only the page's own cost is counted. Self time per top-level package
+    # (ms), slowest first.
+    code = "\n".join([
+        "import sys, streamlit.web.bootstrap",
+        f"sys.stderr.write({_PAGE_MARKER!r}); sys.stderr.flush()",
+        *entry_imports(app),
+    ])
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(app)))
+    if out.returncode:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1])
+    packages, total = {}, 0
+    for self_us, cumulative_us, indent, name in _IMPORT_LINE.findall(out.stderr.split(_PAGE_MARKER, 1)[1]):
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us) / 1000
+        if not indent:
+            total += int(cumulative_us) / 1000
+    return total, sorted(packages.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def _wait_listening(port, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.01)
+    raise RuntimeError(f"streamlit did not start on port {port}")
+
+
+def _first_http_byte(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("GET", "/")
+    conn.getresponse().read(1)
+    conn.close()
+
+
+async def _first_render(port, t0):
+    # One browser session: time to the first rendered element and to the end
+    # of the first script run.
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    first = None
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        msg = BackMsg()
+        msg.rerun_script.fragment_id = ""
+        await ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await ws.recv())
+            kind = fwd.WhichOneof("type")
+            if first is None and kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                first = time.perf_counter() - t0
+            elif kind == "script_finished" and fwd.script_finished in DONE_STATUSES:
+                return first, time.perf_counter() - t0
+
+
+def cold_start(app, extra_args=(), env=None, timeout=120):
+    port = free_port()
+    t0 = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false", *extra_args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env,
+    )
+    try:
+        _wait_listening(port, t0 + timeout)
+        listening = time.perf_counter() - t0
+        _first_http_byte(port)
+        http_byte = time.perf_counter() - t0
+        first_element, finished = asyncio.run(_first_render(port, t0))
+    finally:
+        server.terminate()
+        server.wait()
+    return {"listening": listening, "http_byte": http_byte, "first_element": first_element, "finished": finished}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure a page script's import profile and cold start (process start to first rendered element) against a time budget.")
+    parser.add_argument("--app", default=APP_PATH)
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to take the median of")
+    parser.add_argument("--budget", type=float, default=BUDGET_SECONDS, help="seconds to first element; exit 1 when the median is over")
+    parser.add_argument("--no-arrow-cache", action="store_true", help="start from an empty Arrow directory so the first run parses the sources")
+    parser.add_argument("--top", type=int, default=10, help="packages to list in the import profile")
+    args = parser.parse_args()
+
+    total, packages = import_profile(args.app)
+    print(f"imports of {args.app}: {total:.0f} ms")
+    for package, ms in packages[:args.top]:
+        print(f"  {package:<24} {ms:>7.1f} ms")
+
+    runs = []
+    for _ in range(args.runs):
+        env = dict(os.environ)
+        with tempfile.TemporaryDirectory() as arrow_dir:
+            if args.no_arrow_cache:
+                env["FA_ARROW_DIR"] = arrow_dir
+            runs.append(cold_start(args.app, env=env))
+    print(f"{'':>14} {'listening':>10} {'http byte':>10} {'1st elem':>10} {'finished':>10}")
+    for i, r in enumerate(runs, 1):
+        print(f"{'run ' + str(i):>14} {r['listening']:>10.2f} {r['http_byte']:>10.2f} {r['first_element']:>10.2f} {r['finished']:>10.2f}")
+    median = statistics.median(r["first_element"] for r in runs)
+    verdict = "ok" if median <= args.budget else "OVER BUDGET"
+    print(f"median first element {median:.2f} s, budget {args.budget:.2f} s: {verdict}")
+    sys.exit(0 if median <= args.budget else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+
+from fa_match import normalize, rule_table
+from fa_workflow import FA1_STAGE_COLUMNS, FA2_STAGE_COLUMNS
+
+FA1_COMPANY_COLUMN = "Company (FA)"
+FA2_COMPANY_COLUMN = "company_affiliation_text"
+# "กสิกรไทย บล." in FA-1 and "กสิกรไทย บล. บมจ." in FA-2 are one company.
+_LEGAL_SUFFIX = r"(\s*(บมจ|บจก)\.?)+$|\s*\(ยังไม่เป็น fa\)$"
+
+
+def company_keys(values):
+    keys = normalize(values)
+    keys = pc.replace_substring(keys, "ธนาคาร", "ธ.")
+    keys = pc.replace_substring_regex(keys, _LEGAL_SUFFIX, "")
+    return np.asarray(keys.to_numpy(zero_copy_only=False), dtype=object)
+
+
+class CompanyIndex(NamedTuple):
+    names: dict
+    fa1: dict
+    fa2: dict
+    fa_type: dict
+    by_type: dict
+
+
+def _positions(df, column):
+    if column not in df.columns or df.empty:
+        return {}, {}
+    codes, keys = pd.factorize(company_keys(df[column].fillna("").astype(str)))
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    first = order[np.r_[0, bounds]]
+    keys = keys.tolist()
+    return dict(zip(keys, np.split(order, bounds))), dict(zip(keys, df[column].to_numpy()[first]))
+
+
+def build_company_index(fa1: pd.DataFrame, fa2: pd.DataFrame):
+    # Company key -> row positions in each dataset, built once per version;
+    # opening a company is then a dict lookup and an iloc.
+    fa1_rows, fa1_names = _positions(fa1, FA1_COMPANY_COLUMN)
+    fa2_rows, fa2_names = _positions(fa2, FA2_COMPANY_COLUMN)
+    names = {k: str(v).strip() for k, v in {**fa2_names, **fa1_names}.items() if k}
+    keys = list(names)
+    labels = rule_table("fa_type").classify(pd.Series([names[k] for k in keys], dtype="str"))
+    fa_type = dict(zip(keys, labels))
+    by_type = {}
+    for key in sorted(keys, key=names.get):
+        by_type.setdefault(fa_type[key], []).append(key)
+    return CompanyIndex(names, fa1_rows, fa2_rows, fa_type, by_type)
+
+
+def company_key(name):
+    return company_keys([name])[0]
+
+
+def company_rows(index: CompanyIndex, key, fa1, fa2):
+    empty = np.array([], dtype=np.intp)
+    return fa1.iloc[index.fa1.get(key, empty)], fa2.iloc[index.fa2.get(key, empty)]
+
+
+def stage_durations(df, stage_columns):
+    # Days spent between consecutive workflow dates, one column per step.
+    stages = [c for c in stage_columns if c in df.columns]
+    out = pd.DataFrame(index=df.index)
+    for prev, nxt in zip(stages, stages[1:]):
+        out[f"{prev} → {nxt}"] = (pd.to_datetime(df[nxt], errors="coerce") - pd.to_datetime(df[prev], errors="coerce")).dt.days
+    return out
+
+
+def fa1_durations(df):
+    return stage_durations(df, FA1_STAGE_COLUMNS)
+
+
+def fa2_durations(df):
+    return stage_durations(df, FA2_STAGE_COLUMNS)
@@ -0,0 +1,194 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from fa_dates import parse_be_dates
+from fa_workflow import workflow_state, FA1_STAGE_COLUMNS, FA2_STAGE_COLUMNS
+from fa_match import rule_table
+from fa_prep import read_source
+from fa_validate import Checks, validate, clear_placeholders
+
+FA1_DATA_PATH = "testdata/FA-1 (ปี 2565)(test).xlsx"
+FA2_PROGRESS_PATH = "testdata/FA-2 (ปี 2565)(test) progress.xlsx"
+APPLICATION_FILTERS = ["ทั้งหมด", "รายใหม่", "ต่ออายุ"]
+# FA-2 approvals feeding the executive dashboard (FA-2.py). Both files hold
+# the same records: the raw CSV export and the cleaned workbook.
+FA2_SOURCE_PATHS = ["Dataset/FA-2 (ปี 2565)(Sheet1).csv", "Dataset/FA-2 Sheet.xlsx"]
+FA2_CONTROLLER_COLUMN = "ให้ความเห็นชอบผู้ควบคุมฯ (แบบ FA-2)"
+FA2_LETTER_COLUMN = "เลขที่หนังสือให้ความเห็นชอบลงวันที่"
+CHANGE_KEY = ["ชื่อ FA", "ชื่อบุคคล", "ประเภท", "วันที่ยื่นแบบ"]
+# Part of every dataset version: bump it when preparation changes what a
+# version holds, so copies published by older code are rebuilt, not attached.
+PREPARE_REVISION = 2
+# Typos such as 25/7/1965 or ลว. 08/05/2466 fall outside this: dropped from
+# the change log, quarantined by validation.
+PLAUSIBLE_DATES = (pd.Timestamp("2000-01-01"), pd.Timestamp("2100-01-01"))
+FA1_DATE_COLUMNS = ["วันครบอายุเห็นชอบ", "วันที่ยื่นคำขอ", "วันที่ตรวจประวัติ", "วันที่อนุญาต", "บันทึกใน ALS"]
+FA1_CHECKS = Checks(
+    dates=tuple(FA1_DATE_COLUMNS),
+    required=("ให้ความเห็นชอบ FA",),
+    key=("ให้ความเห็นชอบ FA", "ประเภทคำขอ", "วันที่ยื่นคำขอ"),
+    plausible=PLAUSIBLE_DATES,
+)
+FA2_CHECKS = Checks(
+    dates=tuple(FA2_STAGE_COLUMNS),
+    required=("ชื่อบริษัท FA",),
+    percents=("progress_percent_raw",),
+    key=("ชื่อบริษัท FA", "ให้ความเห็นชอบผู้ควบคุมฯ (แบบ FA-2)", "วันที่ยื่นคำขอ"),
+    plausible=PLAUSIBLE_DATES,
+)
+
+
+def read_table(file_path: str):
+    # Parquet comes from fa_prep.py; workbooks are still read as-is.
+    if str(file_path).endswith(".parquet"):
+        return pd.read_parquet(file_path)
+    return pd.read_excel(file_path, engine="openpyxl")
+
+
+def prepare_fa1_data(file_path: str, fallback: bool = True, quarantine: dict = None):
+    df = pd.DataFrame()
+    try:
+        df = read_table(file_path)
+    except Exception:
+        if not fallback:
+            raise
+        df = pd.DataFrame({
+            "ให้ความเห็นชอบ FA": ["เอ บจก.", "บี บล.", "ซี ธนาคาร", "ดี ลูก บล."],
+            "ประเภทคำขอ": ["รายใหม่", "ต่ออายุ", "รายใหม่", "ต่ออายุ"],
+            "วันที่ยื่นคำขอ": pd.to_datetime(["2024-11-10", "2024-12-01", "2025-01-03", "2025-01-15"]),
+            "วันที่ตรวจประวัติ": pd.to_datetime([None, "2024-12-10", None, None]),
+            "วันที่อนุญาต": pd.to_datetime([None, None, None, None]),
+            "วันครบอายุเห็นชอบ": pd.to_datetime([None, "2025-10-10", None, "2025-11-20"]),
+            "dashboard": ["25%", "50%", "75%", "0%"],
+        })
+
+    df.columns = df.columns.str.strip()
+    source = df.copy(deep=False)
+    df = clear_placeholders(df)
+    for col in FA1_DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_be_dates(df[col])
+    df, quarantined = validate(df, source, FA1_CHECKS)
+    if quarantine is not None:
+        quarantine["fa1"] = quarantined
+
+    expiry_dates_str = df['วันครบอายุเห็นชอบ'].dt.strftime('%-d/%-m/%Y')
+    app_dates_str = df['วันที่ยื่นคำขอ'].dt.strftime('%-d/%-m/%Y')
+    df['display_date'] = expiry_dates_str.fillna(app_dates_str).fillna("%-d/%-m/%Y")
+    df[["step_idx", "progress_percent_raw"]] = workflow_state(df, FA1_STAGE_COLUMNS)
+    df["Company (FA)"] = (df.get("ให้ความเห็นชอบ FA", pd.Series(dtype=str))
+                          .astype(str)
+                          .str.split("\n", n=1).str[0]
+                          .str.replace('"',"",regex=False)
+                          .str.strip())
+
+    df["ApplicationType"] = rule_table("application_type").classify(df.get("ให้ความเห็นชอบ FA", pd.Series("", index=df.index))).fillna(df.get("ประเภทคำขอ", ""))
+    stage_conditions = [df.get("วันที่อนุญาต", pd.Series(index=df.index)).notna(), df.get("วันที่ตรวจประวัติ", pd.Series(index=df.index)).notna(), df.get("วันที่ยื่นคำขอ", pd.Series(index=df.index)).notna()]
+    df["CurrentStage"] = np.select(stage_conditions, ["ได้รับอนุญาต","ตรวจประวัติ","ยื่นคำขอ"], default="N/A")
+    return df
+
+
+def prepare_fa2_progress_data(file_path: str, fallback: bool = True, quarantine: dict = None):
+    df = pd.DataFrame()
+    try:
+        df = read_table(file_path)
+    except Exception:
+        if not fallback:
+            raise
+        df = pd.DataFrame({ "ให้ความเห็นชอบผู้ควบคุมฯ (แบบ FA-2)": ["สมชาย ใจดี", "ปนัดดา ชูชนะ", "วรรณวร งามโรจน์", "ณัฐธาวุฒิ เดชจินดา"], "ชื่อบริษัท FA": ["เอ บจก.", "บลู เวลธ์ บล.", "ธนาคาร บ้านบ้าน", "ลูก บล. ตัวอย่าง"], "progress_percent_raw": [50, 75, 75, 25], })
+    df.columns = df.columns.str.strip()
+    source = df.copy(deep=False)
+    df = clear_placeholders(df)
+    for col in FA2_STAGE_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_be_dates(df[col])
+    df, quarantined = validate(df, source, FA2_CHECKS)
+    if quarantine is not None:
+        quarantine["fa2"] = quarantined
+    df.rename(columns={"ให้ความเห็นชอบผู้ควบคุมฯ (แบบ FA-2)": "Company (FA)"}, inplace=True)
+    df["company_affiliation_text"] = df.get("ชื่อบริษัท FA", "N/A").fillna("N/A").astype(str)
+    if "progress_percent_raw" not in df.columns:
+        df[["step_idx", "progress_percent_raw"]] = workflow_state(df, FA2_STAGE_COLUMNS)
+    if "ApplicationType" not in df.columns:
+        df["ApplicationType"] = "ทั้งหมด"
+    return df
+
+
+def flat_headers(columns):
+    # "ให้ความเห็นชอบ\nผู้ควบคุมฯ \n(แบบ FA-2)" in the workbook is
+    # "ให้ความเห็นชอบผู้ควบคุมฯ (แบบ FA-2)" in the CSV.
+    return columns.astype(str).str.replace("\n", "", regex=False).str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def _plausible_dates(values):
+    parsed = parse_be_dates(values)
+    return parsed.where(parsed.between(*PLAUSIBLE_DATES))
+
+
+def controller_changes(df: pd.DataFrame):
+    # FA-2 approval rows in the shape of the executive change log: an
+    # approved controller is an appointment dated by วันที่อนุญาต.
+    df = df[df["ชื่อบริษัท FA"].notna() | df[FA2_CONTROLLER_COLUMN].notna()]
+    letter = df[FA2_LETTER_COLUMN].astype("str")
+    # "จท. 519/2561\nลว. 24/12/61": letter number, then the signing date
+    signed = letter.str.extract(r"ลว\.?\s*(\d{1,2}/\d{1,2}/)(\d{2,4})")
+    signed = signed[0] + signed[1].where(signed[1].str.len() == 4, "25" + signed[1])
+    approved = _plausible_dates(df["วันที่อนุญาต"])
+    return pd.DataFrame({
+        "ลำดับ": pd.to_numeric(df["ลำดับที่"], errors="coerce"),
+        "ชื่อ FA": df["ชื่อบริษัท FA"].str.strip(),
+        "แต่งตั้ง": np.where(approved.notna(), "P", ""),
+        "พ้นตำแหน่ง": "",
+        "ประเภท": "ผู้ควบคุมฯ " + df["ประเภทคำขอ"].fillna("ไม่ระบุ").str.strip(),
+        # a second line, where present, is the national ID number
+        "ชื่อบุคคล": df[FA2_CONTROLLER_COLUMN].str.split("\n", n=1).str[0].str.strip(),
+        "วันที่ยื่นแบบ": _plausible_dates(df["วันที่ยื่นคำขอ"]),
+        "เลขหนังสือ": letter.str.split("\n", n=1).str[0].str.strip(),
+        "ลงวันที่": _plausible_dates(signed),
+        "วันที่แต่งตั้ง/พ้นตำแหน่ง": approved,
+        "วันที่ตรวจประวัติ": _plausible_dates(df["วันที่ตรวจประวัติ"]),
+        # the sources record when the check was done, not its result
+        "ผลการตรวจประวัติ": pd.Series(np.nan, index=df.index, dtype="str"),
+    })
+
+
+def load_controller_changes(paths=FA2_SOURCE_PATHS):
+    frames = []
+    for path in paths:
+        if os.path.exists(path):
+            df = read_source(path)
+            df.columns = flat_headers(df.columns)
+            frames.append(controller_changes(df))
+    if not frames:
+        raise FileNotFoundError(f"none of {paths} found")
+    changes = pd.concat(frames, ignore_index=True)
+    return changes.drop_duplicates(subset=CHANGE_KEY).reset_index(drop=True)
+
+
+def ongoing_applications(page_type, df_processed, df_fa2, search_term="", active_filter="ทั้งหมด"):
+    is_fa2 = (page_type == "FA-2")
+    df_ongoing = df_fa2 if is_fa2 else (
+        df_processed[df_processed["CurrentStage"] != "ได้รับอนุญาต"]
+        .sort_values(by="วันที่ยื่นคำขอ")
+    )
+    if search_term:
+        df_ongoing = df_ongoing[df_ongoing["Company (FA)"].str.contains(search_term, case=False, na=False, regex=False)]
+    if active_filter != "ทั้งหมด" and "ApplicationType" in df_ongoing.columns:
+        df_ongoing = df_ongoing[df_ongoing["ApplicationType"] == active_filter]
+    return df_ongoing
+
+
+def dataset_version(*paths):
+    # Cheap fingerprint of the source files: changes whenever a workbook is
+    # re-saved, without reading its contents.
+    h = hashlib.sha1(f"revision:{PREPARE_REVISION}".encode())
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            h.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+        except OSError:
+            h.update(f"{path}:missing".encode())
+    return h.hexdigest()[:16]
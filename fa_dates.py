@@ -0,0 +1,36 @@
+import re
+
+import pandas as pd
+
+BE_YEAR_OFFSET = 543
+BE_YEAR_THRESHOLD = 2300
+# a time, if any, follows on the same or the next line: "03/07/2567\n10:02"
+_SLASH_DATE = r"^(\d{1,2})/(\d{1,2})/(\d{4})(?:\s.*)?$"
+
+
+def _slash_dates(parts):
+    # The sheets write dates day-first (24/12/2561), but cells Excel saved in
+    # a US locale come out month-first (4/19/2562). A column counts as
+    # month-first only if some second field cannot be a month and no first
+    # field can be.
+    first, second, year = parts[0], parts[1], parts[2]
+    if second.gt(12).any() and not first.gt(12).any():
+        first, second = second, first
+    year = year.where(year <= BE_YEAR_THRESHOLD, year - BE_YEAR_OFFSET)
+    return pd.to_datetime(pd.DataFrame({"year": year, "month": second, "day": first}), errors="coerce")
+
+
+def parse_be_dates(values):
+    s = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        parsed = s.copy()
+    else:
+        text = s.astype("str").str.strip()
+        parts = text.str.extract(_SLASH_DATE, flags=re.S).astype("float")
+        slash = parts[2].notna()
+        parsed = pd.to_datetime(text.where(~slash), errors="coerce", format="mixed")
+        if slash.any():
+            parsed[slash] = _slash_dates(parts[slash])
+    mask = parsed.dt.year.gt(BE_YEAR_THRESHOLD).fillna(False)
+    parsed.loc[mask] = parsed.loc[mask] - pd.DateOffset(years=BE_YEAR_OFFSET)
+    return parsed
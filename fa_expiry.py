@@ -0,0 +1,46 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+EXPIRY_COLUMN = "วันครบอายุเห็นชอบ"
+EXPIRY_HORIZON_DAYS = 90
+
+
+class ExpiryIndex(NamedTuple):
+    dates: np.ndarray
+    positions: np.ndarray
+    companies: np.ndarray
+
+
+def build_expiry_index(df: pd.DataFrame, column: str = EXPIRY_COLUMN):
+    if column not in df.columns or df.empty:
+        empty = np.array([], dtype="datetime64[ns]")
+        return ExpiryIndex(empty, np.array([], dtype=np.intp), np.array([], dtype=object))
+    dates = pd.to_datetime(df[column], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    positions = np.flatnonzero(~np.isnat(dates))
+    order = np.argsort(dates[positions], kind="stable")
+    positions = positions[order]
+    companies = df.get("Company (FA)", pd.Series("", index=df.index)).to_numpy(dtype=object)[positions]
+    return ExpiryIndex(dates[positions], positions, companies)
+
+
+def _window(index: ExpiryIndex, start, end):
+    lo = np.searchsorted(index.dates, np.datetime64(pd.Timestamp(start), "ns"), side="left")
+    hi = np.searchsorted(index.dates, np.datetime64(pd.Timestamp(end), "ns"), side="right")
+    return lo, hi
+
+
+def expiring_between(index: ExpiryIndex, start, end):
+    lo, hi = _window(index, start, end)
+    return index.positions[lo:hi]
+
+
+def count_companies_expiring(index: ExpiryIndex, start, end):
+    lo, hi = _window(index, start, end)
+    return len(pd.unique(index.companies[lo:hi]))
+
+
+def default_horizon(today=None, days: int = EXPIRY_HORIZON_DAYS):
+    start = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    return start, start + pd.Timedelta(days=days)
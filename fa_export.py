@@ -0,0 +1,86 @@
+import io
+import os
+import tempfile
+from urllib.parse import urlencode, quote
+
+import pandas as pd
+
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_DROP_COLUMNS = ["display_date", "company_affiliation_text"]
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MIME = "text/csv"
+EXPORT_MIMES = {"csv": CSV_MIME, "xlsx": XLSX_MIME}
+# fa_api.py streams exports from disk; without it the page falls back to
+# st.download_button, which holds the whole file in memory.
+EXPORT_API_URL = os.environ.get("FA_API_URL", "")
+EXPORT_PATH = "/api/export/"
+
+
+def export_frame(df: pd.DataFrame):
+    return df.drop(columns=[c for c in EXPORT_DROP_COLUMNS if c in df.columns])
+
+
+def iter_chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_csv(df: pd.DataFrame, fh, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    # utf-8-sig so Excel opens the Thai headers correctly
+    fh.write("\ufeff".encode("utf-8"))
+    if df.empty:
+        fh.write(df.head(0).to_csv(index=False).encode("utf-8"))
+    for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+        fh.write(chunk.to_csv(index=False, header=(i == 0), date_format="%d/%m/%Y").encode("utf-8"))
+
+
+def write_xlsx(df: pd.DataFrame, fh, chunk_rows: int = EXPORT_CHUNK_ROWS, sheet_title: str = "export"):
+    # openpyxl costs ~100 ms to import; only pay it when someone exports
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+    ws.append([str(c) for c in df.columns])
+    for chunk in iter_chunks(df, chunk_rows):
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            ws.append(row)
+    wb.save(fh)
+
+
+def export_to_file(df: pd.DataFrame, fmt: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    # Chunks go straight to an unnamed temp file on disk, which disappears
+    # when the returned handle is closed; the caller owns it.
+    df = export_frame(df)
+    fh = io.BufferedWriter(tempfile.TemporaryFile(buffering=0))
+    try:
+        if fmt == "xlsx":
+            write_xlsx(df, fh, chunk_rows)
+        elif fmt == "csv":
+            write_csv(df, fh, chunk_rows)
+        else:
+            raise ValueError(f"unsupported export format: {fmt}")
+        fh.flush()
+    except BaseException:
+        fh.close()
+        raise
+    raw = fh.detach()
+    raw.seek(0)
+    return raw
+
+
+def export_bytes(df: pd.DataFrame, fmt: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    # For st.download_button, which reads the whole payload into memory
+    # anyway; the temp file is closed (and so deleted) once read.
+    with export_to_file(df, fmt, chunk_rows) as fh:
+        return fh.read()
+
+
+def export_url(page_type, fmt, search_term="", active_filter="ทั้งหมด", api_url=None):
+    # Link to the streamed export on fa_api.py; None when no API is configured.
+    api_url = EXPORT_API_URL if api_url is None else api_url
+    if not api_url:
+        return None
+    query = urlencode({"search": search_term, "filter": active_filter}, quote_via=quote)
+    return f"{api_url.rstrip('/')}{EXPORT_PATH}{quote(page_type)}.{fmt}?{query}"
@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fa_aggregates import row_keys, row_hashes, diff_versions
+from fa_arrow import write_table, read_table, build_lock
+
+# Audit trail of the prepared FA-1 / FA-2 frames, one entry per ingested
+# dataset version: a full checkpoint every CHECKPOINT_INTERVAL ingests and
+# row-level deltas (upserted rows, deleted keys) in between, so any past
+# version is one checkpoint plus at most CHECKPOINT_INTERVAL - 1 deltas.
+HISTORY_DIR = Path(os.environ.get("FA_HISTORY_DIR", "Dataset/history"))
+CHECKPOINT_INTERVAL = int(os.environ.get("FA_CHECKPOINT_INTERVAL", "16"))
+LOG_NAME = "log.json"
+COMPRESSION = "zstd"
+KEY, HASH = "_row_key", "_row_hash"
+
+
+def row_identity(df: pd.DataFrame):
+    # The source's row key where it has a usable one; otherwise the row's
+    # content, with identical rows told apart by occurrence.
+    hashes = row_hashes(df).to_numpy(dtype=np.uint64)
+    keys = row_keys(df)
+    if keys is None:
+        nth = pd.Series(hashes).groupby(hashes).cumcount().to_numpy()
+        keys = np.char.add(np.char.add(hashes.astype(str), "."), nth.astype(str))
+    return pd.Index(keys).astype(str), hashes
+
+
+def _file(history_dir, name, seq, kind):
+    return Path(history_dir) / name / f"{seq:06d}.{kind}.arrow"
+
+
+def read_log(history_dir=HISTORY_DIR):
+    path = Path(history_dir) / LOG_NAME
+    return json.loads(path.read_text(encoding="utf-8")) if path.is_file() else []
+
+
+def _write_log(history_dir, log):
+    path = Path(history_dir) / LOG_NAME
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(log, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _ingest_frame(history_dir, name, seq, previous, df, checkpoint):
+    (Path(history_dir) / name).mkdir(parents=True, exist_ok=True)
+    keys, hashes = row_identity(df)
+    rows = df.reset_index(drop=True)
+    rows[KEY], rows[HASH] = keys, hashes
+    head = _file(history_dir, name, previous, "head") if previous is not None else None
+    if checkpoint or head is None or not head.is_file():
+        write_table(_file(history_dir, name, seq, "checkpoint"), rows, compression=COMPRESSION)
+        stats = {"kind": "checkpoint", "rows": len(rows)}
+    else:
+        old = read_table(head)
+        old_keys = pd.Index(old[KEY]).astype(str)
+        inserted, updated, deleted = diff_versions(pd.Series(old[HASH].to_numpy(), index=old_keys), pd.Series(hashes, index=keys))
+        changed = inserted.append(updated)
+        write_table(_file(history_dir, name, seq, "upserts"), rows.iloc[keys.get_indexer(changed)], compression=COMPRESSION)
+        write_table(_file(history_dir, name, seq, "deletes"), pd.DataFrame({KEY: deleted.astype(str)}), compression=COMPRESSION)
+        # Replaying the delta yields the kept rows in their old order, then
+        # the upserts; only when the sheet was re-sorted is the permutation
+        # to its real order stored (as steps, which compress to almost nothing).
+        replay = old_keys[~old_keys.isin(changed.append(deleted))].append(changed)
+        order = replay.get_indexer(keys)
+        reordered = not np.array_equal(order, np.arange(len(order)))
+        if reordered:
+            write_table(_file(history_dir, name, seq, "order"), pd.DataFrame({"step": np.diff(order, prepend=0)}), compression=COMPRESSION)
+        stats = {"kind": "delta", "rows": len(rows), "inserted": len(inserted), "updated": len(updated),
+                 "deleted": len(deleted), "reordered": reordered}
+    # keys + hashes of this version, in its order: what the next ingest diffs against
+    write_table(_file(history_dir, name, seq, "head"), rows[[KEY, HASH]])
+    return stats
+
+
+def ingest(version, frames: dict, history_dir=HISTORY_DIR, ingested_at=None, checkpoint_interval=CHECKPOINT_INTERVAL):
+    # Records one dataset version; a version already at the end of the log
+    # is not recorded twice. The log is replaced last, so a crash mid-ingest
+    # leaves the previous state readable.
+    with build_lock(history_dir):
+        log = read_log(history_dir)
+        if log and log[-1]["version"] == version:
+            return log[-1]
+        seq = log[-1]["seq"] + 1 if log else 0
+        previous = log[-1]["seq"] if log else None
+        checkpoint = seq % checkpoint_interval == 0
+        entry = {
+            "seq": seq,
+            "version": version,
+            "ingested_at": (ingested_at or datetime.now()).isoformat(timespec="seconds"),
+            "datasets": {
+                name: _ingest_frame(history_dir, name, seq, previous, df, checkpoint)
+                for name, df in frames.items()
+            },
+        }
+        _write_log(history_dir, log + [entry])
+        if previous is not None:
+            for name in frames:
+                _file(history_dir, name, previous, "head").unlink(missing_ok=True)
+        return entry
+
+
+def frame_at(log, seq, name, history_dir=HISTORY_DIR):
+    # Newest checkpoint at or before ``seq``, then every delta up to it.
+    # Deltas only move row positions around (``state`` indexes the
+    # checkpoint and upsert files laid end to end); rows are copied once.
+    entries = [e for e in log if e["seq"] <= seq and name in e["datasets"]]
+    start = max(i for i, e in enumerate(entries) if e["datasets"][name]["kind"] == "checkpoint")
+    parts = [read_table(_file(history_dir, name, entries[start]["seq"], "checkpoint"))]
+    keys = pd.Index(parts[0][KEY])
+    state = np.arange(len(keys))
+    for entry in entries[start + 1:]:
+        upserts = read_table(_file(history_dir, name, entry["seq"], "upserts"))
+        deletes = read_table(_file(history_dir, name, entry["seq"], "deletes"))
+        gone = pd.Index(upserts[KEY]).append(pd.Index(deletes[KEY]))
+        state = np.r_[state[~keys[state].isin(gone)], len(keys) + np.arange(len(upserts))]
+        keys = keys.append(pd.Index(upserts[KEY]))
+        parts.append(upserts)
+        if entry["datasets"][name].get("reordered"):
+            state = state[np.cumsum(read_table(_file(history_dir, name, entry["seq"], "order"))["step"].to_numpy())]
+    df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    return df.iloc[state].drop(columns=[KEY, HASH]).reset_index(drop=True)
+
+
+def entry_as_of(when, log):
+    # The last version ingested on or before ``when``; a bare date means the
+    # end of that day.
+    cutoff = pd.Timestamp(when)
+    if cutoff == cutoff.normalize() and not isinstance(when, datetime):
+        cutoff += pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+    before = [e for e in log if pd.Timestamp(e["ingested_at"]) <= cutoff]
+    return before[-1] if before else None
+
+
+def dataset_as_of(when, history_dir=HISTORY_DIR):
+    log = read_log(history_dir)
+    entry = entry_as_of(when, log)
+    if entry is None:
+        return None
+    frames = {name: frame_at(log, entry["seq"], name, history_dir) for name in entry["datasets"]}
+    return {"version": entry["version"], "ingested_at": datetime.fromisoformat(entry["ingested_at"]), **frames}
+
+
+def storage_bytes(history_dir=HISTORY_DIR):
+    return sum(p.stat().st_size for p in Path(history_dir).rglob("*.arrow") if not p.name.endswith(".head.arrow"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the ingested dataset versions, or rebuild the data as of a date.")
+    parser.add_argument("--dir", default=str(HISTORY_DIR))
+    parser.add_argument("--as-of", help="date or datetime, e.g. 2025-01-31")
+    args = parser.parse_args()
+    log = read_log(args.dir)
+    if not log:
+        print(f"no versions in {args.dir}")
+        return
+    if args.as_of:
+        start = time.perf_counter()
+        data = dataset_as_of(args.as_of, args.dir)
+        if data is None:
+            print(f"nothing ingested on or before {args.as_of}")
+            return
+        sizes = ", ".join(f"{k} {len(v):,} rows" for k, v in data.items() if isinstance(v, pd.DataFrame))
+        print(f"{data['version']} (ingested {data['ingested_at']:%Y-%m-%d %H:%M}): {sizes} in {time.perf_counter() - start:.3f} s")
+        return
+    print(f"{'seq':>4} {'ingested':<20} {'version':<17} changes")
+    for e in log:
+        changes = "; ".join(
+            f"{name} {s['kind']} {s['rows']:,}" + (f" +{s['inserted']} ~{s['updated']} -{s['deleted']}" if s["kind"] == "delta" else "")
+            for name, s in e["datasets"].items()
+        )
+        print(f"{e['seq']:>4} {e['ingested_at']:<20} {e['version']:<17} {changes}")
+    print(f"{storage_bytes(args.dir) / 1024:,.0f} KB on disk for {len(log)} versions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+APP_PATH = "FA-1.py"
+PAGES = ["FA Dashboard Summary", "FA-1", "FA-2"]
+FILTER_BUTTONS = ["btn_all", "btn_new", "btn_renew"]
+SEARCH_TERMS = ["บล", "ธนาคาร", "บจก", "ทุน", ""]
+DONE_STATUSES = {
+    ForwardMsg.FINISHED_SUCCESSFULLY,
+    ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+    ForwardMsg.FINISHED_WITH_COMPILE_ERROR,
+}
+
+# One step is (action, argument) and triggers one user-visible rerun, which
+# is what gets timed (a page switch includes the st.rerun() it causes).
+SCRIPTS = {
+    "browse": [("page", "FA-1"), ("page", "FA-2"), ("page", "FA Dashboard Summary")],
+    "filter": [("page", "FA-1"), ("filter", "btn_new"), ("filter", "btn_renew"), ("filter", "btn_all")],
+    "search": [("page", "FA-2"), ("type", "บล"), ("type", ""), ("filter", "btn_renew"), ("type", "ธนาคาร")],
+}
+
+
+def random_script(rng, steps):
+    actions = []
+    for _ in range(steps):
+        kind = rng.choice(["page", "filter", "type"])
+        arg = rng.choice(PAGES if kind == "page" else FILTER_BUTTONS if kind == "filter" else SEARCH_TERMS)
+        actions.append((kind, arg))
+    return actions
+
+
+class Session:
+    # Minimal browser stand-in: keeps the widget ids the server sent, resends
+    # their values on each rerun and waits for the matching script_finished.
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}
+        self.values = {}
+        self.errors = []
+        self.bytes_received = 0
+
+    async def rerun(self, trigger=None, fragment_id=""):
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.fragment_id = fragment_id
+        for key, value in self.values.items():
+            if key in self.widgets:
+                w = state.widget_states.widgets.add()
+                w.id = self.widgets[key][0]
+                w.string_value = value
+        if trigger is not None:
+            w = state.widget_states.widgets.add()
+            w.id = self.widgets[trigger][0]
+            w.trigger_value = True
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            data = await self.ws.recv()
+            self.bytes_received += len(data)
+            fwd = ForwardMsg()
+            fwd.ParseFromString(data)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._record(fwd)
+            elif kind == "script_finished" and fwd.script_finished in DONE_STATUSES:
+                return
+
+    def _record(self, fwd):
+        element = fwd.delta.new_element
+        name = element.WhichOneof("type")
+        if name == "exception":
+            self.errors.append(element.exception.message)
+            return
+        widget_id = getattr(getattr(element, name), "id", "")
+        if widget_id.startswith("$$ID-"):
+            self.widgets[widget_id.rsplit("-", 1)[1]] = (widget_id, fwd.delta.fragment_id)
+
+    async def step(self, kind, arg):
+        if kind == "page":
+            self.values["header_page_selectbox"] = arg
+            return await self.rerun()
+        if kind == "filter":
+            if arg not in self.widgets:
+                return await self.rerun()
+            return await self.rerun(trigger=arg, fragment_id=self.widgets[arg][1])
+        self.values["company_search"] = arg
+        return await self.rerun(fragment_id=self.widgets.get("company_search", ("", ""))[1])
+
+
+async def run_session(url, script, latencies, errors, received, start):
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        session = Session(ws)
+        await start.wait()
+        t0 = time.perf_counter()
+        await session.rerun()
+        latencies.append(time.perf_counter() - t0)
+        for kind, arg in script:
+            t0 = time.perf_counter()
+            await session.step(kind, arg)
+            latencies.append(time.perf_counter() - t0)
+        errors.extend(session.errors)
+        received.append(session.bytes_received)
+
+
+def proc_stats(pid):
+    # (cpu seconds, rss MB) of the server process from /proc; NaN when the
+    # pid of an already running server was not given.
+    if pid is None:
+        return float("nan"), float("nan")
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"/proc/{pid}/status") as f:
+        rss = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+    return cpu, rss / 1024
+
+
+async def run_level(url, pid, sessions, script_name, steps, seed):
+    rng = random.Random(seed)
+    latencies, errors, received = [], [], []
+    start = asyncio.Event()
+    tasks = [
+        asyncio.create_task(run_session(
+            url, SCRIPTS[script_name] if script_name in SCRIPTS else random_script(rng, steps),
+            latencies, errors, received, start,
+        ))
+        for _ in range(sessions)
+    ]
+    await asyncio.sleep(0.5)
+    cpu0, _ = proc_stats(pid)
+    wall0 = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - wall0
+    cpu, rss = proc_stats(pid)
+    lat = np.array(latencies) * 1000
+    return {
+        "sessions": sessions,
+        "reruns": len(lat),
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "max_ms": float(lat.max()),
+        "reruns_per_s": len(lat) / wall,
+        "kb_per_rerun": sum(received) / 1024 / len(lat),
+        "cpu_pct": 100 * (cpu - cpu0) / wall,
+        "rss_mb": rss,
+        "errors": errors,
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"streamlit did not start on port {port}")
+
+
+async def run(args, url, pid):
+    # Warm the shared st.cache_* entries once so level 1 is not a cold start.
+    await run_level(url, pid, 1, "browse", 0, args.seed)
+    print(f"{'N':>4} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'rerun/s':>8} {'KB/rerun':>9} {'CPU %':>7} {'RSS MB':>8}")
+    for n in [int(x) for x in args.sessions.split(",") if x.strip()]:
+        r = await run_level(url, pid, n, args.script, args.steps, args.seed)
+        print(f"{r['sessions']:>4} {r['reruns']:>7} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['max_ms']:>9.1f} "
+              f"{r['reruns_per_s']:>8.1f} {r['kb_per_rerun']:>9.1f} {r['cpu_pct']:>7.0f} {r['rss_mb']:>8.0f}")
+        for e in r["errors"][:5]:
+            print(f"     ! {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive N concurrent websocket sessions against a Streamlit server and report rerun latency.")
+    parser.add_argument("--app", default=APP_PATH)
+    parser.add_argument("--sessions", default="1,2,4,8,16,32", help="comma separated concurrency levels")
+    parser.add_argument("--script", default="random", choices=[*SCRIPTS, "random"])
+    parser.add_argument("--steps", type=int, default=10, help="steps per session for the random script")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, help="use an already running server on this port")
+    parser.add_argument("--pid", type=int, help="server pid for CPU/RSS when --port is given; without it those columns are nan")
+    args = parser.parse_args()
+
+    server = None
+    port, pid = args.port, args.pid
+    if port is None:
+        port = free_port()
+        server = start_server(args.app, port)
+        pid = server.pid
+    try:
+        asyncio.run(run(args, f"ws://127.0.0.1:{port}/_stcore/stream", pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import argparse
+import functools
+import json
+import os
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Optional JSON file that adds or replaces rule tables without code changes:
+# {"fa_type": {"default": "อื่นๆ", "rules": [{"label": "บล.", "all": ["บล."], "none": ["ลูก"]}]}}
+RULES_PATH = os.environ.get("FA_MATCH_RULES", "match_rules.json")
+
+MAX_KEYWORDS = 64
+_ZERO_WIDTH = "[\u200b\u200c\u200d\u2060\ufeff]"
+# Matches every value normalize() would change (checked over all of
+# Unicode): zero-width characters, nikhahit, runs of or non-space
+# whitespace, edge whitespace (Arrow trims more than RE2's \s), and
+# anything utf8_lower rewrites, including the cased letters RE2's \p{Lu}
+# does not know. Everything above the BMP is treated as dirty.
+_EDGE_SPACE = r"[\s\p{Z}\x{0b}\x{1c}-\x{1f}\x{85}]"
+NOT_NORMALIZED = (
+    r"[\x{200b}\x{200c}\x{200d}\x{2060}\x{feff}\x{0e4d}\x{1c89}\x{2160}-\x{216f}\x{24b6}-\x{24cf}\x{a7cb}-\x{a7dc}\x{10000}-\x{10ffff}]"
+    rf"|\s{{2,}}|[^\S ]|^{_EDGE_SPACE}|{_EDGE_SPACE}$|\p{{Lu}}|\p{{Lt}}"
+)
+# classify / flags factorize a column only when a sample suggests fewer
+# distinct values than this share of its rows; otherwise hashing every
+# cell costs more than matching each one.
+FACTORIZE_BELOW = 0.5
+SAMPLE_ROWS = 20_000
+
+
+def normalize(values):
+    # Thai free text as typed into the workbooks: zero-width characters,
+    # nikhahit + sara aa instead of sara am, stray tabs / newlines / double
+    # spaces, mixed-case Latin. Works on an Arrow string array at once; one
+    # regex pass finds the values that need it and only those are rewritten.
+    arr = pa.array(values, type=pa.large_string(), from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    dirty = pc.match_substring_regex(arr, NOT_NORMALIZED).fill_null(False)
+    if not pc.any(dirty).as_py():
+        return arr
+    return pc.replace_with_mask(arr, dirty, _normalize_all(arr.filter(dirty)))
+
+
+def _normalize_all(arr):
+    arr = pc.replace_substring_regex(arr, _ZERO_WIDTH, "")
+    arr = pc.replace_substring(arr, "\u0e4d\u0e32", "\u0e33")
+    arr = pc.replace_substring_regex(arr, r"\s{2,}|[^\S ]", " ")
+    return pc.utf8_lower(pc.utf8_trim_whitespace(arr))
+
+
+class Rule(NamedTuple):
+    label: str
+    all: tuple
+    none: tuple = ()
+
+
+def _mostly_repeated(s):
+    # m cells drawn from D equally common values repeat about m^2 / 2D
+    # times, which estimates D from a sample.
+    if len(s) <= SAMPLE_ROWS:
+        return True
+    sample = s.sample(SAMPLE_ROWS, random_state=0)
+    repeats = SAMPLE_ROWS - sample.nunique(dropna=False)
+    return repeats > 0 and SAMPLE_ROWS ** 2 / (2 * repeats) < FACTORIZE_BELOW * len(s)
+
+
+class RuleTable:
+    # Ordered keyword rules -> labels. A rule matches when every ``all``
+    # keyword and no ``none`` keyword occurs in the text. A column with
+    # many repeats is factorized and its distinct values normalized once; a
+    # mostly distinct one is normalized cell by cell. Each keyword is tested
+    # once with Arrow's substring kernel, the results are packed into one
+    # bitmask per value and every rule is a mask test.
+    def __init__(self, rules, default=None):
+        rules = [Rule(r.label, tuple(r.all), tuple(r.none)) for r in rules]
+        self.keywords = normalize(sorted({k for r in rules for k in r.all + r.none})).unique().to_pylist()
+        if len(self.keywords) > MAX_KEYWORDS:
+            raise ValueError(f"a rule table holds at most {MAX_KEYWORDS} keywords, got {len(self.keywords)}")
+        position = {k: i for i, k in enumerate(self.keywords)}
+        mask = lambda words: np.uint64(sum({1 << position[k] for k in normalize(list(words)).to_pylist()}))
+        self.rules = rules
+        self.masks = [(mask(r.all), mask(r.none)) for r in rules]
+        self.labels = list(dict.fromkeys(r.label for r in rules))
+        self.default = default
+
+    def _scan(self, s):
+        # Keyword bitmask per cell; missing cells match nothing.
+        if _mostly_repeated(s):
+            codes, uniques = pd.factorize(s, use_na_sentinel=True)
+            found = self._match(normalize(uniques.astype(str)))
+            return np.append(found, np.uint64(0))[codes]
+        # nearly every value distinct: match the cells themselves
+        return self._match(normalize(s.astype(str).mask(s.isna())))
+
+    def _match(self, text):
+        found = np.zeros(len(text), dtype=np.uint64)
+        for i, keyword in enumerate(self.keywords):
+            hit = pc.match_substring(text, keyword).fill_null(False).to_numpy(zero_copy_only=False)
+            found |= hit.astype(np.uint64) << np.uint64(i)
+        return found
+
+    def _hits(self, found):
+        return [((found & need) == need) & ((found & forbid) == 0) for need, forbid in self.masks]
+
+    def classify(self, s):
+        # Label of the first matching rule per cell, else ``default``.
+        s = pd.Series(s)
+        hits = self._hits(self._scan(s))
+        pick = np.full(len(s), len(self.rules), dtype=np.intp)
+        for i in reversed(range(len(hits))):
+            pick[hits[i]] = i
+        labels = np.array([rule.label for rule in self.rules] + [self.default], dtype=object)
+        return pd.Series(labels[pick], index=s.index)
+
+    def flags(self, s):
+        # One boolean column per label: any of its rules matched.
+        s = pd.Series(s)
+        table = np.zeros((len(s), len(self.labels)), dtype=bool)
+        for rule, hit in zip(self.rules, self._hits(self._scan(s))):
+            table[:, self.labels.index(rule.label)] |= hit
+        return pd.DataFrame(table, index=s.index, columns=self.labels)
+
+
+_BANK = [Rule("ธนาคาร", ["ธนาคาร"]), Rule("ธนาคาร", ["ธ."])]
+RULE_TABLES = {
+    # คำนำหน้า / company name -> FA type shown in the pie chart
+    "fa_type": dict(default="อื่นๆ", rules=_BANK + [
+        Rule("ลูก บล.", ["ลูก", "บล."]),
+        Rule("บล.", ["บล."]),
+        Rule("บจก.", ["บจก."]),
+    ]),
+    # pie-chart groups; a label may fall into more than one
+    "fa_group": dict(default=None, rules=[
+        Rule("บล.", ["บล."], ["ลูก"]),
+        Rule("บจก.", ["บจก."]),
+        *_BANK,
+        Rule("ลูก บล.", ["ลูก", "บล."]),
+    ]),
+    # bar-chart categories by application type
+    "app_category": dict(default="อื่นๆ", rules=_BANK + [Rule("บจก.", ["บจก."]), Rule("บล.", ["บล."])]),
+    "application_type": dict(default=None, rules=[Rule("รายใหม่", ["เสมือนรายใหม่"])]),
+    # ผลการตรวจประวัติ
+    "background_check": dict(default="พบข้อมูลความผิด", rules=[Rule("ไม่พบข้อมูลความผิด", ["ไม่พบ"])]),
+}
+
+
+def _parse_tables(config):
+    return {
+        name: dict(
+            default=spec.get("default"),
+            rules=[Rule(r["label"], r.get("all", []), r.get("none", [])) for r in spec["rules"]],
+        )
+        for name, spec in config.items()
+    }
+
+
+@functools.lru_cache(maxsize=32)
+def _compiled(name, path, mtime_ns):
+    tables = dict(RULE_TABLES)
+    if path is not None:
+        tables.update(_parse_tables(json.loads(Path(path).read_text(encoding="utf-8"))))
+    return RuleTable(**tables[name])
+
+
+def rule_table(name, path=RULES_PATH):
+    # Compiled once per table and rules-file version.
+    try:
+        mtime_ns = Path(path).stat().st_mtime_ns
+    except OSError:
+        path = mtime_ns = None
+    return _compiled(name, path, mtime_ns)
+
+
+def benchmark(cells, distinct, seed=0):
+    rng = np.random.default_rng(seed)
+    stems = ["ทิสโก้", "ภัทร", "กสิกรไทย", "ไทยพาณิชย์", "เคจีไอ", "ฟินันเซีย", "หยวนต้า", "แลนด์ แอนด์ เฮ้าส์"]
+    forms = ["บล. บมจ.", "ลูก บล.", "ธนาคาร", "ธ.", "บจก.", "จำกัด (มหาชน)"]
+    pool = [f"{f} {stems[i % len(stems)]} {i}" if i % 2 else f"{stems[i % len(stems)]} {f} {i}"
+            for i, f in enumerate(forms[j % len(forms)] for j in range(distinct))]
+    s = pd.Series(rng.choice(pool, cells), dtype="str")
+
+    def per_pattern(s):
+        c = lambda p: s.str.contains(p, regex=False, na=False).to_numpy()
+        bank, sec = c("ธนาคาร") | c("ธ."), c("บล.")
+        return np.select([bank, c("ลูก") & sec, sec, c("บจก.")], ["ธนาคาร", "ลูก บล.", "บล.", "บจก."], default="อื่นๆ")
+
+    table = rule_table("fa_type")
+    t0 = time.perf_counter()
+    baseline = per_pattern(s)
+    t1 = time.perf_counter()
+    labels = table.classify(s)
+    t2 = time.perf_counter()
+    assert (labels.to_numpy() == baseline).all()
+    return t1 - t0, t2 - t1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fa_type rule table against per-pattern str.contains.")
+    parser.add_argument("--cells", type=int, default=1_000_000)
+    parser.add_argument("--distinct", default="500,50000,1000000", help="comma separated distinct-value counts")
+    args = parser.parse_args()
+    print(f"{'distinct':>9} {'contains s':>11} {'rules s':>8} {'M cells/s':>10}")
+    for distinct in [int(x) for x in args.distinct.split(",")]:
+        baseline, rules = benchmark(args.cells, distinct)
+        print(f"{distinct:>9} {baseline:>11.2f} {rules:>8.2f} {args.cells / rules / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fa_dates import parse_be_dates
+
+APP_TYPE_FLAG_COLUMNS = ["รายใหม่", "ต่ออายุ"]
+APP_TYPE_FLAGS = ["P", "1"]
+APPROVAL_RANGE_COLUMN = "วันครบอายุเห็นชอบ"
+QUARTER_COLUMN = "สถิติ"
+DATE_COLUMNS = [
+    "วันที่ยื่นคำขอ", "วันที่ตรวจประวัติ", "เสนอบันทึก ผช.ผอฝ.", "วันที่อนุญาต",
+    "บันทึกใน ALS", "ขึ้น web", "วันครบอายุเห็นชอบ",
+]
+DATE_PLACEHOLDERS = ["___", "-", "nan", "รายใหม่", ""]
+
+
+def read_source(path):
+    # Every column as text, exactly once; later stages do the typing.
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        df = pd.read_csv(path, dtype=str, encoding="utf-8-sig")
+    else:
+        df = pd.read_excel(path, dtype=str, engine="openpyxl")
+    df.columns = df.columns.astype(str).str.strip()
+    return df.drop(columns=[c for c in df.columns if c.startswith("Unnamed:")])
+
+
+def split_approval_range(df):
+    # "08/02/2561 - 07/02/2566" holds the approval and expiry dates together.
+    if APPROVAL_RANGE_COLUMN not in df.columns:
+        return df
+    s = df[APPROVAL_RANGE_COLUMN].astype(str).str.strip()
+    parts = s.str.extract(r"^(?P<start>\S+)\s+-\s+(?P<end>\S+)$")
+    has_range = parts["end"].notna()
+    if not has_range.any():
+        return df
+    df = df.copy()
+    if "วันที่อนุญาต" not in df.columns:
+        df["วันที่อนุญาต"] = None
+    df.loc[has_range, "วันที่อนุญาต"] = df.loc[has_range, "วันที่อนุญาต"].fillna(parts.loc[has_range, "start"])
+    df.loc[has_range, APPROVAL_RANGE_COLUMN] = parts.loc[has_range, "end"]
+    return df
+
+
+def derive_application_type(df):
+    # P or 1 in รายใหม่ / ต่ออายุ marks the application type; the first
+    # marked column wins, as in the original notebook.
+    flag_cols = df.columns.intersection(APP_TYPE_FLAG_COLUMNS)
+    if flag_cols.empty:
+        return df
+    flagged = df[flag_cols].isin(APP_TYPE_FLAGS).to_numpy()
+    marked = flagged.any(axis=1)
+    derived = np.asarray(flag_cols)[flagged.argmax(axis=1)]
+    current = df["ประเภทคำขอ"] if "ประเภทคำขอ" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    return df.assign(ประเภทคำขอ=np.where(marked, derived, current))
+
+
+def parse_date_columns(df):
+    df = df.copy()
+    for col in df.columns.intersection(DATE_COLUMNS):
+        s = df[col].astype(str).str.strip().replace(DATE_PLACEHOLDERS, None)
+        # two-digit BE years: 20/03/65 -> 20/03/2565
+        s = s.str.replace(r"^(\d{1,2}/\d{1,2}/)(\d{2})$", r"\g<1>25\2", regex=True)
+        df[col] = parse_be_dates(s)
+    return df
+
+
+def add_quarter_label(df):
+    # Always recomputed from the submission date, as the notebook did: a
+    # สถิติ column already in the source may be stale or hand-edited.
+    if "วันที่ยื่นคำขอ" not in df.columns:
+        return df
+    quarter = df["วันที่ยื่นคำขอ"].dt.quarter
+    label = ("Quarter " + quarter.astype("Int64").astype(str)).where(quarter.notna(), "")
+    cols = df.columns.tolist()
+    position = cols.index(QUARTER_COLUMN) if QUARTER_COLUMN in cols else len(cols)
+    df = df.drop(columns=[QUARTER_COLUMN], errors="ignore")
+    cols = df.columns.tolist()
+    anchor = next((i + 1 for i, c in enumerate(cols) if "FA-2" in c), min(position, len(cols)))
+    df.insert(anchor, QUARTER_COLUMN, label)
+    return df
+
+
+def to_columnar(df):
+    # Remaining object columns are text; pin them so parquet gets one type.
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].astype("string")
+    return df
+
+
+STAGES = [
+    ("split_approval_range", split_approval_range),
+    ("derive_application_type", derive_application_type),
+    ("parse_date_columns", parse_date_columns),
+    ("add_quarter_label", add_quarter_label),
+    ("to_columnar", to_columnar),
+]
+
+
+def run_stages(df, stages=STAGES):
+    timings = []
+    for name, stage in stages:
+        start = time.perf_counter()
+        df = stage(df)
+        timings.append((name, time.perf_counter() - start))
+    return df, timings
+
+
+def output_path(source, out_dir):
+    return Path(out_dir) / (Path(source).stem + ".parquet")
+
+
+def process_file(source, out_dir):
+    start = time.perf_counter()
+    df = read_source(source)
+    timings = [("read", time.perf_counter() - start)]
+    df, stage_timings = run_stages(df)
+    timings += stage_timings
+    out = output_path(source, out_dir)
+    start = time.perf_counter()
+    df.to_parquet(out, index=False)
+    timings.append(("write", time.perf_counter() - start))
+    return {"source": str(source), "output": str(out), "rows": len(df), "timings": timings}
+
+
+def run_pipeline(sources, out_dir, workers=None):
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(process_file, sources, [out_dir] * len(sources)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean raw FA workbooks/CSVs into parquet files the dashboard loads directly.")
+    parser.add_argument("sources", nargs="+")
+    parser.add_argument("--out-dir", default="Dataset/processed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    start = time.perf_counter()
+    results = run_pipeline(args.sources, args.out_dir, args.workers)
+    for r in results:
+        print(f"{r['source']} -> {r['output']} ({r['rows']:,} rows)")
+        for name, seconds in r["timings"]:
+            print(f"  {name:<24} {seconds * 1000:9.1f} ms")
+    print(f"processed {len(results)} files in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
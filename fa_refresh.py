@@ -0,0 +1,185 @@
+import argparse
+import os
+import threading
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+from fa_data import prepare_fa1_data, prepare_fa2_progress_data, dataset_version, FA1_DATA_PATH, FA2_PROGRESS_PATH
+from fa_expiry import build_expiry_index, ExpiryIndex
+from fa_backlog import daily_backlog
+from fa_aggregates import AggregateStore, compute_aggregates
+from fa_arrow import attach_dataset, publish_dataset, build_lock
+from fa_company import build_company_index, CompanyIndex
+from fa_history import ingest, dataset_as_of, HISTORY_DIR
+
+REFRESH_INTERVAL_SECONDS = int(os.environ.get("FA_REFRESH_SECONDS", "60"))
+
+
+class DatasetBundle(NamedTuple):
+    # Everything one rerun reads, built together from one dataset version.
+    # Treated as immutable once published.
+    version: str
+    built_at: datetime
+    build_seconds: float
+    fa1: pd.DataFrame
+    fa2: pd.DataFrame
+    expiry_index: ExpiryIndex
+    backlog: pd.DataFrame
+    aggregates: dict
+    companies: CompanyIndex
+    # rows validation held back, per dataset (fa_validate)
+    quarantine: dict
+    # set on bundles rebuilt from the history: the date the page is viewed at
+    as_of: Optional[pd.Timestamp] = None
+
+
+class RefreshWorker:
+    # Rebuilds the bundle off the request path whenever the source files
+    # change and publishes it by rebinding ``current``. A rerun reads
+    # ``current`` once and keeps that bundle, so it never sees a mix of
+    # versions and never waits on a parse (except the very first build).
+    def __init__(self, fa1_path=FA1_DATA_PATH, fa2_path=FA2_PROGRESS_PATH, interval=REFRESH_INTERVAL_SECONDS):
+        self.fa1_path = fa1_path
+        self.fa2_path = fa2_path
+        self.interval = interval
+        self.current: Optional[DatasetBundle] = None
+        self.last_checked: Optional[datetime] = None
+        self.last_error: Optional[tuple] = None
+        self._aggregates = AggregateStore()
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name="fa-refresh", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def refresh(self, force=False):
+        with self._build_lock:
+            version = dataset_version(self.fa1_path, self.fa2_path)
+            self.last_checked = datetime.now()
+            current = self.current
+            if current is not None and current.version == version and not force:
+                return current
+            try:
+                bundle = self._build(version)
+            except Exception as e:
+                # e.g. a workbook caught half-saved; keep serving the old one
+                self.last_error = (datetime.now(), f"{type(e).__name__}: {e}")
+                return current
+            self.last_error = None
+            self.current = bundle
+            return bundle
+
+    def _build(self, version):
+        start = time.perf_counter()
+        try:
+            frames = self.shared(version)
+        except Exception:
+            # Only the first build may fall back to the built-in sample; later
+            # read errors must keep the last good version instead. The sample
+            # stays private to this process and is never published.
+            if self.current is not None:
+                raise
+            frames = self._prepare(version, fallback=True)
+        return DatasetBundle(
+            version=version,
+            built_at=datetime.now(),
+            build_seconds=time.perf_counter() - start,
+            companies=build_company_index(frames["fa1"], frames["fa2"]),
+            **frames,
+        )
+
+    def shared(self, version):
+        # Attach to the memory-mapped copy if another replica already built
+        # this version; otherwise build it once, publish it, and serve the
+        # mapped files too so this process holds no private copy. Raises if
+        # a source cannot be read; main() calls this to pre-build an image.
+        frames = attach_dataset(version)
+        if frames is not None:
+            return frames
+        with build_lock():
+            frames = attach_dataset(version)
+            if frames is None:
+                prepared = self._prepare(version, fallback=False)
+                publish_dataset(version, **prepared)
+                ingest(version, {"fa1": prepared["fa1"], "fa2": prepared["fa2"]})
+                frames = attach_dataset(version)
+        return frames
+
+    def _prepare(self, version, fallback):
+        quarantine = {}
+        fa1 = prepare_fa1_data(self.fa1_path, fallback=fallback, quarantine=quarantine)
+        fa2 = prepare_fa2_progress_data(self.fa2_path, fallback=fallback, quarantine=quarantine)
+        return {
+            "fa1": fa1,
+            "fa2": fa2,
+            "expiry_index": build_expiry_index(fa1),
+            "backlog": daily_backlog(fa1),
+            "aggregates": self._aggregates.refresh(fa1, version),
+            "quarantine": quarantine,
+        }
+
+
+def history_bundle(when, history_dir=HISTORY_DIR):
+    # The dataset as last ingested on or before ``when``, derived the same
+    # way as the live bundle so every page renders it unchanged; None if
+    # nothing had been ingested by then.
+    start = time.perf_counter()
+    frames = dataset_as_of(when, history_dir)
+    if frames is None:
+        return None
+    fa1, fa2 = frames["fa1"], frames["fa2"]
+    derived = {
+        "expiry_index": build_expiry_index(fa1),
+        "backlog": daily_backlog(fa1),
+        "aggregates": compute_aggregates(fa1),
+        "companies": build_company_index(fa1, fa2),
+        # the history keeps accepted rows only
+        "quarantine": {},
+    }
+    return DatasetBundle(
+        version=frames["version"],
+        built_at=frames["ingested_at"],
+        build_seconds=time.perf_counter() - start,
+        fa1=fa1,
+        fa2=fa2,
+        as_of=pd.Timestamp(when).normalize(),
+        **derived,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the current dataset version into the shared Arrow directory, e.g. at image build time, so a cold start only attaches to it.")
+    parser.add_argument("--fa1", default=FA1_DATA_PATH)
+    parser.add_argument("--fa2", default=FA2_PROGRESS_PATH)
+    args = parser.parse_args()
+    worker = RefreshWorker(args.fa1, args.fa2)
+    version = dataset_version(args.fa1, args.fa2)
+    start = time.perf_counter()
+    try:
+        frames = worker.shared(version)
+    except FileNotFoundError as e:
+        # sources mounted at run time instead; the first process builds it
+        print(f"nothing published: {e}")
+        return
+    print(f"{version} ready in {time.perf_counter() - start:.2f} s")
+    for name, rows in frames["quarantine"].items():
+        if len(rows):
+            print(f"  {name}: {len(rows):,} rows quarantined (python fa_validate.py to list them)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from fa_dates import BE_YEAR_OFFSET
+from fa_match import rule_table
+
+CHANGE_TYPES = ["แต่งตั้ง", "พ้นตำแหน่ง", "ทั้งสอง", "ไม่มี"]
+EVENT_DATE_COLUMN = "วันที่แต่งตั้ง/พ้นตำแหน่ง"
+# Thai government fiscal year: 1 October - 30 September, named after the
+# BE year it ends in (October 2018 opens ปีงบประมาณ 2562).
+FISCAL_YEAR_START_MONTH = 10
+PERIOD_INDEX = ["ปีงบประมาณ", "ไตรมาส", "ปี-เดือน"]
+CLEAN_CHECK = "ไม่พบข้อมูลความผิด"
+
+
+def prepare_changes(df: pd.DataFrame):
+    df = df.copy()
+    for col in ("วันที่ยื่นแบบ", "ลงวันที่", EVENT_DATE_COLUMN):
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    appoint, resign = df["แต่งตั้ง"].eq("P"), df["พ้นตำแหน่ง"].eq("P")
+    df["ประเภทการเปลี่ยนแปลง"] = np.select(
+        [appoint & resign, appoint, resign], ["ทั้งสอง", "แต่งตั้ง", "พ้นตำแหน่ง"], default="ไม่มี"
+    )
+    df["จำนวนบุคคล"] = df["ชื่อบุคคล"].astype(str).str.count(",") + 1
+    df["ระยะเวลายื่นแบบ"] = (df["ลงวันที่"] - df["วันที่ยื่นแบบ"]).dt.days
+    # an empty result means no check on file, not a finding
+    checked = df["ผลการตรวจประวัติ"].notna()
+    df["พบข้อมูลความผิด"] = (checked & rule_table("background_check").classify(df["ผลการตรวจประวัติ"]).ne(CLEAN_CHECK)).astype(int)
+
+    when = df[EVENT_DATE_COLUMN]
+    shifted = when.dt.month >= FISCAL_YEAR_START_MONTH
+    df["ปีงบประมาณ"] = (when.dt.year + shifted + BE_YEAR_OFFSET).astype("Int64")
+    df["ไตรมาส"] = (((when.dt.month - FISCAL_YEAR_START_MONTH) % 12) // 3 + 1).astype("Int64")
+    df["ปี"] = when.dt.year
+    df["ปี-เดือน"] = when.dt.to_period("M").astype(str)
+    return df
+
+
+def build_rollups(df: pd.DataFrame):
+    # Every measure the executive page shows, pre-aggregated per fiscal
+    # year (and quarter / month where it applies). A year selection then
+    # sums a handful of partitions instead of filtering rows.
+    dated = df[df["ปีงบประมาณ"].notna()]
+    change = pd.get_dummies(dated["ประเภทการเปลี่ยนแปลง"]).reindex(columns=CHANGE_TYPES, fill_value=0).astype(np.int64)
+    measures = pd.concat([
+        change,
+        dated[["จำนวนบุคคล", "พบข้อมูลความผิด"]].astype(np.int64),
+        dated["แต่งตั้ง"].eq("P").astype(np.int64).rename("แต่งตั้ง_P"),
+        dated["พ้นตำแหน่ง"].eq("P").astype(np.int64).rename("พ้นตำแหน่ง_P"),
+        dated["ระยะเวลายื่นแบบ"].fillna(0).rename("duration_sum"),
+        dated["ระยะเวลายื่นแบบ"].notna().astype(np.int64).rename("duration_count"),
+    ], axis=1)
+    by_period = measures.groupby([dated[c] for c in PERIOD_INDEX]).sum()
+    by_fa = measures[CHANGE_TYPES + ["พบข้อมูลความผิด"]].groupby([dated["ปีงบประมาณ"], dated["ชื่อ FA"]]).sum()
+    persons = dated.groupby(["ปีงบประมาณ", "จำนวนบุคคล"]).size()
+    durations = {fy: np.sort(g.dropna().to_numpy()) for fy, g in dated.groupby("ปีงบประมาณ")["ระยะเวลายื่นแบบ"]}
+    rows = dated.groupby("ปีงบประมาณ").indices
+    return {
+        "years": sorted(int(y) for y in rows),
+        "by_period": by_period,
+        "by_fa": by_fa,
+        "persons": persons,
+        "durations": durations,
+        "rows": {fy: dated.index[pos].to_numpy() for fy, pos in rows.items()},
+    }
+
+
+def _in_years(table, years):
+    # Not .loc[years]: a year can be missing from a table, e.g. from by_fa
+    # when every row of it has an empty ชื่อ FA (groupby drops those).
+    return table[table.index.get_level_values("ปีงบประมาณ").isin(years)]
+
+
+def combine_years(rollups, years):
+    years = [y for y in years if y in rollups["rows"]]
+    by_period = _in_years(rollups["by_period"], years)
+    by_fa = _in_years(rollups["by_fa"], years).groupby(level="ชื่อ FA").sum()
+    totals = by_period.sum()
+    return {
+        "fa_count": len(by_fa),
+        "appointed": int(totals.get("แต่งตั้ง_P", 0)),
+        "resigned": int(totals.get("พ้นตำแหน่ง_P", 0)),
+        "persons": int(totals.get("จำนวนบุคคล", 0)),
+        "findings": int(totals.get("พบข้อมูลความผิด", 0)),
+        "mean_duration": totals["duration_sum"] / totals["duration_count"] if totals.get("duration_count", 0) else float("nan"),
+        "change_type": totals.reindex(CHANGE_TYPES, fill_value=0).astype(np.int64),
+        "monthly": by_period[CHANGE_TYPES].groupby(level="ปี-เดือน").sum(),
+        "quarterly": by_period[CHANGE_TYPES].groupby(level=["ปีงบประมาณ", "ไตรมาส"]).sum(),
+        "by_fa": by_fa,
+        "persons_hist": _in_years(rollups["persons"], years).groupby(level="จำนวนบุคคล").sum(),
+        "durations": np.concatenate([rollups["durations"][y] for y in years]) if years else np.array([]),
+        "rows": np.concatenate([rollups["rows"][y] for y in years]) if years else np.array([], dtype=np.int64),
+    }
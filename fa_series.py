@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+# A chart gets about one point per pixel of its width; more cannot be told
+# apart on screen. Server-drawn charts do not know their width, so they
+# assume a wide-layout column.
+CHART_WIDTH_PX = 1200
+MAX_WIDTH_PX = 4000
+# Points in one figure above which its lines are drawn with WebGL
+# (scattergl) instead of SVG paths.
+WEBGL_THRESHOLD = 5000
+METHODS = ("lttb", "minmax", "step")
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return values.astype(float)
+
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: keeps the first and last point and, from
+    # each bucket in between, the point spanning the largest triangle with the
+    # point kept before it and the mean of the next bucket.
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _as_float(x), _as_float(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    sizes = ends - starts
+    cx, cy = np.r_[0, np.cumsum(x)], np.r_[0, np.cumsum(y)]
+    next_x = np.r_[((cx[ends] - cx[starts]) / sizes)[1:], x[-1]]
+    next_y = np.r_[((cy[ends] - cy[starts]) / sizes)[1:], y[-1]]
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i, (s, e) in enumerate(zip(starts, ends)):
+        area = np.abs((x[a] - next_x[i]) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (next_y[i] - y[a]))
+        a = s + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_out):
+    # Lowest and highest point of each of n_out / 2 equal-count buckets, so
+    # peaks survive (LTTB may cut a one-day spike).
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    bucket = np.arange(n) * (n_out // 2) // n
+    order = np.lexsort((_as_float(y), bucket))
+    bounds = np.flatnonzero(np.diff(bucket[order])) + 1
+    lows, highs = order[np.r_[0, bounds]], order[np.r_[bounds - 1, n - 1]]
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+
+def step_indices(y):
+    # Points where a step series (line_shape="hv") changes value; drawing
+    # only these is lossless.
+    y = _as_float(y)
+    if len(y) < 3:
+        return np.arange(len(y))
+    return np.unique(np.r_[0, np.flatnonzero(np.diff(y)) + 1, len(y) - 1])
+
+
+def downsample(x, y, width=CHART_WIDTH_PX, method="lttb"):
+    x, y = np.asarray(x), np.asarray(y)
+    keep = ~pd.isna(y)
+    x, y = x[keep], y[keep]
+    n_out = max(int(width), 4)
+    if method == "step":
+        idx = step_indices(y)
+        if len(idx) > n_out:
+            idx = idx[minmax_indices(y[idx], n_out)]
+    elif method == "minmax":
+        idx = minmax_indices(y, n_out)
+    elif method == "lttb":
+        idx = lttb_indices(x, y, n_out)
+    else:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    return x[idx], y[idx]
+
+
+def window(x, y, start=None, end=None):
+    # The visible range of a sorted series, plus one point either side so the
+    # line still runs to the edges of the plot.
+    x, y = np.asarray(x), np.asarray(y)
+    lo, hi = 0, len(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        bound = lambda v: np.datetime64(pd.Timestamp(v), "ns").astype(x.dtype)
+    else:
+        bound = lambda v: v
+    if start not in (None, ""):
+        lo = max(int(np.searchsorted(x, bound(start), "left")) - 1, 0)
+    if end not in (None, ""):
+        hi = min(int(np.searchsorted(x, bound(end), "right")) + 1, len(x))
+    return x[lo:hi], y[lo:hi]
+
+
+def downsample_frame(df, x, y, by=None, width=CHART_WIDTH_PX, method="lttb", start=None, end=None):
+    # Long frame -> the same columns with each series (one per ``by`` value)
+    # cut to the visible range and downsampled for ``width`` pixels.
+    parts = []
+    for key, group in (df.groupby(by, sort=False) if by else [(None, df)]):
+        gx, gy = window(group[x].to_numpy(), group[y].to_numpy(), start, end)
+        gx, gy = downsample(gx, gy, width, method)
+        part = pd.DataFrame({x: gx, y: gy})
+        if by:
+            part[by] = key
+        parts.append(part)
+    columns = [x, y] + ([by] if by else [])
+    return pd.concat(parts, ignore_index=True)[columns] if parts else df[columns].iloc[0:0]
+
+
+def render_mode(points):
+    return "webgl" if points > WEBGL_THRESHOLD else "svg"
@@ -0,0 +1,180 @@
+import argparse
+import html
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from plotly.offline import get_plotlyjs
+
+from fa_data import (
+    prepare_fa1_data, prepare_fa2_progress_data, ongoing_applications,
+    FA1_DATA_PATH, FA2_PROGRESS_PATH, APPLICATION_FILTERS,
+)
+from fa_expiry import build_expiry_index, expiring_between, default_horizon
+from fa_backlog import daily_backlog
+from fa_theme import MATERIAL_ICONS_LINK, DASHBOARD_CSS
+from fa_assets import STATIC_DIR, ASSET_URL_PREFIX
+from fa_charts import (
+    generate_application_list_html, generate_expiry_list_html, application_list_panel_html,
+    controller_stats_chart_html, fa_type_pie_chart_html, fa_app_type_bar_chart_html, backlog_chart_html,
+    kpi_cards, kpi_card_html,
+    CONTROLLER_STATS_FRAME, FA_TYPE_PIE_FRAME, FA_APP_TYPE_BAR_FRAME, BACKLOG_FRAME, APPLICATION_LIST_FRAME,
+)
+
+LOGO_PATH = Path("SEC_Thailand_Logo.svg.png")
+PAGES = {"FA Dashboard Summary": "summary", "FA-1": "fa-1", "FA-2": "fa-2"}
+FILTER_SLUGS = {"ทั้งหมด": "all", "รายใหม่": "new", "ต่ออายุ": "renew"}
+PLOTLY_ASSET = "assets/plotly.min.js"
+LOGO_ASSET = "assets/logo.png"
+EXPIRY_LIST_LIMIT = 50
+
+SNAPSHOT_CSS = """
+<style>
+.snapshot-nav {display:flex; gap:.5rem; flex-wrap:wrap;}
+.snapshot-nav a {text-decoration:none; padding:.4rem 1rem; border:2px solid #E5E7EB; border-radius:12px;
+                 font-weight:800; color:#374151; background:#fff;}
+.snapshot-nav a.active {border-color:var(--primary-color); color:var(--primary-color); background:#F0F9F8;}
+.kpi-row {display:grid; grid-template-columns:repeat(4, 1fr); gap:1.5rem; margin-bottom:1.5rem;}
+.chart-row {display:grid; grid-template-columns:repeat(3, 1fr); gap:1.5rem;}
+.snapshot-frame {border:0; width:100%;}
+.custom-footer-date {text-align:right; font-weight:bold; font-size:20px; color:#111; margin-top:1rem;}
+</style>
+"""
+
+_data = {}
+
+
+def page_file_name(page, active_filter):
+    return f"{PAGES[page]}-{FILTER_SLUGS[active_filter]}.html"
+
+
+def _frame(doc, frame):
+    width = f"{frame['width']}px" if "width" in frame else "100%"
+    return (f'<iframe class="snapshot-frame" style="max-width:{width};" height="{frame["height"]}" '
+            f'srcdoc="{html.escape(doc, quote=True)}"></iframe>')
+
+
+def _header_html(page, active_filter):
+    pages = "".join(
+        f'<a href="{page_file_name(p, active_filter)}" class="{"active" if p == page else ""}">{p}</a>'
+        for p in PAGES
+    )
+    filters = "".join(
+        f'<a href="{page_file_name(page, f)}" class="{"active" if f == active_filter else ""}">{f}</a>'
+        for f in APPLICATION_FILTERS
+    )
+    return f"""<div class="header-grid">
+  <div class="snapshot-nav">{pages}</div>
+  <div style="display:flex; align-items:center; gap:1rem;">
+    <div class="snapshot-nav">{filters}</div>
+    <img src="{LOGO_ASSET}" style="height:56px;" alt="SEC" />
+  </div>
+</div>"""
+
+
+def _list_panel_html(page, active_filter, plotlyjs):
+    is_fa2 = (page == "FA-2")
+    df_ongoing = ongoing_applications(page, _data["fa1"], _data["fa2"], active_filter=active_filter)
+    total_items = len(df_ongoing)
+    panel = application_list_panel_html(
+        f"สถานะคำขอที่กำลังดำเนินการ {page}",
+        generate_application_list_html(df_ongoing, total_items, is_fa2_list=is_fa2),
+        min(3, total_items), total_items,
+    )
+    faded = (
+        _frame(fa_type_pie_chart_html(_data["fa1"], plotlyjs) or "", FA_TYPE_PIE_FRAME) if page == "FA-1"
+        else _frame(controller_stats_chart_html(plotlyjs), CONTROLLER_STATS_FRAME)
+    )
+    body = f"""<div class="content-grid" style="grid-template-columns:0.4fr 0.6fr;">
+  <div class="faded-chart">{faded}</div>
+  <div>{_frame(panel, APPLICATION_LIST_FRAME)}</div>
+</div>"""
+    if page == "FA-1":
+        positions = expiring_between(_data["expiry_index"], *default_horizon())
+        expiring = _data["fa1"].iloc[positions[:EXPIRY_LIST_LIMIT]]
+        body += f"""<div class="list-title">บริษัท ฯ ที่ต้องเตรียมยื่นคำขอต่ออายุ</div>
+{generate_expiry_list_html(expiring)}"""
+    return body
+
+
+def render_page(page, active_filter):
+    plotlyjs = PLOTLY_ASSET
+    kpis = "".join(kpi_card_html(k) for k in kpi_cards(_data["expiry_index"]))
+    if page == "FA Dashboard Summary":
+        body = f"""<div class="chart-row">
+  {_frame(controller_stats_chart_html(plotlyjs), CONTROLLER_STATS_FRAME)}
+  {_frame(fa_type_pie_chart_html(_data["fa1"], plotlyjs) or "", FA_TYPE_PIE_FRAME)}
+  {_frame(fa_app_type_bar_chart_html(_data["fa1"], plotlyjs), FA_APP_TYPE_BAR_FRAME)}
+</div>
+{_frame(backlog_chart_html(_data["backlog"], plotlyjs), BACKLOG_FRAME)}"""
+    else:
+        body = _list_panel_html(page, active_filter, plotlyjs)
+    return f"""<!doctype html>
+<html lang="th"><head><meta charset="utf-8" />
+<title>FA Approval Dashboard - {page}</title>
+{MATERIAL_ICONS_LINK}
+{DASHBOARD_CSS}
+{SNAPSHOT_CSS}
+</head>
+<body><div class="main"><div class="block-container">
+{_header_html(page, active_filter)}
+<div class="kpi-row">{kpis}</div>
+{body}
+<div class="custom-footer-date">ข้อมูล ณ วันที่ {_data["generated_at"]}</div>
+</div></div></body></html>
+"""
+
+
+def _init_worker(data):
+    _data.update(data)
+
+
+def _render_to_file(out_dir, page, active_filter):
+    path = Path(out_dir) / page_file_name(page, active_filter)
+    path.write_text(render_page(page, active_filter), encoding="utf-8")
+    return path
+
+
+def build_snapshot(out_dir, fa1_path=FA1_DATA_PATH, fa2_path=FA2_PROGRESS_PATH, workers=None):
+    out_dir = Path(out_dir)
+    (out_dir / "assets").mkdir(parents=True, exist_ok=True)
+    (out_dir / PLOTLY_ASSET).write_text(get_plotlyjs(), encoding="utf-8")
+    if LOGO_PATH.is_file():
+        shutil.copyfile(LOGO_PATH, out_dir / LOGO_ASSET)
+    # Chart builders link the built stylesheet at ASSET_URL_PREFIX when it
+    # exists; mirror it so the same relative URL resolves in the snapshot.
+    if STATIC_DIR.is_dir() and not ASSET_URL_PREFIX.startswith(("/", "http")):
+        shutil.copytree(STATIC_DIR, out_dir / ASSET_URL_PREFIX, dirs_exist_ok=True)
+
+    df_fa1 = prepare_fa1_data(fa1_path)
+    data = {
+        "fa1": df_fa1,
+        "fa2": prepare_fa2_progress_data(fa2_path),
+        "expiry_index": build_expiry_index(df_fa1),
+        "backlog": daily_backlog(df_fa1),
+        "generated_at": datetime.now().strftime("%d/%m/%Y"),
+    }
+    combos = [(page, f) for page in PAGES for f in APPLICATION_FILTERS]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as pool:
+        paths = list(pool.map(_render_to_file, [out_dir] * len(combos), *zip(*combos)))
+    shutil.copyfile(out_dir / page_file_name("FA Dashboard Summary", "ทั้งหมด"), out_dir / "index.html")
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every dashboard page and filter to static HTML.")
+    parser.add_argument("--out", default="snapshot")
+    parser.add_argument("--fa1", default=FA1_DATA_PATH)
+    parser.add_argument("--fa2", default=FA2_PROGRESS_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    start = time.perf_counter()
+    paths = build_snapshot(args.out, args.fa1, args.fa2, args.workers)
+    print(f"wrote {len(paths)} pages to {args.out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+COMPANY_COLUMN = "ชื่อ FA"
+PERSON_COLUMN = "ชื่อบุคคล"
+ROLE_COLUMN = "ประเภท"
+APPOINT_COLUMN = "แต่งตั้ง"
+RESIGN_COLUMN = "พ้นตำแหน่ง"
+EVENT_DATE_COLUMN = "วันที่แต่งตั้ง/พ้นตำแหน่ง"
+TENURE_COLUMNS = ["บริษัท", "บุคคล", "ตำแหน่ง", "เริ่ม", "สิ้นสุด"]
+
+# Open ends of a tenure (appointed before the data starts / still in office)
+# as day numbers, so every interval is a plain half-open [start, end).
+OPEN_START = np.iinfo(np.int64).min // 2
+OPEN_END = np.iinfo(np.int64).max // 2
+
+
+def _day_numbers(values):
+    return pd.to_datetime(values, errors="coerce").to_numpy(dtype="datetime64[D]")
+
+
+def tenure_events(df: pd.DataFrame):
+    # One row per (person, company, date): +1 appointment, -1 resignation.
+    # Rows flagged both ways are changes within a tenure and open nothing.
+    appoint = df.get(APPOINT_COLUMN, pd.Series("", index=df.index)).eq("P")
+    resign = df.get(RESIGN_COLUMN, pd.Series("", index=df.index)).eq("P")
+    kind = np.select([appoint & ~resign, resign & ~appoint], [1, -1], default=0)
+    events = pd.DataFrame({
+        "company": df[COMPANY_COLUMN].astype(str).str.strip(),
+        "person": df[PERSON_COLUMN].astype(str).str.split(","),
+        "role": df.get(ROLE_COLUMN, pd.Series("", index=df.index)).astype(str),
+        "date": _day_numbers(df[EVENT_DATE_COLUMN]),
+        "kind": kind,
+    })[(kind != 0)]
+    events = events.explode("person")
+    events["person"] = events["person"].str.strip()
+    events = events[events["person"].ne("") & events["person"].ne("nan") & events["date"].notna()]
+    # Same-day appointment and resignation: appointment first, so the
+    # tenure is recorded (zero length) rather than lost.
+    return events.sort_values(["company", "person", "date", "kind"], ascending=[True, True, True, False], kind="stable")
+
+
+def pair_tenures(events: pd.DataFrame):
+    rows = []
+    open_at = {}
+    for company, person, role, date, kind in events[["company", "person", "role", "date", "kind"]].itertuples(index=False, name=None):
+        key = (company, person)
+        if kind > 0:
+            open_at.setdefault(key, (date, role))
+        elif key in open_at:
+            start, start_role = open_at.pop(key)
+            rows.append((company, person, start_role, start, date))
+        else:
+            rows.append((company, person, role, pd.NaT, date))
+    rows += [(c, p, role, start, pd.NaT) for (c, p), (start, role) in open_at.items()]
+    tenures = pd.DataFrame(rows, columns=TENURE_COLUMNS)
+    for col in ("เริ่ม", "สิ้นสุด"):
+        tenures[col] = pd.to_datetime(tenures[col])
+    return tenures.sort_values(["บริษัท", "เริ่ม"], kind="stable", na_position="first").reset_index(drop=True)
+
+
+def _bounds(tenures):
+    start = tenures["เริ่ม"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+    end = tenures["สิ้นสุด"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+    start = np.where(tenures["เริ่ม"].isna(), OPEN_START, start)
+    end = np.where(tenures["สิ้นสุด"].isna(), OPEN_END, end)
+    return start, end
+
+
+def _as_day(date):
+    return np.datetime64(pd.Timestamp(date), "D").astype(np.int64)
+
+
+class IntervalTree:
+    # Static centred interval tree over half-open [start, end) day numbers.
+    # A stabbing query walks one root-to-leaf path, O(log n + hits).
+    def __init__(self, starts, ends, ids):
+        keep = ends > starts
+        self.root = self._build(np.asarray(starts)[keep], np.asarray(ends)[keep], np.asarray(ids)[keep])
+
+    def _build(self, starts, ends, ids):
+        if len(ids) == 0:
+            return None
+        center = np.median(np.concatenate([starts, ends]))
+        left = ends <= center
+        right = starts > center
+        here = ~(left | right)
+        by_start = np.argsort(starts[here], kind="stable")
+        by_end = np.argsort(-ends[here], kind="stable")
+        return (
+            center,
+            starts[here][by_start], ids[here][by_start],
+            -ends[here][by_end], ids[here][by_end],
+            self._build(starts[left], ends[left], ids[left]),
+            self._build(starts[right], ends[right], ids[right]),
+        )
+
+    def stab(self, point):
+        hits = []
+        node = self.root
+        while node is not None:
+            center, starts, start_ids, neg_ends, end_ids, left, right = node
+            if point < center:
+                hits.append(start_ids[:np.searchsorted(starts, point, side="right")])
+                node = left
+            else:
+                hits.append(end_ids[:np.searchsorted(neg_ends, -point, side="left")])
+                node = right
+        return np.concatenate(hits) if hits else np.array([], dtype=np.int64)
+
+
+class TenureIndex:
+    def __init__(self, tenures: pd.DataFrame):
+        self.tenures = tenures
+        starts, ends = _bounds(tenures)
+        positions = np.arange(len(tenures))
+        self.trees = {}
+        self.timelines = {}
+        for company, idx in tenures.groupby("บริษัท", sort=False).indices.items():
+            self.trees[company] = IntervalTree(starts[idx], ends[idx], positions[idx])
+            # +1 at each start, -1 at each end; the running sum after the
+            # last change on or before a day is the head count on that day.
+            closed = ends[idx] != OPEN_END
+            change_days = np.concatenate([starts[idx], ends[idx][closed]])
+            deltas = np.concatenate([np.ones(len(idx)), -np.ones(closed.sum())])
+            days, slot = np.unique(change_days, return_inverse=True)
+            counts = np.cumsum(np.bincount(slot, weights=deltas, minlength=len(days))).astype(np.int64)
+            self.timelines[company] = (days, counts)
+        self.by_person = tenures.groupby("บุคคล", sort=False).indices
+
+    def controllers_on(self, company, date):
+        tree = self.trees.get(company)
+        if tree is None:
+            return self.tenures.iloc[0:0]
+        hits = np.sort(tree.stab(_as_day(date)))
+        return self.tenures.iloc[hits]
+
+    def active_count(self, company, date):
+        if company not in self.timelines:
+            return 0
+        days, counts = self.timelines[company]
+        i = np.searchsorted(days, _as_day(date), side="right") - 1
+        return int(counts[i]) if i >= 0 else 0
+
+    def active_counts(self, dates):
+        # Head count per company (columns) at each of ``dates`` (index).
+        dates = pd.DatetimeIndex(dates)
+        points = dates.to_numpy(dtype="datetime64[D]").astype(np.int64)
+        out = {}
+        for company, (days, counts) in self.timelines.items():
+            i = np.searchsorted(days, points, side="right") - 1
+            out[company] = np.where(i >= 0, counts[np.maximum(i, 0)], 0)
+        return pd.DataFrame(out, index=dates)
+
+    def person_history(self, person):
+        idx = self.by_person.get(person)
+        if idx is None:
+            return self.tenures.iloc[0:0]
+        return self.tenures.iloc[idx].sort_values("เริ่ม", na_position="first")
+
+
+def build_tenure_index(df: pd.DataFrame):
+    return TenureIndex(pair_tenures(tenure_events(df)))
@@ -0,0 +1,425 @@
+MATERIAL_ICONS_LINK = '<link href="https://fonts.googleapis.com/icon?family=Material+Icons+Outlined" rel="stylesheet">'
+
+SARABUN_IMPORT = "@import url('https://fonts.googleapis.com/css2?family=Sarabun:wght@400;500;600;700;800&display=swap');"
+
+DASHBOARD_CSS = """
+<style>
+""" + SARABUN_IMPORT + """
+@media (max-width: 1100px) {
+  .main .block-container {padding:1rem 0.5rem !important;}
+  .header-grid, .fa-header, .content-grid {
+    grid-template-columns: 1fr !important;
+    display: block !important;
+  }
+  .content-grid {gap: 1rem;}
+  .kpi-card, .framed-panel, .card {min-width: 0 !important; width: 100% !important;}
+  .plotly-graph-div, .js-plotly-plot {width: 100% !important;}
+}
+@media (max-width: 800px) {
+  .main .block-container {padding:0.5rem 0.2rem !important;}
+  .header-grid, .fa-header, .content-grid {
+    grid-template-columns: 1fr !important;
+    display: block !important;
+  }
+  .kpi-card, .framed-panel, .card {min-width: 0 !important; width: 100% !important;}
+  .plotly-graph-div, .js-plotly-plot {width: 100% !important;}
+  .custom-footer-date {
+    position: static !important;
+    margin: 16px 0 0 0 !important;
+    text-align: center !important;
+    font-size: 16px !important;
+  }
+}
+@media (max-width: 600px) {
+  .main .block-container {padding:0.1rem 0.1rem !important;}
+  .header-grid, .fa-header, .content-grid {
+    grid-template-columns: 1fr !important;
+    display: block !important;
+  }
+  .kpi-card, .framed-panel, .card {min-width: 0 !important; width: 100% !important;}
+  .plotly-graph-div, .js-plotly-plot {width: 100% !important;}
+  .custom-footer-date {
+    position: static !important;
+    margin: 12px 0 0 0 !important;
+    text-align: center !important;
+    font-size: 14px !important;
+  }
+}
+:root {
+    --primary-color: #00A99D;
+    --text-dark: #111827;
+    --text-mid: #374151;
+    --text-light: #6B7280;
+    --bg: #FFFFFF;
+    --panel-bg: #F9FAFB;
+    --border: #E5E7EB;
+    --shadow-sm: 0 1px 2px rgba(0,0,0,.04);
+    --shadow-md: 0 4px 6px -1px rgba(0,0,0,.03), 0 2px 4px -2px rgba(0,0,0,.03);
+}
+html, body, [class*="st-"], [class*="css-"] {
+    font-family: 'Sarabun', system-ui, sans-serif;
+    background: var(--bg);
+    color: var(--text-dark);
+}
+#MainMenu, footer, header[data-testid="stHeader"] {
+    display: none !important;
+}
+.main .block-container {
+    padding: 1.5rem 2.5rem 2rem 2.5rem;
+    max-width: 1600px;
+}
+.header-grid {
+    display: grid;
+    grid-template-columns: 1fr auto;
+    align-items: center;
+    margin-bottom: 0.5rem;
+}
+.title-area {
+    display: flex;
+    align-items: center;
+    gap: 0.75rem;
+}
+.title-area .caret {
+    font-size: 24px;
+    color: #4B5563;
+}
+.title-area .main-title {
+    font-size: 28px;
+    font-weight: 800;
+    color: var(--text-dark);
+    margin: 0;
+    margin-right: 0.75rem;
+}
+.controls-area {
+    display: flex;
+    align-items: center;
+    gap: 1rem;
+}
+.pill-buttons {
+    display: flex;
+    gap: 0.75rem;
+}
+.page-controls-grid {
+    display: grid;
+    grid-template-columns: 1fr auto;
+    align-items: center;
+    margin-bottom: 2rem;
+}
+.page-switcher {
+    display: flex;
+    gap: 0.5rem;
+}
+.search-area .stTextInput {
+    width: 250px;
+}
+.pill-buttons .stButton>button,
+.page-switcher .stButton>button {
+    background: #fff;
+    border: 1px solid var(--border);
+    border-radius: 8px;
+    font-weight: 600;
+    color: var(--text-mid);
+    box-shadow: var(--shadow-sm);
+}
+.pill-buttons .stButton>button {
+    padding: .4rem 1.1rem;
+    height: 38px;
+}
+.page-switcher .stButton>button {
+    padding: .3rem 1rem;
+}
+.page-switcher .stButton>button.active-page {
+    border-color: var(--primary-color);
+    background-color: #F0F9F8;
+    color: var(--primary-color);
+}
+.search-area .stTextInput > div {
+    border-radius: 8px;
+    border-color: var(--border);
+    background: #fff;
+    height: 38px;
+}
+.search-area .stTextInput input {
+    height: 38px;
+}
+.kpi-card {
+    background: var(--panel-bg);
+    border: 1px solid #F3F4F6;
+    border-radius: 12px;
+    padding: 1.5rem;
+    display: flex;
+    align-items: center;
+    gap: 1rem;
+    box-shadow: var(--shadow-md);
+    height: 100%;
+}
+.kpi-card .icon {
+    width: 48px;
+    height: 48px;
+    border-radius: 50%;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    background: #E0F2F1;
+    color: var(--primary-color);
+    flex-shrink: 0;
+}
+.kpi-card .title {
+    font-size: 1rem;
+    font-weight: 500;
+    color: var(--text-light);
+    margin: 0 0 .25rem 0;
+}
+.kpi-card .value {
+    font-size: 2.25rem;
+    font-weight: 700;
+    line-height: 1;
+    color: var(--text-dark);
+}
+.kpi-card .suffix {
+    font-size: .9rem;
+    color: var(--text-light);
+}
+.chart-panel,
+.framed-panel {
+    background: var(--panel-bg);
+    border: 2px solid #B1B1B1;
+    border-radius: 18px;
+    padding: 1.5rem;
+    box-shadow: var(--shadow-md);
+    height: 100%;
+}
+.chart-header {
+    font-size: 1.1rem;
+    font-weight: 700;
+    color: var(--text-dark);
+    margin: 0 0 .5rem 0;
+}
+.chart-legend {
+    display: flex;
+    gap: 1rem;
+    margin: .25rem 0 1rem 0;
+}
+.legend-item {
+    display: flex;
+    align-items: center;
+    gap: .4rem;
+    font-size: .8rem;
+    color: var(--text-light);
+}
+.legend-dot,
+.legend-square {
+    width: 10px;
+    height: 10px;
+}
+.legend-dot {
+    border-radius: 50%;
+}
+.content-grid {
+    display: grid;
+    grid-template-columns: 0.8fr 1.2fr;
+    gap: 1.5rem;
+}
+.faded-chart {
+    opacity: 0.2;
+}
+.page-kpi-container {
+    background: var(--panel-bg);
+    border: 1px solid #F3F4F6;
+    border-radius: 12px;
+    padding: 1rem;
+    display: flex;
+    justify-content: space-around;
+    gap: .75rem;
+    margin-bottom: 1.5rem;
+}
+.page-kpi-item {
+    display: flex;
+    align-items: center;
+    gap: 1rem;
+}
+.page-kpi-item .icon {
+    font-size: 1.5rem;
+    color: var(--secondary-color);
+}
+.page-kpi-item .text .title {
+    font-size: .92rem;
+    color: var(--text-light);
+}
+.page-kpi-item .text .value {
+    font-size: 1.75rem;
+    font-weight: 700;
+    color: var(--text-dark);
+}
+.list-panel {
+    position: relative;
+    overflow: hidden;
+    background: var(--panel-bg);
+    border: 1px solid #F3F4F6;
+    border-radius: 12px;
+    padding: 1.5rem;
+    box-shadow: var(--shadow-md);
+    height: 100%;
+}
+.list-title {
+    color: #111827;
+    font-weight: 800;
+    font-size: 1.25rem;
+    margin: 0 0 .5rem 0;
+}
+.list-item {
+    margin-bottom: 1.5rem;
+}
+.info-row {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    background: #fff;
+    border: 1px solid #f3f4f6;
+    border-radius: 8px;
+    padding: 12px 16px;
+    margin-top: 8px;
+}
+.info-row .name {
+    font-size: 1rem;
+    color: #111827;
+    font-weight: 500;
+}
+.info-row .meta {
+    font-size: .85rem;
+    color: #6b7280;
+}
+.show-more-button-container {
+    display: flex;
+    justify-content: center;
+    margin-top: 1.5rem;
+}
+.show-more-button-container .stButton>button {
+    background: var(--primary-color);
+    color: #fff;
+    border: none;
+    border-radius: 8px;
+    padding: .55rem 2rem;
+    font-size: 1rem;
+    font-weight: 700;
+}
+.footer {
+    text-align: right;
+    font-size: .8rem;
+    color: var(--text-light);
+    margin-top: 2rem;
+}
+.stSelectbox > div[data-baseweb="select"] {
+    min-width: 250px;
+}
+.framed-panel {
+    border: 3px solid #333 !important;
+    box-shadow: 0 8px 16px rgba(0,0,0,0.06);
+    border-radius: 18px !important;
+    padding: 1.8rem !important;
+}
+.fa-header {
+    display: grid;
+    grid-template-columns: 220px 1fr 140px;
+    gap: 16px;
+    align-items: center;
+    margin: 6px 0 14px;
+}
+.search-area .stTextInput > div{
+    height:56px;
+    border-radius:12px;
+    border:1.5px solid #E5E7EB;
+    background:#fff;
+}
+.search-area .stTextInput input{
+    height:56px;
+    font-size:16px;
+}
+.page-dropdown [data-baseweb="select"] span {
+    font-size: 40px !important;
+    font-weight: 800;
+    color: #0F172A;
+}
+.page-dropdown [data-baseweb="select"] input {
+    font-size: 40px !important;
+    font-weight: 700;
+    color: #0F172A;
+}
+.page-dropdown [data-baseweb="select"] div {
+    font-size: 40px !important;
+}
+.pill-buttons-row .stButton>button{
+    height:56px;
+    padding:0 18px;
+    font-weight:800;
+    background:#fff;
+    border:2px solid #E5E7EB;
+    border-radius:12px;
+    margin:0 !important;
+    box-shadow:none;
+}
+.pill-buttons-row .stButton>button:hover{
+    border-color:#CBD5E1;
+}
+.fa-header .search-area .stTextInput>div{
+    height:48px;
+    border-radius:12px;
+    border:1.5px solid #E5E7EB;
+    background:#fff;
+}
+.fa-header .search-area input{
+    height:48px;
+    font-size:16px;
+}
+.fa-header .pill-buttons .stButton>button{
+    height:48px;
+    padding:0 18px;
+    font-weight:800;
+    background:#fff;
+    border:2px solid #E5E7EB;
+    border-radius:12px;
+    box-shadow:none;
+}
+.fa-header .pill-buttons .stButton>button:hover{
+    border-color:#CBD5E1;
+}
+.header-logo img, .fa-header .header-logo img {
+    height: 200px !important;
+}
+</style>
+"""
+
+CHART_PANEL_CSS = """
+.framed-panel {
+  border: 1.5px solid #E5E7EB;
+  border-radius: 16px;
+  background: #FFFFFF;
+  padding: 16px 16px 8px 16px;
+  box-shadow: 0 4px 12px rgba(0,0,0,0.05);
+  height: 100%;
+  max-width: 100%;
+}
+.chart-header {
+  margin: 0 0 8px 4px;
+  font-size: 22px;
+  font-weight: 800;
+  color: #111827;
+  text-align: center;
+}
+.chart-legend {
+  display: flex;
+  justify-content: center;
+  gap: 24px;
+  align-items: center;
+  margin: 4px 0 12px 0;
+  font-size: 14px;
+  font-weight: 500;
+  color: #374151;
+}
+.chart-legend.wide { gap: 48px; }
+.chart-legend.wrap { flex-wrap: wrap; gap: 16px 24px; margin-left: 4px; }
+.legend-item { display: flex; align-items: center; gap: 8px; }
+.legend-dot { width: 12px; height: 12px; border-radius: 50%; display: inline-block; }
+.legend-square { width: 12px; height: 12px; border-radius: 2px; display: inline-block; }
+.plotly-graph-div, .js-plotly-plot { width: 100% !important; }
+"""
@@ -0,0 +1,186 @@
+import argparse
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from fa_match import normalize, NOT_NORMALIZED
+from fa_prep import DATE_PLACEHOLDERS
+
+# What the sheets type instead of leaving a cell empty.
+TEXT_PLACEHOLDERS = ["___", "-", "nan", "NaN", "None", "NaT", ""]
+ROW_COLUMN = "แถวที่"
+REASON_COLUMN = "เหตุผล"
+# Record i (from 0) is on sheet row i + 2, under the header row.
+FIRST_SHEET_ROW = 2
+
+
+class Checks(NamedTuple):
+    # dates: parsed in place before validation; a raw value that did not
+    #   parse, or a date outside ``plausible``, fails the row
+    # required: text columns that must hold a value
+    # percents: numbers from 0 to 100 or blank, checked where the column
+    #   exists
+    # key: columns that identify one submission; a repeat of the same key
+    #   (after normalizing) is a duplicate of its first occurrence
+    dates: tuple = ()
+    required: tuple = ()
+    percents: tuple = ()
+    key: tuple = ()
+    plausible: tuple = (pd.Timestamp("2000-01-01"), pd.Timestamp("2100-01-01"))
+
+
+def clear_placeholders(df):
+    # "___" / "nan" in a text column mean empty; left in, "nan" becomes a
+    # company name.
+    df = df.copy(deep=False)
+    for col in df.columns[[isinstance(t, pd.StringDtype) for t in df.dtypes]]:
+        s = df[col]
+        df[col] = s.mask(s.str.strip().isin(TEXT_PLACEHOLDERS))
+    return df
+
+
+def _unreadable(raw, parsed, blanks=DATE_PLACEHOLDERS):
+    # Only the cells that came out empty are looked at as text.
+    missing = parsed.isna().to_numpy()
+    bad = np.zeros(len(raw), dtype=bool)
+    if missing.any():
+        text = raw[missing]
+        bad[missing] = (text.notna() & ~text.astype("str").str.strip().isin(blanks)).to_numpy()
+    return bad
+
+
+def _text_codes(values):
+    # Dictionary-encodes the column in Arrow, then runs fa_match.normalize
+    # only over the distinct values it would change (found with one regex),
+    # and points those at their normalized spelling; -1 is empty.
+    arr = pa.array(values, type=pa.large_string(), from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    encoded = pc.dictionary_encode(arr)
+    words = encoded.dictionary
+    codes = encoded.indices.fill_null(-1).to_numpy().astype(np.int64)
+    dirty = np.flatnonzero(pc.match_substring_regex(words, NOT_NORMALIZED).to_numpy(zero_copy_only=False))
+    if len(dirty) == 0:
+        return codes
+    clean = normalize(words.take(pa.array(dirty)))
+    same = pc.index_in(clean, value_set=words).fill_null(-1).to_numpy()
+    own = pc.dictionary_encode(clean).indices.to_numpy() + len(words)
+    remap = np.r_[np.arange(len(words)), -1]
+    remap[dirty] = np.where(same >= 0, same, own)
+    return remap[codes]
+
+
+def _typed(s):
+    return pd.api.types.is_datetime64_any_dtype(s) or pd.api.types.is_numeric_dtype(s)
+
+
+def _key_codes(s):
+    if _typed(s):
+        return pd.factorize(s, use_na_sentinel=True)[0]
+    return _text_codes(s.astype("str"))
+
+
+def duplicate_of(df, key):
+    # Position of the first row with the same key, or -1. Each row's key
+    # columns are folded into one 64-bit hash and matched in hash-table
+    # passes, never pairwise. Typed columns go first; after each column only
+    # rows whose key so far is shared can still be duplicates, so the costly
+    # text columns are encoded for those rows alone.
+    first = np.full(len(df), -1, dtype=np.int64)
+    if not key or not all(c in df.columns for c in key) or df.empty:
+        return first
+    rows = np.arange(len(df))
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    for col in sorted(key, key=lambda c: not _typed(df[c])):
+        codes = _key_codes(df[col] if len(rows) == len(df) else df[col].iloc[rows])
+        present = codes >= 0
+        rows, codes = rows[present], codes[present]
+        hashes = hashes[present] * np.uint64(1000003) ^ pd.util.hash_array(codes)
+        shared = pd.Series(hashes).duplicated(keep=False).to_numpy()
+        rows, hashes = rows[shared], hashes[shared]
+        if len(rows) == 0:
+            return first
+    groups, _ = pd.factorize(hashes)
+    # factorize numbers keys in order of first appearance, so a row is the
+    # first of its key exactly when its number is above every earlier one
+    seen = np.maximum.accumulate(np.r_[-1, groups[:-1]])
+    repeated = groups <= seen
+    first_seen = rows[np.flatnonzero(~repeated)]
+    first[rows[repeated]] = first_seen[groups[repeated]]
+    return first
+
+
+def validate(df, source, checks: Checks):
+    # Every check runs once over whole columns into one boolean matrix (one
+    # column per failure reason); the rows with any failure are split off
+    # into the quarantine, as they were in ``source`` plus their sheet row
+    # and the reasons. Returns (kept rows, quarantine).
+    names, failed = [], []
+    for col in checks.dates:
+        if col not in df.columns:
+            continue
+        parsed = df[col]
+        names += [f"วันที่อ่านไม่ได้: {col}", f"วันที่อยู่นอกช่วง: {col}"]
+        failed += [
+            _unreadable(source[col], parsed),
+            (parsed.notna() & ~parsed.between(*checks.plausible)).to_numpy(),
+        ]
+    for col in checks.required:
+        names.append(f"ไม่มี {col}")
+        failed.append(df[col].isna().to_numpy() if col in df.columns else np.ones(len(df), dtype=bool))
+    for col in checks.percents:
+        if col in source.columns:
+            percent = pd.to_numeric(source[col], errors="coerce")
+            names.append(f"{col} ไม่ใช่ตัวเลข 0-100")
+            failed.append(
+                _unreadable(source[col], percent, TEXT_PLACEHOLDERS)
+                | (percent.notna() & ~percent.between(0, 100)).to_numpy()
+            )
+    duplicate = duplicate_of(df, checks.key)
+    names.append("ซ้ำ")
+    failed.append(duplicate >= 0)
+
+    failed = np.column_stack(failed)
+    bad = np.flatnonzero(failed.any(axis=1))
+    if len(bad) == 0:
+        return df, quarantine_frame(source.iloc[0:0], bad, [])
+    reasons = np.full(len(bad), "", dtype=object)
+    for name, hit in zip(names[:-1], failed[bad, :-1].T):
+        reasons = np.where(hit, reasons + name + "; ", reasons)
+    dup = duplicate[bad]
+    reasons = np.where(dup >= 0, reasons + "ซ้ำกับแถวที่ " + (dup + FIRST_SHEET_ROW).astype(str) + "; ", reasons)
+    keep = np.ones(len(df), dtype=bool)
+    keep[bad] = False
+    kept = df[keep].reset_index(drop=True)
+    return kept, quarantine_frame(source.iloc[bad], bad, [r[:-2] for r in reasons])
+
+
+def quarantine_frame(rows, positions, reasons):
+    # Source values as text, so one table holds whatever the cells were.
+    out = rows.astype("str").reset_index(drop=True)
+    out.insert(0, REASON_COLUMN, pd.Series(reasons, dtype="str"))
+    out.insert(0, ROW_COLUMN, np.asarray(positions, dtype=np.int64) + FIRST_SHEET_ROW)
+    return out
+
+
+def main():
+    from fa_data import prepare_fa1_data, prepare_fa2_progress_data, FA1_DATA_PATH
+
+    parser = argparse.ArgumentParser(description="Validate a FA workbook and list the rows the dashboard quarantines.")
+    parser.add_argument("path", nargs="?", default=FA1_DATA_PATH)
+    parser.add_argument("--fa2", action="store_true", help="the file is an FA-2 progress sheet")
+    args = parser.parse_args()
+    quarantine = {}
+    prepare = prepare_fa2_progress_data if args.fa2 else prepare_fa1_data
+    kept = prepare(args.path, fallback=False, quarantine=quarantine)
+    rows = next(iter(quarantine.values()))
+    print(f"{args.path}: {len(kept):,} rows kept, {len(rows):,} quarantined")
+    for _, row in rows.iterrows():
+        print(f"  row {row[ROW_COLUMN]:>6}: {row[REASON_COLUMN]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from fa_dates import parse_be_dates
+
+FA1_STAGE_COLUMNS = ["วันที่ยื่นคำขอ", "วันที่ตรวจประวัติ", "วันที่อนุญาต", "บันทึกใน ALS"]
+FA2_STAGE_COLUMNS = ["วันที่ยื่นคำขอ", "วันที่ตรวจประวัติ", "เสนอบันทึก ผช.ผอฝ.", "วันที่อนุญาต"]
+
+
+def stage_reached_matrix(df: pd.DataFrame, stage_columns):
+    reached = np.zeros((len(df), len(stage_columns)), dtype=bool)
+    for j, col in enumerate(stage_columns):
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if not pd.api.types.is_datetime64_any_dtype(s):
+            s = parse_be_dates(s)
+        reached[:, j] = s.notna().to_numpy()
+    return reached
+
+
+def workflow_state(df: pd.DataFrame, stage_columns):
+    # The furthest stage with a date wins, so a skipped intermediate stage
+    # (e.g. no background-check date recorded) does not hold progress back.
+    reached = stage_reached_matrix(df, stage_columns)
+    step_idx = (reached * np.arange(1, len(stage_columns) + 1)).max(axis=1, initial=0)
+    percent = step_idx * (100 // len(stage_columns))
+    return pd.DataFrame({"step_idx": step_idx, "progress_percent_raw": percent}, index=df.index)
+
+
+def step_idx_from_percent(percent):
+    p = pd.to_numeric(pd.Series(percent), errors="coerce").fillna(0).to_numpy()
+    return np.select([p >= 100, p >= 75, p >= 50, p > 0], [4, 3, 2, 1], default=0)
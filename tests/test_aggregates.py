@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from fa_aggregates import ROW_KEY_COLUMN, AggregateStore, compute_aggregates
+from fa_data import FA1_DATA_PATH, prepare_fa1_data
+
+
+@pytest.fixture(scope="module")
+def fa1():
+    base = prepare_fa1_data(str(ROOT / FA1_DATA_PATH), fallback=False)
+    df = base.iloc[np.arange(2000) % len(base)].reset_index(drop=True)
+    df[ROW_KEY_COLUMN] = np.arange(len(df))
+    return df
+
+
+def _assert_same(got, df):
+    want = compute_aggregates(df)
+    assert got.keys() == want.keys()
+    for name in want:
+        pd.testing.assert_series_equal(got[name], want[name], check_names=False)
+
+
+def _with_new_rows(df, source, stage):
+    extra = df.iloc[source].copy()
+    extra[ROW_KEY_COLUMN] = df[ROW_KEY_COLUMN].max() + 1 + np.arange(len(extra))
+    extra["CurrentStage"] = stage
+    return pd.concat([df, extra], ignore_index=True)
+
+
+def test_incremental_matches_full_recompute(fa1):
+    rng = np.random.default_rng(0)
+    store = AggregateStore()
+    _assert_same(store.refresh(fa1, "v0"), fa1)
+
+    steps = []
+    df = fa1.copy()
+    df.loc[rng.choice(len(df), 20, replace=False), "CurrentStage"] = "อนุญาตแล้ว"
+    steps.append(df)
+    # a label no earlier version had
+    df = _with_new_rows(df, rng.choice(len(df), 5, replace=False), "สถานะใหม่")
+    steps.append(df)
+    df = df.drop(index=rng.choice(len(df), 30, replace=False)).reset_index(drop=True)
+    steps.append(df)
+    # the new label's rows all go, so it must drop out of the counts
+    df = df[df["CurrentStage"].ne("สถานะใหม่")].reset_index(drop=True)
+    steps.append(df)
+    # the sheet re-sorted, nothing else changed
+    df = df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+    steps.append(df)
+    df = df.copy()
+    df.loc[df.index[:10], "วันที่อนุญาต"] = pd.NaT
+    steps.append(df)
+
+    for i, df in enumerate(steps, start=1):
+        got = store.refresh(df, f"v{i}")
+        assert store.last_diff is not None, "expected the incremental path"
+        _assert_same(got, df)
+    assert "สถานะใหม่" not in store.aggregates["stage"].index
+
+
+def test_large_change_rebuilds(fa1):
+    store = AggregateStore()
+    store.refresh(fa1, "v0")
+    df = fa1.copy()
+    df["CurrentStage"] = "อนุญาตแล้ว"
+    _assert_same(store.refresh(df, "v1"), df)
+    assert store.last_diff is None
+
+
+def test_same_version_is_not_recomputed(fa1):
+    store = AggregateStore()
+    first = store.refresh(fa1, "v0")
+    assert store.refresh(fa1.iloc[:10], "v0") is first
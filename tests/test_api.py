@@ -0,0 +1,63 @@
+import json
+import threading
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from fa_api import DatasetStore, FAApiHandler, make_etag
+
+
+def test_etag_ignores_query_order():
+    a = make_etag("v1", "/api/fa1", {"offset": ["0"], "limit": ["50"]})
+    b = make_etag("v1", "/api/fa1", {"limit": ["50"], "offset": ["0"]})
+    assert a == b and a.startswith('"v1-') and a.endswith('"')
+
+
+def test_etag_changes_with_version_path_and_query():
+    base = make_etag("v1", "/api/fa1", {"limit": ["50"]})
+    assert make_etag("v2", "/api/fa1", {"limit": ["50"]}) != base
+    assert make_etag("v1", "/api/fa2", {"limit": ["50"]}) != base
+    assert make_etag("v1", "/api/fa1", {"limit": ["51"]}) != base
+
+
+def test_dated_paths_change_with_the_horizon():
+    day, next_day = pd.Timestamp("2024-05-01"), pd.Timestamp("2024-05-02")
+    assert make_etag("v1", "/api/kpis", {}, today=day) == make_etag("v1", "/api/kpis", {}, today=day + pd.Timedelta(hours=20))
+    assert make_etag("v1", "/api/kpis", {}, today=day) != make_etag("v1", "/api/kpis", {}, today=next_day)
+    assert make_etag("v1", "/api/fa1", {}, today=day) == make_etag("v1", "/api/fa1", {}, today=next_day)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    handler = type("Handler", (FAApiHandler,), {"store": DatasetStore()})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(address, path, headers=None):
+    conn = HTTPConnection(*address, timeout=30)
+    conn.request("GET", path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def test_not_modified_round_trip(server):
+    first, body = _get(server, "/api/fa1?limit=5")
+    assert first.status == 200
+    assert len(json.loads(body)["items"]) == 5
+    etag = first.getheader("ETag")
+    again, body = _get(server, "/api/fa1?limit=5", {"If-None-Match": f'"stale", {etag}'})
+    assert again.status == 304 and body == b""
+    assert again.getheader("ETag") == etag
+    other, _ = _get(server, "/api/fa1?limit=6", {"If-None-Match": etag})
+    assert other.status == 200 and other.getheader("ETag") != etag
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from fa_backlog import APPROVE_COLUMN, BACKLOG_COLUMNS, SUBMIT_COLUMN, daily_backlog, monthly_throughput
+
+
+def _frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    submitted = pd.Series(pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 120, n), unit="D"))
+    # mostly approved a few weeks later; some still open, some approved
+    # "before" they were submitted (a data-entry slip)
+    approved = submitted + pd.to_timedelta(rng.integers(-5, 60, n), unit="D")
+    approved[rng.random(n) < 0.2] = pd.NaT
+    submitted[rng.random(n) < 0.05] = pd.NaT
+    return pd.DataFrame({SUBMIT_COLUMN: submitted, APPROVE_COLUMN: approved})
+
+
+def _brute_force(df):
+    submitted = df[SUBMIT_COLUMN]
+    closed = df[APPROVE_COLUMN].where(submitted.notna())
+    closed = closed.where(closed.isna() | (closed >= submitted), submitted)
+    days = pd.date_range(submitted.min(), max(submitted.max(), closed.max()), freq="D", name="วันที่")
+    rows = [
+        (int((submitted == d).sum()), int((closed == d).sum()), int(((submitted <= d) & ~(closed <= d)).sum()))
+        for d in days
+    ]
+    return pd.DataFrame(rows, columns=BACKLOG_COLUMNS, index=days)
+
+
+def test_sweep_matches_brute_force():
+    df = _frame(500)
+    got = daily_backlog(df)
+    pd.testing.assert_frame_equal(got, _brute_force(df), check_freq=False, check_index_type=False)
+    assert (got["ระหว่างดำเนินการ"] >= 0).all()
+
+
+def test_empty_and_missing_columns():
+    assert daily_backlog(pd.DataFrame({SUBMIT_COLUMN: pd.Series([], dtype="datetime64[ns]")})).empty
+    open_only = daily_backlog(pd.DataFrame({SUBMIT_COLUMN: pd.to_datetime(["2024-01-01", "2024-01-03"])}))
+    assert open_only["ระหว่างดำเนินการ"].tolist() == [1, 1, 2]
+
+
+def test_monthly_throughput():
+    backlog = daily_backlog(_frame(500, seed=3))
+    monthly = monthly_throughput(backlog)
+    assert monthly["รับคำขอ"].sum() == backlog["รับคำขอ"].sum()
+    assert monthly["อนุญาต"].sum() == backlog["อนุญาต"].sum()
+    assert monthly["ระหว่างดำเนินการ"].iloc[-1] == backlog["ระหว่างดำเนินการ"].iloc[-1]
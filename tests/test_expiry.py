@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fa_expiry import (
+    EXPIRY_COLUMN, build_expiry_index, count_companies_expiring, default_horizon, expiring_between,
+)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(1)
+    n = 2000
+    dates = pd.Series(pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 900, n), unit="D"))
+    dates[rng.random(n) < 0.1] = pd.NaT
+    return pd.DataFrame({
+        EXPIRY_COLUMN: dates,
+        "Company (FA)": rng.choice([f"FA {i}" for i in range(40)], n),
+    })
+
+
+def test_window_matches_scan(df):
+    index = build_expiry_index(df)
+    assert np.all(np.diff(index.dates.astype(np.int64)) >= 0)
+    for start, end in [("2023-03-01", "2023-05-30"), ("2024-02-29", "2024-02-29"), ("2020-01-01", "2030-01-01"), ("2026-01-01", "2026-12-31")]:
+        inside = df[EXPIRY_COLUMN].between(pd.Timestamp(start), pd.Timestamp(end))
+        assert sorted(expiring_between(index, start, end)) == list(np.flatnonzero(inside))
+        assert count_companies_expiring(index, start, end) == df.loc[inside, "Company (FA)"].nunique()
+
+
+def test_missing_column_gives_empty_index():
+    index = build_expiry_index(pd.DataFrame({"x": [1]}))
+    assert len(expiring_between(index, "2020-01-01", "2030-01-01")) == 0
+    assert count_companies_expiring(index, "2020-01-01", "2030-01-01") == 0
+
+
+def test_default_horizon():
+    start, end = default_horizon(pd.Timestamp("2024-05-01 15:30"), days=90)
+    assert start == pd.Timestamp("2024-05-01")
+    assert end == pd.Timestamp("2024-07-30")
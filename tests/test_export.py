@@ -0,0 +1,69 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fa_export import export_bytes, export_frame, export_to_file, export_url, iter_chunks
+
+
+def _frame(rows):
+    return pd.DataFrame({
+        "ลำดับที่": np.arange(rows),
+        "ให้ความเห็นชอบ FA": [f"บริษัท {i} บล." for i in range(rows)],
+        "วันที่ยื่นคำขอ": pd.date_range("2024-01-01", periods=rows, freq="D"),
+        "display_date": "x",
+    })
+
+
+def test_chunks_cover_every_row_once():
+    df = _frame(120)
+    chunks = list(iter_chunks(df, 50))
+    assert [len(c) for c in chunks] == [50, 50, 20]
+    pd.testing.assert_frame_equal(pd.concat(chunks), df)
+
+
+def test_csv_matches_single_write():
+    df = _frame(120)
+    data = export_bytes(df, "csv", chunk_rows=7)
+    assert data.startswith("﻿".encode("utf-8"))
+    text = data.decode("utf-8-sig")
+    expected = export_frame(df).to_csv(index=False, date_format="%d/%m/%Y")
+    assert text == expected
+    assert text.count("ลำดับที่") == 1
+    assert "display_date" not in text
+
+
+def test_csv_of_empty_frame_has_header():
+    text = export_bytes(_frame(0), "csv").decode("utf-8-sig")
+    assert text.strip() == "ลำดับที่,ให้ความเห็นชอบ FA,วันที่ยื่นคำขอ"
+
+
+def test_xlsx_round_trip():
+    df = _frame(120)
+    df.loc[3, "ให้ความเห็นชอบ FA"] = None
+    back = pd.read_excel(io.BytesIO(export_bytes(df, "xlsx", chunk_rows=50)), engine="openpyxl")
+    expected = export_frame(df)
+    assert list(back.columns) == list(expected.columns)
+    assert back["ลำดับที่"].tolist() == expected["ลำดับที่"].tolist()
+    assert pd.isna(back.loc[3, "ให้ความเห็นชอบ FA"])
+    assert back["ให้ความเห็นชอบ FA"].drop(3).tolist() == expected["ให้ความเห็นชอบ FA"].drop(3).tolist()
+    assert (pd.to_datetime(back["วันที่ยื่นคำขอ"]) == expected["วันที่ยื่นคำขอ"]).all()
+
+
+def test_export_file_is_rewound():
+    with export_to_file(_frame(3), "csv") as fh:
+        assert fh.tell() == 0
+        assert fh.read(3) == "﻿".encode("utf-8")
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        export_to_file(_frame(3), "pdf")
+
+
+def test_export_url():
+    assert export_url("FA-1", "csv", api_url="") is None
+    url = export_url("FA-1", "xlsx", search_term="ทิสโก้", active_filter="รายใหม่", api_url="http://api:8502/")
+    assert url.startswith("http://api:8502/api/export/FA-1.xlsx?search=")
+    assert " " not in url and "ทิสโก้" not in url
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fa_history import dataset_as_of, entry_as_of, frame_at, ingest, read_log, storage_bytes
+
+
+def _versions():
+    rng = np.random.default_rng(0)
+    n = 400
+    fa1 = pd.DataFrame({
+        "ลำดับที่": np.arange(n),
+        "ให้ความเห็นชอบ FA": pd.Series(rng.choice(["บล. ก", "ธนาคาร ข", "บจก. ค"], n), dtype="str"),
+        "วันที่ยื่นคำขอ": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 300, n), unit="D"),
+        "progress": rng.integers(0, 101, n),
+    })
+    # no row key: rows are told apart by content, identical ones by occurrence
+    fa2 = pd.DataFrame({
+        "ชื่อบริษัท FA": pd.Series(rng.choice(["ก", "ข"], 50), dtype="str"),
+        "ประเภทคำขอ": pd.Series(rng.choice(["รายใหม่", "ต่ออายุ"], 50), dtype="str"),
+    })
+    versions = [(fa1, fa2)]
+
+    fa1 = fa1.copy()
+    fa1.loc[[3, 50, 99], "progress"] = 100
+    extra = fa1.iloc[:5].assign(**{"ลำดับที่": np.arange(n, n + 5)})
+    versions.append((pd.concat([fa1, extra], ignore_index=True), pd.concat([fa2, fa2.iloc[:3]], ignore_index=True)))
+
+    fa1, fa2 = versions[-1]
+    versions.append((fa1.drop(index=[0, 10, 20]).reset_index(drop=True), fa2.iloc[5:].reset_index(drop=True)))
+
+    fa1, fa2 = versions[-1]
+    versions.append((fa1.iloc[rng.permutation(len(fa1))].reset_index(drop=True), fa2.iloc[::-1].reset_index(drop=True)))
+
+    fa1, fa2 = versions[-1]
+    fa1 = fa1.copy()
+    fa1.loc[fa1.index[:20], "ให้ความเห็นชอบ FA"] = "บล. ใหม่"
+    versions.append((fa1, fa2))
+
+    versions.append((fa1.iloc[:0], fa2))
+    return versions
+
+
+@pytest.fixture
+def history(tmp_path):
+    versions = _versions()
+    for seq, (fa1, fa2) in enumerate(versions):
+        ingest(f"v{seq}", {"fa1": fa1, "fa2": fa2}, tmp_path, ingested_at=datetime(2024, 6, 1 + seq, 9), checkpoint_interval=4)
+    return tmp_path, versions
+
+
+def test_every_version_rebuilds_exactly(history):
+    path, versions = history
+    log = read_log(path)
+    assert [e["datasets"]["fa1"]["kind"] for e in log] == ["checkpoint", "delta", "delta", "delta", "checkpoint", "delta"]
+    assert log[1]["datasets"]["fa1"]["inserted"] == 5 and log[1]["datasets"]["fa1"]["updated"] == 3
+    assert log[2]["datasets"]["fa1"]["deleted"] == 3
+    assert log[3]["datasets"]["fa1"]["reordered"] and log[3]["datasets"]["fa2"]["reordered"]
+    assert log[5]["datasets"]["fa1"]["deleted"] == len(versions[4][0])
+    for seq, (fa1, fa2) in enumerate(versions):
+        pd.testing.assert_frame_equal(frame_at(log, seq, "fa1", path), fa1.reset_index(drop=True), check_index_type=False)
+        pd.testing.assert_frame_equal(frame_at(log, seq, "fa2", path), fa2.reset_index(drop=True), check_index_type=False)
+
+
+def test_same_version_is_recorded_once(history):
+    path, versions = history
+    fa1, fa2 = versions[-1]
+    ingest(f"v{len(versions) - 1}", {"fa1": fa1, "fa2": fa2}, path)
+    assert len(read_log(path)) == len(versions)
+    assert storage_bytes(path) > 0
+
+
+def test_as_of(history):
+    path, versions = history
+    log = read_log(path)
+    assert entry_as_of("2024-05-31", log) is None
+    # a bare date means the end of that day
+    assert entry_as_of("2024-06-02", log)["version"] == "v1"
+    assert entry_as_of(datetime(2024, 6, 2, 8), log)["version"] == "v0"
+    data = dataset_as_of("2024-06-03", path)
+    assert data["version"] == "v2" and data["ingested_at"] == datetime(2024, 6, 3, 9)
+    pd.testing.assert_frame_equal(data["fa1"], versions[2][0], check_index_type=False)
+    assert dataset_as_of("2024-01-01", path) is None
@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pytest
+
+import fa_match
+from fa_match import NOT_NORMALIZED, Rule, RuleTable, normalize, rule_table
+
+NAMES = [
+    "บล. ทิสโก้ จำกัด", "ลูก บล. ภัทร", "ธนาคาร กสิกรไทย", "ธ. ไทยพาณิชย์", "บจก. เคจีไอ",
+    "ฟินันเซีย จำกัด (มหาชน)", "", None, "  บล.  หยวนต้า ", "ลูก  บล. X", "KGI บล.",
+]
+
+
+def _contains_chain(s):
+    # what the pages computed before the rule tables
+    c = lambda p: s.str.contains(p, regex=False, na=False).to_numpy()
+    bank, sec = c("ธนาคาร") | c("ธ."), c("บล.")
+    return np.select([bank, c("ลูก") & sec, sec, c("บจก.")], ["ธนาคาร", "ลูก บล.", "บล.", "บจก."], default="อื่นๆ")
+
+
+@pytest.fixture(params=["factorized", "per cell"])
+def path(request, monkeypatch):
+    monkeypatch.setattr(fa_match, "_mostly_repeated", lambda s: request.param == "factorized")
+    return request.param
+
+
+@pytest.mark.parametrize("dtype", ["str", object])
+def test_classify_matches_contains_chain(path, dtype):
+    rng = np.random.default_rng(0)
+    s = pd.Series(rng.choice(np.array(NAMES, dtype=object), 5000), dtype=dtype)
+    got = RuleTable(**fa_match.RULE_TABLES["fa_type"]).classify(s)
+    assert got.index.equals(s.index)
+    assert got.tolist() == _contains_chain(s).tolist()
+
+
+def test_flags_match_each_rule(path):
+    s = pd.Series(NAMES * 3, index=np.arange(len(NAMES) * 3) * 2)
+    table = RuleTable(**fa_match.RULE_TABLES["fa_group"])
+    flags = table.flags(s)
+    assert flags.index.equals(s.index)
+    text = pd.Series(normalize(s).to_pylist(), index=s.index).fillna("")
+    for label in table.labels:
+        want = np.zeros(len(s), dtype=bool)
+        for rule in table.rules:
+            if rule.label == label:
+                want |= text.map(lambda t: all(k in t for k in rule.all) and not any(k in t for k in rule.none)).to_numpy()
+        assert flags[label].tolist() == want.tolist(), label
+
+
+def test_sampled_cardinality_picks_the_path():
+    rows = fa_match.SAMPLE_ROWS * 3
+    assert fa_match._mostly_repeated(pd.Series(np.arange(rows) % 50).astype(str))
+    assert not fa_match._mostly_repeated(pd.Series(np.arange(rows)).astype(str))
+    assert fa_match._mostly_repeated(pd.Series(["ก"] * 10))
+
+
+def test_normalize():
+    got = normalize(["ธนา​คาร", "กํา", "  บล.\t\nทิสโก้  ", "KGI", None]).to_pylist()
+    assert got == ["ธนาคาร", "กำ", "บล. ทิสโก้", "kgi", None]
+
+
+def test_not_normalized_flags_every_value_normalize_changes():
+    values = pa.array(
+        ["ปกติ", "ปกติ ดี", "ABC", "ǅ", "Ⅻ", "Ⓐ", " x", "x ", "x　", "x  y", "x\ty", "​x", "กํา", "𝐀", "ẞ", "x\u0085"],
+        type=pa.large_string(),
+    )
+    changed = pc.not_equal(fa_match._normalize_all(values), values).to_pylist()
+    flagged = pc.match_substring_regex(values, NOT_NORMALIZED).to_pylist()
+    assert all(f for c, f in zip(changed, flagged) if c)
+    assert flagged[:2] == [False, False]
+
+
+def test_rules_file_overrides_a_table(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"fa_type": {"default": "?", "rules": [{"label": "หลักทรัพย์", "all": ["บล."], "none": ["ลูก"]}]}}, ensure_ascii=False), encoding="utf-8")
+    table = rule_table("fa_type", path=str(path))
+    assert table.classify(pd.Series(["บล. A", "ลูก บล. B", "ธนาคาร C"])).tolist() == ["หลักทรัพย์", "?", "?"]
+    assert rule_table("fa_type", path=str(tmp_path / "missing.json")).default == "อื่นๆ"
+
+
+def test_keyword_limit():
+    rules = [Rule(f"r{i}", [f"คำ{i}"]) for i in range(fa_match.MAX_KEYWORDS + 1)]
+    with pytest.raises(ValueError):
+        RuleTable(rules)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fa_rollups import CHANGE_TYPES, EVENT_DATE_COLUMN, build_rollups, combine_years, prepare_changes
+
+
+def _changes(rows=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    event = pd.Series(pd.Timestamp("2018-06-01") + pd.to_timedelta(rng.integers(0, 1800, rows), unit="D"))
+    event[rng.random(rows) < 0.03] = pd.NaT
+    filed = event + pd.to_timedelta(rng.integers(0, 30, rows), unit="D")
+    signed = filed + pd.to_timedelta(rng.integers(0, 90, rows), unit="D")
+    signed[rng.random(rows) < 0.1] = pd.NaT
+    return pd.DataFrame({
+        "ชื่อ FA": rng.choice([f"FA {i}" for i in range(25)], rows),
+        "ชื่อบุคคล": np.where(rng.random(rows) < 0.2, "ก, ข", "ก"),
+        "แต่งตั้ง": rng.choice(["P", ""], rows),
+        "พ้นตำแหน่ง": rng.choice(["P", ""], rows),
+        "วันที่ยื่นแบบ": filed,
+        "ลงวันที่": signed,
+        EVENT_DATE_COLUMN: event,
+        "ผลการตรวจประวัติ": rng.choice(["ไม่พบข้อมูลความผิด", "พบข้อมูลความผิด", None], rows),
+    })
+
+
+@pytest.fixture(scope="module")
+def changes():
+    return prepare_changes(_changes())
+
+
+def _direct(df, years):
+    rows = df[df["ปีงบประมาณ"].isin(years)]
+    return {
+        "fa_count": rows["ชื่อ FA"].nunique(),
+        "appointed": int(rows["แต่งตั้ง"].eq("P").sum()),
+        "resigned": int(rows["พ้นตำแหน่ง"].eq("P").sum()),
+        "persons": int(rows["จำนวนบุคคล"].sum()),
+        "findings": int(rows["พบข้อมูลความผิด"].sum()),
+        "mean_duration": rows["ระยะเวลายื่นแบบ"].mean(),
+        "change_type": rows["ประเภทการเปลี่ยนแปลง"].value_counts().reindex(CHANGE_TYPES, fill_value=0),
+        "durations": np.sort(rows["ระยะเวลายื่นแบบ"].dropna().to_numpy()),
+        "rows": rows.index.to_numpy(),
+    }
+
+
+@pytest.mark.parametrize("pick", [[0], [1, 2], "all", []])
+def test_rollups_match_filtering_rows(changes, pick):
+    rollups = build_rollups(changes)
+    years = rollups["years"] if pick == "all" else [rollups["years"][i] for i in pick]
+    got = combine_years(rollups, years)
+    want = _direct(changes, years)
+    for key in ("fa_count", "appointed", "resigned", "persons", "findings"):
+        assert got[key] == want[key], key
+    if years:
+        assert got["mean_duration"] == pytest.approx(want["mean_duration"])
+    else:
+        assert np.isnan(got["mean_duration"])
+    assert got["change_type"].tolist() == want["change_type"].tolist()
+    assert np.array_equal(np.sort(got["durations"]), want["durations"])
+    assert np.array_equal(np.sort(got["rows"]), np.sort(want["rows"]))
+    if years:
+        monthly = changes[changes["ปีงบประมาณ"].isin(years)].groupby("ปี-เดือน").size()
+        assert got["monthly"].sum(axis=1).astype(int).to_dict() == monthly.to_dict()
+
+
+def test_fiscal_year_starts_in_october():
+    df = _changes(rows=2)
+    df[EVENT_DATE_COLUMN] = pd.to_datetime(["2018-09-30", "2018-10-01"])
+    out = prepare_changes(df)
+    assert out["ปีงบประมาณ"].tolist() == [2561, 2562]
+    assert out["ไตรมาส"].tolist() == [4, 1]
+
+
+def test_year_without_fa_names(changes):
+    # every row of one year lost its ชื่อ FA: by_fa has no entry for it
+    df = changes.copy()
+    year = int(df["ปีงบประมาณ"].dropna().iloc[0])
+    df.loc[df["ปีงบประมาณ"].eq(year), "ชื่อ FA"] = None
+    rollups = build_rollups(df)
+    got = combine_years(rollups, [year])
+    assert got["fa_count"] == 0
+    assert got["appointed"] == _direct(df, [year])["appointed"]
@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fa_series import downsample, downsample_frame, lttb_indices, minmax_indices, render_mode, step_indices, window
+
+
+def _lttb_reference(x, y, threshold):
+    # Steinarsson's original loop, bucket by bucket.
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    a, out = 0, [0]
+    for i in range(threshold - 2):
+        avg_start = int(math.floor((i + 1) * every)) + 1
+        avg_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+        best, best_area = None, -1.0
+        for j in range(int(math.floor(i * every)) + 1, int(math.floor((i + 1) * every)) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        a = best
+    out.append(n - 1)
+    return out
+
+
+def _walk(n, seed=0):
+    # integer steps keep every sum exact, so both versions see equal areas
+    return np.cumsum(np.random.default_rng(seed).integers(-5, 6, n)).astype(float)
+
+
+@pytest.mark.parametrize("n, threshold", [(1000, 50), (5003, 1200), (101, 3), (10, 9)])
+def test_lttb_matches_reference(n, threshold):
+    x, y = np.arange(n, dtype=float), _walk(n)
+    assert lttb_indices(x, y, threshold).tolist() == _lttb_reference(list(x), list(y), threshold)
+
+
+def test_lttb_on_dates():
+    x = pd.date_range("2020-01-01", periods=800, freq="D").to_numpy()
+    y = _walk(800, seed=2)
+    ns = x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    assert lttb_indices(x, y, 100).tolist() == _lttb_reference(list(ns), list(y), 100)
+
+
+def test_minmax_keeps_each_bucket_extremes():
+    n, n_out = 3001, 200
+    y = _walk(n, seed=1)
+    y[1234] = 10_000
+    idx = minmax_indices(y, n_out)
+    bucket = np.arange(n) * (n_out // 2) // n
+    want = {0, n - 1}
+    for b in np.unique(bucket):
+        pos = np.flatnonzero(bucket == b)
+        want.add(pos[np.argmin(y[pos])])
+        want.add(pos[::-1][np.argmax(y[pos][::-1])])
+    assert idx.tolist() == sorted(want)
+    assert 1234 in idx and len(idx) <= n_out + 2
+
+
+def test_step_points_are_lossless():
+    y = np.repeat(_walk(300, seed=3), np.random.default_rng(3).integers(1, 20, 300))
+    idx = step_indices(y)
+    redrawn = y[idx][np.searchsorted(idx, np.arange(len(y)), side="right") - 1]
+    assert np.array_equal(redrawn, y)
+
+
+def test_downsample():
+    x = pd.date_range("2020-01-01", periods=10_000, freq="D").to_numpy()
+    y = _walk(10_000)
+    y[5] = np.nan
+    for method in ("lttb", "minmax", "step"):
+        dx, dy = downsample(x, y, width=500, method=method)
+        assert 4 <= len(dx) <= 502
+        assert not np.isnan(dy).any()
+        assert dx[0] == x[0] and dx[-1] == x[-1]
+    with pytest.raises(ValueError):
+        downsample(x, y, method="mean")
+    short_x, short_y = downsample(x[:100], y[10:110], width=500)
+    assert len(short_x) == 100
+
+
+def test_window_keeps_a_point_either_side():
+    x = pd.date_range("2020-01-01", periods=100, freq="D").to_numpy()
+    y = np.arange(100)
+    wx, wy = window(x, y, "2020-01-10", "2020-01-20")
+    assert wy[0] == 8 and wy[-1] == 20
+    wx, wy = window(x, y, "", None)
+    assert len(wy) == 100
+
+
+def test_downsample_frame_per_series():
+    days = pd.date_range("2020-01-01", periods=3000, freq="D")
+    df = pd.DataFrame({
+        "date": np.tile(days, 2),
+        "count": np.r_[_walk(3000), _walk(3000, seed=9)],
+        "fa": np.repeat(["A", "B"], 3000),
+    })
+    out = downsample_frame(df, "date", "count", by="fa", width=300)
+    assert list(out.columns) == ["date", "count", "fa"]
+    assert set(out["fa"]) == {"A", "B"}
+    assert (out.groupby("fa").size() <= 300).all()
+    assert render_mode(len(df)) == "webgl" and render_mode(len(out)) == "svg"
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fa_tenure import (
+    APPOINT_COLUMN, COMPANY_COLUMN, EVENT_DATE_COLUMN, PERSON_COLUMN, RESIGN_COLUMN, ROLE_COLUMN,
+    IntervalTree, build_tenure_index, pair_tenures, tenure_events,
+)
+
+
+def test_stab_matches_brute_force():
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, 1000, 3000)
+    ends = starts + rng.integers(0, 120, 3000)
+    ids = np.arange(3000)
+    tree = IntervalTree(starts, ends, ids)
+    for point in list(rng.integers(-10, 1150, 300)) + [0, 999]:
+        want = ids[(starts <= point) & (point < ends)]
+        assert np.array_equal(np.sort(tree.stab(point)), want)
+
+
+def _changes(seed, rows=3000):
+    rng = np.random.default_rng(seed)
+    kind = rng.choice(["appoint", "resign", "both"], rows, p=[0.5, 0.4, 0.1])
+    people = [f"บุคคล {i}" for i in range(150)]
+    persons = [
+        ", ".join(rng.choice(people, 2, replace=False)) if rng.random() < 0.1 else rng.choice(people)
+        for _ in range(rows)
+    ]
+    return pd.DataFrame({
+        COMPANY_COLUMN: rng.choice([f"FA {i}" for i in range(12)], rows),
+        PERSON_COLUMN: persons,
+        ROLE_COLUMN: rng.choice(["กรรมการ", "ผู้ควบคุม"], rows),
+        EVENT_DATE_COLUMN: pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 1500, rows), unit="D"),
+        APPOINT_COLUMN: np.where(kind != "resign", "P", ""),
+        RESIGN_COLUMN: np.where(kind != "appoint", "P", ""),
+    })
+
+
+@pytest.fixture(scope="module")
+def index():
+    return build_tenure_index(_changes(1))
+
+
+def _brute_force(tenures, company, date):
+    start = tenures["เริ่ม"].fillna(pd.Timestamp.min)
+    end = tenures["สิ้นสุด"].fillna(pd.Timestamp.max)
+    return tenures[tenures["บริษัท"].eq(company) & (start <= date) & (date < end)]
+
+
+def test_queries_match_brute_force(index):
+    dates = pd.date_range("2018-12-01", "2023-03-01", freq="37D")
+    counts = index.active_counts(dates)
+    for company in index.tenures["บริษัท"].unique():
+        for date in dates:
+            want = _brute_force(index.tenures, company, date)
+            got = index.controllers_on(company, date)
+            assert list(got.index) == list(want.index)
+            assert index.active_count(company, date) == len(want)
+            assert counts.loc[date, company] == len(want)
+    assert len(index.controllers_on("ไม่มีบริษัทนี้", "2020-01-01")) == 0
+    assert index.active_count("ไม่มีบริษัทนี้", "2020-01-01") == 0
+
+
+def test_pairing():
+    df = pd.DataFrame({
+        COMPANY_COLUMN: ["A", "A", "A", "B", "B"],
+        PERSON_COLUMN: ["ก, ข", "ก", "ค", "ง", "ง"],
+        ROLE_COLUMN: ["กรรมการ"] * 5,
+        EVENT_DATE_COLUMN: pd.to_datetime(["2020-01-01", "2021-01-01", "2020-06-01", "2020-01-01", "2020-02-01"]),
+        APPOINT_COLUMN: ["P", "", "", "P", "P"],
+        RESIGN_COLUMN: ["", "P", "P", "", "P"],
+    })
+    tenures = pair_tenures(tenure_events(df)).set_index(["บริษัท", "บุคคล"])
+    assert tenures.loc[("A", "ก"), "สิ้นสุด"] == pd.Timestamp("2021-01-01")
+    # appointed before the data starts / still in office
+    assert pd.isna(tenures.loc[("A", "ค"), "เริ่ม"])
+    assert pd.isna(tenures.loc[("A", "ข"), "สิ้นสุด"])
+    # a row flagged both ways changes nothing
+    assert tenures.loc[("B", "ง"), "เริ่ม"] == pd.Timestamp("2020-01-01")
+    assert pd.isna(tenures.loc[("B", "ง"), "สิ้นสุด"])
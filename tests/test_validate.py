@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from fa_match import normalize
+from fa_validate import (
+    FIRST_SHEET_ROW, REASON_COLUMN, ROW_COLUMN, Checks, clear_placeholders, duplicate_of, validate,
+)
+
+KEY = ("ชื่อบริษัท FA", "ผู้ควบคุม", "วันที่ยื่นคำขอ")
+
+
+def _submissions(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "ชื่อบริษัท FA": rng.choice([f"บริษัท {i} บล." for i in range(30)], n),
+        "ผู้ควบคุม": rng.choice([f"ผู้ควบคุม {i} ทำ co" for i in range(400)], n).astype(object),
+        "วันที่ยื่นคำขอ": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 60, n), unit="D"),
+    })
+    # re-typed copies of earlier rows: extra spaces, zero-width characters,
+    # nikhahit + sara aa, upper case
+    copies = rng.choice(n, 300, replace=False)
+    spelled = df.loc[copies, "ผู้ควบคุม"].str.replace(" ", "  ").str.replace("ำ", "ํา").str.upper().radd(" ") + "​"
+    targets = rng.choice(n, 300, replace=False)
+    df.loc[targets, list(KEY)] = df.loc[copies, list(KEY)].to_numpy()
+    df.loc[targets[:100], "ผู้ควบคุม"] = spelled.iloc[:100].to_numpy()
+    df.loc[rng.choice(n, 30, replace=False), "ชื่อบริษัท FA"] = None
+    df.loc[rng.choice(n, 30, replace=False), "วันที่ยื่นคำขอ"] = pd.NaT
+    df["ชื่อบริษัท FA"] = df["ชื่อบริษัท FA"].astype("str")
+    return df
+
+
+def _brute_force(df, key):
+    clean = pd.DataFrame({
+        c: df[c] if df[c].dtype.kind == "M" else pd.Series(normalize(df[c].astype("str")).to_pylist(), index=df.index)
+        for c in key
+    })
+    first = np.full(len(df), -1)
+    seen = {}
+    for i, row in enumerate(clean.itertuples(index=False, name=None)):
+        if any(pd.isna(v) for v in row):
+            continue
+        if row in seen:
+            first[i] = seen[row]
+        else:
+            seen[row] = i
+    return first
+
+
+def test_duplicates_match_brute_force():
+    df = _submissions()
+    want = _brute_force(df, KEY)
+    assert (want >= 0).sum() > 100
+    assert duplicate_of(df, KEY).tolist() == want.tolist()
+
+
+def test_duplicates_in_chunked_arrow_columns():
+    df = _submissions(500, seed=1)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    chunked = pa.concat_tables([table.slice(0, 200), table.slice(200)]).to_pandas()
+    assert duplicate_of(chunked, KEY).tolist() == _brute_force(df, KEY).tolist()
+
+
+def test_duplicates_need_every_key_column():
+    df = _submissions(500, seed=2)
+    assert (duplicate_of(df, KEY + ("ไม่มีคอลัมน์นี้",)) == -1).all()
+    assert (duplicate_of(df.iloc[:0], KEY) == -1).all()
+
+
+def test_placeholders_become_empty():
+    df = pd.DataFrame({"ชื่อ": pd.Series(["___", " nan ", "-", "บล. ก", ""], dtype="str"), "n": [1, 2, 3, 4, 5]})
+    out = clear_placeholders(df)
+    assert out["ชื่อ"].isna().tolist() == [True, True, True, False, True]
+    assert out["n"].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_validate_quarantines_with_reasons():
+    source = pd.DataFrame({
+        "ชื่อบริษัท FA": pd.Series(["ก", "ข", "___", "ค", "ก", "ง", "จ", "ฉ"], dtype="str"),
+        "วันที่ยื่นคำขอ": pd.Series(["1/1/2024", "ไม่ทราบ", "2/1/2024", "1/1/1965", "1/1/2024", "-", "3/1/2024", "4/1/2024"], dtype="str"),
+        "progress_percent_raw": pd.Series(["50", "", None, "150", "20", "abc", " - ", "100"], dtype=object),
+    })
+    df = clear_placeholders(source)
+    df["วันที่ยื่นคำขอ"] = pd.to_datetime(df["วันที่ยื่นคำขอ"], format="%d/%m/%Y", errors="coerce")
+    checks = Checks(
+        dates=("วันที่ยื่นคำขอ",), required=("ชื่อบริษัท FA",), percents=("progress_percent_raw",),
+        key=("ชื่อบริษัท FA", "วันที่ยื่นคำขอ"),
+    )
+    kept, quarantine = validate(df, source, checks)
+    assert kept["ชื่อบริษัท FA"].tolist() == ["ก", "จ", "ฉ"]
+    reasons = dict(zip(quarantine[ROW_COLUMN] - FIRST_SHEET_ROW, quarantine[REASON_COLUMN]))
+    assert reasons == {
+        1: "วันที่อ่านไม่ได้: วันที่ยื่นคำขอ",
+        2: "ไม่มี ชื่อบริษัท FA",
+        3: "วันที่อยู่นอกช่วง: วันที่ยื่นคำขอ; progress_percent_raw ไม่ใช่ตัวเลข 0-100",
+        4: "ซ้ำกับแถวที่ 2",
+        5: "progress_percent_raw ไม่ใช่ตัวเลข 0-100",
+    }
+    # the quarantine keeps the cells as they were in the source
+    assert quarantine["วันที่ยื่นคำขอ"].tolist()[0] == "ไม่ทราบ"
+
+
+@pytest.mark.parametrize("values", [[0, 50.5, 100, np.nan], ["", "  ", None, "75"]])
+def test_blank_or_valid_percents_pass(values):
+    source = pd.DataFrame({"progress_percent_raw": pd.Series(values, dtype=object)})
+    kept, quarantine = validate(source, source, Checks(percents=("progress_percent_raw",)))
+    assert len(kept) == len(values) and quarantine.empty